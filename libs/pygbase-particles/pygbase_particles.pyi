@@ -1,15 +1,65 @@
+from pygame import Surface
+
 class ParticleManager:
-	def __new__(cls) -> ParticleManager: ...
-	def activate_spawner(self, index: int): ...
-	def deactivate_spawner(self, index: int): ...
+	def __new__(
+		cls,
+		chunk_size: float = 400,
+		capacity: int = 4096,
+		overflow: str = "grow",
+		threads: int = 1,
+		seed: int | None = None,
+	) -> ParticleManager: ...
+	def __len__(self) -> int: ...
+	def add_particle_setting(
+		self,
+		name: str,
+		styles: list[tuple[int, tuple[int, int, int]]],
+		size: tuple[float, float],
+		size_decay: tuple[float, float],
+		velocity_decay: tuple[float, float],
+		gravity: tuple[float, float],
+		effector: bool,
+		bounce: tuple[tuple[float, float], tuple[float, float]],
+	): ...
+	def has_particle_setting(self, name: str) -> bool: ...
 	def add_point_spawner(
 		self,
 		pos: tuple[float, float],
 		cooldown: float,
 		amount: int,
 		start_active: bool,
-		radial_vel_range: tuple[float, float] = (0, 0),
+		setting: str,
+		angle_range: tuple[float, float] = (0, 360),
+		velocity_range: tuple[float, float] = (100, 200),
+	) -> int: ...
+	def add_circle_spawner(
+		self,
+		pos: tuple[float, float],
+		cooldown: float,
+		amount: int,
+		radius: float,
+		start_active: bool,
+		setting: str,
+		spawn_velocity: tuple[float, float] = (0, 0),
+		linear_velocity_range: tuple[tuple[float, float], tuple[float, float]] = ((0, 0), (0, 0)),
+		radial_velocity_range: tuple[float, float] = (0, 0),
+		radial_offset_range: tuple[float, float] = (0, 0),
+	) -> int: ...
+	def add_rect_spawner(
+		self,
+		pos: tuple[float, float],
+		cooldown: float,
+		amount: int,
+		size: tuple[float, float],
+		start_active: bool,
+		setting: str,
 	) -> int: ...
+	def remove_spawner(self, index: int): ...
+	def activate_spawner(self, index: int): ...
+	def deactivate_spawner(self, index: int): ...
+	def set_spawner_state(
+		self, index: int, pos: tuple[float, float], active: bool, amount: int, cooldown: float, setting: str
+	): ...
 	def add_particle(
 		self,
 		pos: tuple[float, float],
@@ -20,8 +70,49 @@ class ParticleManager:
 		size: float,
 		size_decay: float,
 		color: tuple[int, int, int],
+		bounce: tuple[tuple[float, float], tuple[float, float]] = ((0, 0), (0, 0)),
+		cache_id: int = 0,
+	): ...
+	def add_particles(
+		self,
+		setting: str,
+		positions: list[tuple[float, float]],
+		velocities: list[tuple[float, float]] | None = None,
+	): ...
+	def clear(self): ...
+	def set_colliders(self, colliders: list[tuple[float, float, float, float, bool]]): ...
+	def set_dynamic_colliders(self, colliders: list[tuple[float, float, float, float, bool]]): ...
+	def clear_affectors(self): ...
+	def add_attractor(self, pos: tuple[float, float], radius: float, strength: float): ...
+	def add_repulsor(self, pos: tuple[float, float], radius: float, strength: float): ...
+	def add_vortex(self, pos: tuple[float, float], radius: float, strength: float): ...
+	def add_drag_zone(self, bounds: tuple[float, float, float, float], drag: float, wind: tuple[float, float]): ...
+	def add_flow_field(
+		self,
+		pos: tuple[float, float],
+		cell_size: float,
+		columns: int,
+		rows: int,
+		flow: list[tuple[float, float]],
+		strength: float,
 	): ...
+	def set_threads(self, threads: int): ...
 	def update(self, delta: float): ...
-	def particle_positions(self) -> list[tuple[float, float]]: ...
-	def particle_sizes(self) -> list[float]: ...
-	def particle_colors(self) -> list[tuple[int, int, int]]: ...
+	def particle_chunks(self) -> list[tuple[int, int]]: ...
+	def particles_in_chunks(self, left: int, top: int, right: int, bottom: int) -> list[int]: ...
+	def get_particle(self, index: int) -> tuple[tuple[float, float], tuple[float, float], float, bool]: ...
+	def set_particle_pos(self, index: int, pos: tuple[float, float]): ...
+	def set_particle_velocity(self, index: int, velocity: tuple[float, float]): ...
+	def set_particle_size(self, index: int, size: float): ...
+	def set_images(self, images: list[Surface], image_start: list[int], image_length: list[int]): ...
+	def build_blits(
+		self, origin: tuple[float, float], view: tuple[float, float, float, float]
+	) -> list[tuple[Surface, tuple[int, int]]]: ...
+	def particle_positions(self) -> ParticleArray: ...
+	def particle_sizes(self) -> ParticleArray: ...
+	def particle_colors(self) -> ParticleArray: ...
+	def particle_cache_ids(self) -> ParticleArray: ...
+
+class ParticleArray:
+	def __len__(self) -> int: ...
+	def __buffer__(self, flags: int, /) -> memoryview: ...
@@ -0,0 +1,143 @@
+use crate::{particle::Particle, utils::vec2::Vec2};
+
+/// Native versions of the affectors in `pygbase.particles.particle_affectors`.
+/// Strengths are per second, and get scaled by `delta` when applied.
+pub enum Affector {
+    Attractor {
+        pos: Vec2,
+        radius: f64,
+        strength: f64,
+    },
+    Repulsor {
+        pos: Vec2,
+        radius: f64,
+        strength: f64,
+    },
+    Vortex {
+        pos: Vec2,
+        radius: f64,
+        strength: f64,
+    },
+    DragZone {
+        bounds: (f64, f64, f64, f64),
+        drag: f64,
+        wind: Vec2,
+    },
+    FlowField {
+        pos: Vec2,
+        cell_size: f64,
+        columns: usize,
+        rows: usize,
+        flow: Vec<Vec2>,
+        strength: f64,
+    },
+}
+
+impl Affector {
+    /// `(left, top, right, bottom)` of the area the affector can reach.
+    pub fn bounds(&self) -> (f64, f64, f64, f64) {
+        match self {
+            Affector::Attractor { pos, radius, .. }
+            | Affector::Repulsor { pos, radius, .. }
+            | Affector::Vortex { pos, radius, .. } => {
+                (pos.x - radius, pos.y - radius, pos.x + radius, pos.y + radius)
+            }
+            Affector::DragZone { bounds, .. } => *bounds,
+            Affector::FlowField {
+                pos,
+                cell_size,
+                columns,
+                rows,
+                ..
+            } => (
+                pos.x,
+                pos.y,
+                pos.x + *columns as f64 * cell_size,
+                pos.y + *rows as f64 * cell_size,
+            ),
+        }
+    }
+
+    pub fn affect(&self, delta: f64, particle: &mut Particle) {
+        if !particle.effector {
+            return;
+        }
+
+        match self {
+            Affector::Attractor {
+                pos,
+                radius,
+                strength,
+            } => {
+                let offset = *pos - particle.pos;
+                let distance_squared = offset.length_squared();
+
+                if distance_squared > radius * radius {
+                    return;
+                }
+
+                if distance_squared < 36.0 {
+                    particle.size = 0.0;
+                    return;
+                }
+
+                particle.velocity += offset * (strength * delta / distance_squared);
+            }
+            Affector::Repulsor {
+                pos,
+                radius,
+                strength,
+            } => {
+                let offset = particle.pos - *pos;
+                let distance_squared = offset.length_squared();
+
+                if distance_squared > radius * radius || distance_squared == 0.0 {
+                    return;
+                }
+
+                particle.velocity += offset * (strength * delta / distance_squared);
+            }
+            Affector::Vortex {
+                pos,
+                radius,
+                strength,
+            } => {
+                let offset = *pos - particle.pos;
+                let distance_squared = offset.length_squared();
+
+                if distance_squared > radius * radius || distance_squared == 0.0 {
+                    return;
+                }
+
+                // Perpendicular to the direction towards the centre
+                let factor = strength * delta / distance_squared;
+                particle.velocity += Vec2::new(-offset.y, offset.x) * factor;
+            }
+            Affector::DragZone { bounds, drag, wind } => {
+                let (left, top, right, bottom) = *bounds;
+                let p = particle.pos;
+
+                if left <= p.x && p.x < right && top <= p.y && p.y < bottom {
+                    let amount = (drag * delta).min(1.0);
+                    particle.velocity += (*wind - particle.velocity) * amount;
+                }
+            }
+            Affector::FlowField {
+                pos,
+                cell_size,
+                columns,
+                rows,
+                flow,
+                strength,
+            } => {
+                let column = ((particle.pos.x - pos.x) / cell_size).floor();
+                let row = ((particle.pos.y - pos.y) / cell_size).floor();
+
+                if column >= 0.0 && column < *columns as f64 && row >= 0.0 && row < *rows as f64 {
+                    let cell = flow[row as usize * columns + column as usize];
+                    particle.velocity += cell * (strength * delta);
+                }
+            }
+        }
+    }
+}
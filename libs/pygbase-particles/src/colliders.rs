@@ -0,0 +1,27 @@
+#[derive(Clone, Copy)]
+pub struct Rect {
+    pub left: f64,
+    pub top: f64,
+    pub right: f64,
+    pub bottom: f64,
+    /// Truncate points towards zero before testing them, like pygame's integer `Rect.collidepoint`.
+    pub truncate: bool,
+}
+
+impl Rect {
+    pub fn from_tuple(t: (f64, f64, f64, f64, bool)) -> Self {
+        Self {
+            left: t.0,
+            top: t.1,
+            right: t.2,
+            bottom: t.3,
+            truncate: t.4,
+        }
+    }
+
+    pub fn contains(&self, x: f64, y: f64) -> bool {
+        let (x, y) = if self.truncate { (x.trunc(), y.trunc()) } else { (x, y) };
+
+        self.left <= x && x < self.right && self.top <= y && y < self.bottom
+    }
+}
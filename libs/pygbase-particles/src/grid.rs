@@ -0,0 +1,211 @@
+use std::collections::{BTreeMap, HashMap};
+
+use crate::{colliders::Rect, particle::Particle, utils::vec2::Vec2};
+
+/// `(column, row)` of a chunk.
+pub type Chunk = (i64, i64);
+
+pub fn get_chunk(pos: Vec2, chunk_size: f64) -> Chunk {
+    (
+        (pos.x / chunk_size).floor() as i64,
+        (pos.y / chunk_size).floor() as i64,
+    )
+}
+
+/// Chunks touched by a `(left, top, right, bottom)` area, in the same way as the Python `ParticleManager`.
+pub fn covered_chunks(bounds: (f64, f64, f64, f64), chunk_size: f64) -> (Chunk, Chunk) {
+    (
+        get_chunk(Vec2::new(bounds.0, bounds.1), chunk_size),
+        get_chunk(Vec2::new(bounds.2, bounds.3), chunk_size),
+    )
+}
+
+pub fn in_range(chunk: Chunk, (top_left, bottom_right): (Chunk, Chunk)) -> bool {
+    top_left.0 <= chunk.0 && chunk.0 <= bottom_right.0 && top_left.1 <= chunk.1 && chunk.1 <= bottom_right.1
+}
+
+/// Indices of particles in each occupied chunk.
+/// Chunks are kept in order, so updates walk them the same way every time.
+pub struct ParticleGrid {
+    cells: BTreeMap<Chunk, Vec<usize>>,
+    dirty: bool,
+}
+
+impl ParticleGrid {
+    pub fn new() -> Self {
+        Self {
+            cells: BTreeMap::new(),
+            dirty: false,
+        }
+    }
+
+    /// Call whenever particles get removed or moved.
+    pub fn invalidate(&mut self) {
+        self.dirty = true;
+    }
+
+    /// Call after pushing particles from `start` onwards. Files them without rebuilding the grid.
+    pub fn extend(&mut self, particles: &[Particle], start: usize, chunk_size: f64) {
+        if self.dirty {
+            return;
+        }
+
+        for (index, particle) in particles.iter().enumerate().skip(start) {
+            self.cells
+                .entry(get_chunk(particle.pos, chunk_size))
+                .or_default()
+                .push(index);
+        }
+    }
+
+    pub fn cells(&mut self, particles: &[Particle], chunk_size: f64) -> &BTreeMap<Chunk, Vec<usize>> {
+        if self.dirty {
+            self.cells.clear();
+            for (index, particle) in particles.iter().enumerate() {
+                self.cells
+                    .entry(get_chunk(particle.pos, chunk_size))
+                    .or_default()
+                    .push(index);
+            }
+
+            self.dirty = false;
+        }
+
+        &self.cells
+    }
+
+    /// Particle indices in the chunks between two corners, inclusive.
+    pub fn query(&mut self, particles: &[Particle], chunk_size: f64, range: (Chunk, Chunk)) -> Vec<usize> {
+        let mut indices = Vec::new();
+        for cell in cells_in_range(self.cells(particles, chunk_size), range) {
+            indices.extend_from_slice(cell);
+        }
+
+        indices
+    }
+}
+
+/// Occupied cells between two corners, inclusive.
+/// Looks up each column of the range, unless the range is wider than there are cells.
+pub fn cells_in_range(
+    cells: &BTreeMap<Chunk, Vec<usize>>,
+    range: (Chunk, Chunk),
+) -> Box<dyn Iterator<Item = &Vec<usize>> + '_> {
+    let (top_left, bottom_right) = range;
+    if top_left.0 > bottom_right.0 || top_left.1 > bottom_right.1 {
+        return Box::new(std::iter::empty());
+    }
+
+    if bottom_right.0.abs_diff(top_left.0) >= cells.len() as u64 {
+        return Box::new(
+            cells
+                .iter()
+                .filter(move |(chunk, _)| in_range(**chunk, range))
+                .map(|(_, cell)| cell),
+        );
+    }
+
+    // Chunks are ordered by column, then row
+    Box::new((top_left.0..=bottom_right.0).flat_map(move |col| {
+        cells
+            .range((col, top_left.1)..=(col, bottom_right.1))
+            .map(|(_, cell)| cell)
+    }))
+}
+
+/// Static and dynamic colliders, bucketed into the chunks they cover.
+pub struct ColliderGrid {
+    chunk_size: f64,
+
+    static_colliders: Vec<Rect>,
+    dynamic_colliders: Vec<Rect>,
+    static_chunks: HashMap<Chunk, Vec<usize>>,
+    dynamic_chunks: HashMap<Chunk, Vec<usize>>,
+
+    // Colliders around each chunk, rebuilt only when the colliders change
+    neighbourhoods: HashMap<Chunk, Vec<Rect>>,
+}
+
+impl ColliderGrid {
+    pub fn new(chunk_size: f64) -> Self {
+        Self {
+            chunk_size,
+            static_colliders: Vec::new(),
+            dynamic_colliders: Vec::new(),
+            static_chunks: HashMap::new(),
+            dynamic_chunks: HashMap::new(),
+            neighbourhoods: HashMap::new(),
+        }
+    }
+
+    fn bucket(colliders: &[Rect], chunk_size: f64) -> HashMap<Chunk, Vec<usize>> {
+        let mut chunks: HashMap<Chunk, Vec<usize>> = HashMap::new();
+
+        for (index, collider) in colliders.iter().enumerate() {
+            let (top_left, bottom_right) = covered_chunks(
+                (collider.left, collider.top, collider.right, collider.bottom),
+                chunk_size,
+            );
+
+            for row in top_left.1..=bottom_right.1 {
+                for col in top_left.0..=bottom_right.0 {
+                    chunks.entry((col, row)).or_default().push(index);
+                }
+            }
+        }
+
+        chunks
+    }
+
+    pub fn set_static(&mut self, colliders: Vec<Rect>) {
+        self.static_chunks = Self::bucket(&colliders, self.chunk_size);
+        self.static_colliders = colliders;
+        self.neighbourhoods.clear();
+    }
+
+    pub fn set_dynamic(&mut self, colliders: Vec<Rect>) {
+        self.dynamic_chunks = Self::bucket(&colliders, self.chunk_size);
+        self.dynamic_colliders = colliders;
+        self.neighbourhoods.clear();
+    }
+
+    fn gather(chunks: &HashMap<Chunk, Vec<usize>>, colliders: &[Rect], chunk: Chunk, out: &mut Vec<Rect>) {
+        let mut indices = Vec::new();
+        for row in chunk.1 - 1..=chunk.1 + 1 {
+            for col in chunk.0 - 1..=chunk.0 + 1 {
+                if let Some(cell) = chunks.get(&(col, row)) {
+                    indices.extend_from_slice(cell);
+                }
+            }
+        }
+
+        // Colliders spanning multiple chunks only get added once
+        indices.sort_unstable();
+        indices.dedup();
+        out.extend(indices.into_iter().map(|index| colliders[index]));
+    }
+
+    /// Colliders around `chunk`, if `neighbourhood` was already called for it.
+    pub fn cached_neighbourhood(&self, chunk: Chunk) -> &[Rect] {
+        self.neighbourhoods.get(&chunk).map_or(&[], |colliders| colliders.as_slice())
+    }
+
+    /// Static and dynamic colliders in the 3x3 chunks around `chunk`.
+    pub fn neighbourhood(&mut self, chunk: Chunk) -> &[Rect] {
+        let Self {
+            static_colliders,
+            dynamic_colliders,
+            static_chunks,
+            dynamic_chunks,
+            neighbourhoods,
+            ..
+        } = self;
+
+        neighbourhoods.entry(chunk).or_insert_with(|| {
+            let mut colliders = Vec::new();
+            Self::gather(static_chunks, static_colliders, chunk, &mut colliders);
+            Self::gather(dynamic_chunks, dynamic_colliders, chunk, &mut colliders);
+            colliders
+        })
+    }
+}
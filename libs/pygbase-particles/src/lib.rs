@@ -1,15 +1,21 @@
 use pyo3::prelude::*;
 
+mod affectors;
+mod colliders;
+mod grid;
 mod particle;
+mod particle_arrays;
 mod particle_manager;
 mod particle_spawners;
 mod particle_settings;
 mod utils;
 
+use particle_arrays::ParticleArray;
 use particle_manager::ParticleManager;
 
 #[pymodule]
 fn pygbase_particles(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<ParticleManager>()?;
+    m.add_class::<ParticleArray>()?;
     Ok(())
 }
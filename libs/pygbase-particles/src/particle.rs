@@ -1,44 +1,48 @@
-use crate::utils::vec2::Vec2;
+use rand_chacha::ChaCha8Rng;
 
+use crate::{
+    colliders::Rect,
+    utils::{random::uniform, vec2::Vec2},
+};
+
+/// Laid out like C, as `ParticleArray` exports fields of the particles in place.
+#[repr(C)]
 pub struct Particle {
     pub pos: Vec2,
     pub velocity: Vec2,
-    pub velocity_decay: f64,
     pub gravity: Vec2,
-    pub effector: bool,
+    pub velocity_decay: f64,
     pub size: f64,
     pub size_decay: f64,
-    pub color: (u8, u8, u8),
+    pub bounce: [(f64, f64); 2],
+    pub cache_id: u32,
+    pub color: [u8; 3],
+    pub effector: bool,
 }
 
 impl Particle {
-    pub fn new(
-        pos: Vec2,
-        velocity: Vec2,
-        velocity_decay: f64,
-        gravity: Vec2,
-        effector: bool,
-        size: f64,
-        size_decay: f64,
-        color: (u8, u8, u8),
-    ) -> Self {
-        Self {
-            pos,
-            velocity,
-            velocity_decay,
-            gravity,
-            effector,
-            size,
-            size_decay,
-            color,
-        }
-    }
-
-    pub fn update(&mut self, delta: f64) {
+    pub fn update(&mut self, delta: f64, colliders: &[Rect], rng: &mut ChaCha8Rng) {
         self.velocity += self.gravity * delta;
         self.velocity -= self.velocity * self.velocity_decay * delta;
 
-        self.pos += self.velocity * delta;
+        // Same order as the Python particles, x is checked against the old y
+        let mut new_x = self.pos.x + self.velocity.x * delta;
+        if colliders.iter().any(|c| c.contains(new_x, self.pos.y)) {
+            new_x -= self.velocity.x * delta;
+            self.velocity.x *= -uniform(rng, self.bounce[0]);
+        }
+
+        let mut new_y = self.pos.y + self.velocity.y * delta;
+        if colliders.iter().any(|c| c.contains(new_x, new_y)) {
+            new_y -= self.velocity.y * delta;
+            self.velocity.y *= -uniform(rng, self.bounce[1]);
+        }
+
+        self.pos = Vec2::new(new_x, new_y);
         self.size -= self.size_decay * delta;
     }
+
+    pub fn alive(&self) -> bool {
+        self.size > 0.2
+    }
 }
@@ -0,0 +1,122 @@
+use std::{
+    ffi::CStr,
+    mem::{offset_of, size_of},
+    os::raw::{c_int, c_void},
+    ptr,
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        Arc,
+    },
+};
+
+use pyo3::{exceptions::PyBufferError, ffi, prelude::*};
+
+use crate::{particle::Particle, particle_manager::ParticleManager};
+
+#[derive(Clone, Copy)]
+pub enum ParticleField {
+    Pos,
+    Size,
+    Color,
+    CacheId,
+}
+
+impl ParticleField {
+    /// `(offset inside a particle, format, item size, items per particle)`.
+    fn layout(self) -> (usize, &'static CStr, usize, usize) {
+        match self {
+            Self::Pos => (offset_of!(Particle, pos), c"d", 8, 2),
+            Self::Size => (offset_of!(Particle, size), c"d", 8, 1),
+            Self::Color => (offset_of!(Particle, color), c"B", 1, 3),
+            Self::CacheId => (offset_of!(Particle, cache_id), c"I", 4, 1),
+        }
+    }
+}
+
+/// Read only view of one field of every particle in a `ParticleManager`, exposed through the buffer protocol.
+/// `numpy.asarray` and `memoryview` read the particles in place, without copying them.
+///
+/// A buffer covers the particles there were when it was taken, so take a new one after they change.
+/// The manager can't grow past its capacity while any buffer is held.
+#[pyclass(frozen)]
+pub struct ParticleArray {
+    manager: Py<ParticleManager>,
+    field: ParticleField,
+    exports: Arc<AtomicUsize>,
+}
+
+impl ParticleArray {
+    pub fn new(manager: &Bound<'_, ParticleManager>, field: ParticleField) -> PyResult<Self> {
+        Ok(Self {
+            manager: manager.clone().unbind(),
+            field,
+            exports: manager.try_borrow()?.exports(),
+        })
+    }
+}
+
+#[pymethods]
+impl ParticleArray {
+    pub fn __len__(&self, py: Python<'_>) -> PyResult<usize> {
+        Ok(self.manager.bind(py).try_borrow()?.particles().len())
+    }
+
+    unsafe fn __getbuffer__(slf: Bound<'_, Self>, view: *mut ffi::Py_buffer, flags: c_int) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("Particle arrays are read only"));
+        }
+
+        // Values are spread out over the particles, so consumers have to follow the strides
+        let contiguous = (ffi::PyBUF_C_CONTIGUOUS | ffi::PyBUF_F_CONTIGUOUS | ffi::PyBUF_ANY_CONTIGUOUS) & !ffi::PyBUF_STRIDES;
+        if (flags & ffi::PyBUF_STRIDES) != ffi::PyBUF_STRIDES || (flags & contiguous) != 0 {
+            return Err(PyBufferError::new_err("Particle arrays are strided"));
+        }
+
+        let this = slf.get();
+        let manager = this.manager.bind(slf.py()).try_borrow()?;
+        let particles = manager.particles();
+
+        let (offset, format, item_size, columns) = this.field.layout();
+        let rows = particles.len();
+
+        // `[rows, columns, row stride, column stride]`, freed in `__releasebuffer__`
+        let layout = Box::into_raw(Box::new([
+            rows as isize,
+            columns as isize,
+            size_of::<Particle>() as isize,
+            item_size as isize,
+        ])) as *mut isize;
+
+        (*view).buf = particles.as_ptr().cast::<u8>().add(offset) as *mut c_void;
+        (*view).len = (rows * columns * item_size) as isize;
+        (*view).readonly = 1;
+        (*view).itemsize = item_size as isize;
+
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            format.as_ptr() as *mut _
+        } else {
+            ptr::null_mut()
+        };
+
+        (*view).ndim = if columns == 1 { 1 } else { 2 };
+        (*view).shape = layout;
+        (*view).strides = layout.add(2);
+        (*view).suboffsets = ptr::null_mut();
+        (*view).internal = layout as *mut c_void;
+
+        this.exports.fetch_add(1, Ordering::SeqCst);
+
+        // Keeps the manager alive while the view exists
+        (*view).obj = slf.into_any().into_ptr();
+
+        Ok(())
+    }
+
+    unsafe fn __releasebuffer__(&self, view: *mut ffi::Py_buffer) {
+        drop(Box::from_raw((*view).internal as *mut [isize; 4]));
+        self.exports.fetch_sub(1, Ordering::SeqCst);
+    }
+}
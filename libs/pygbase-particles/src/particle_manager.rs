@@ -1,63 +1,259 @@
-use std::collections::HashMap;
+use std::{
+    collections::{BTreeMap, HashMap},
+    sync::{
+        atomic::{AtomicUsize, Ordering},
+        Arc,
+    },
+};
 
-use pyo3::{prelude::*, types::PyList};
-use rand::{rngs::SmallRng, SeedableRng};
+use pyo3::{exceptions::PyBufferError, prelude::*, types::PyList};
+use rand::SeedableRng;
+use rand_chacha::ChaCha8Rng;
 
 use crate::{
+    affectors::Affector,
+    colliders::Rect,
+    grid::{cells_in_range, covered_chunks, get_chunk, ColliderGrid, ParticleGrid},
     particle::Particle,
-    particle_spawners::{point_spawner::PointSpawner, ParticleSpawnData, ParticleSpawner},
-    utils::vec2::Vec2,
+    particle_arrays::{ParticleArray, ParticleField},
+    particle_settings::ParticleSettings,
+    particle_spawners::{
+        circle_spawner::CircleSpawner, point_spawner::PointSpawner, rect_spawner::RectSpawner,
+        ParticleSpawner, SpawnerBase,
+    },
+    utils::{pool::WorkerPool, vec2::Vec2},
 };
 
+/// What happens when a particle gets added to a full manager, see `ParticleOverflow` in pygbase.
+#[derive(Clone, Copy, PartialEq)]
+enum Overflow {
+    Grow,
+    DropNew,
+    DropOldest,
+}
+
 #[pyclass]
 pub struct ParticleManager {
-    particles: Vec<Particle>,
-    rng: SmallRng,
-    spawners: HashMap<usize, Box<dyn ParticleSpawner>>,
+    particles: Vec<Particle>, // Only reallocated when growing past `capacity`, as `ParticleArray`s point into it
+    exports: Arc<AtomicUsize>, // Buffers currently taken from `ParticleArray`s
+    rng: ChaCha8Rng,
+    spawners: BTreeMap<usize, Box<dyn ParticleSpawner>>, // Ordered, so spawners always use the generator in the same order
     next_spawner_id: usize,
+    settings: HashMap<String, Arc<ParticleSettings>>,
+
+    chunk_size: f64,
+    capacity: usize,
+    overflow: Overflow,
+    // With `DropOldest`, new particles replace the oldest ones in place once the manager is full.
+    // Particles are oldest first from here, wrapping around, until `step` rotates them back in order.
+    oldest: usize,
+
+    // Flattened particle image caches, `image_start[cache_id] + size` indexes into `images`
+    images: Vec<Py<PyAny>>,
+    image_start: Vec<usize>,
+    image_length: Vec<usize>,
+
+    grid: ParticleGrid,
+    colliders: ColliderGrid,
+    affectors: Vec<Affector>,
+
+    threads: usize,
+    pool: Option<WorkerPool>, // Kept between updates, `None` with a single thread
 }
 
+/// Fewest particles worth handing to another worker thread.
+const MIN_PARTICLES_PER_WORKER: usize = 2048;
+
 #[pymethods]
 impl ParticleManager {
     #[new]
-    pub fn new() -> Self {
-        Self {
-            particles: Vec::new(),
-            rng: SmallRng::from_rng(&mut rand::rng()),
-            spawners: HashMap::new(),
+    /// `threads` is how many workers `update` can split particles across, 0 uses every core.
+    /// With a `seed`, the same inputs replay the same particles, as long as `threads` stays the same.
+    #[pyo3(signature=(chunk_size=400.0, capacity=4096, overflow="grow", threads=1, seed=None))]
+    pub fn new(
+        chunk_size: f64,
+        capacity: usize,
+        overflow: &str,
+        threads: usize,
+        seed: Option<u64>,
+    ) -> PyResult<Self> {
+        let overflow = match overflow {
+            "grow" => Overflow::Grow,
+            "drop_new" => Overflow::DropNew,
+            "drop_oldest" => Overflow::DropOldest,
+            _ => {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                    "Unknown overflow policy: {overflow}"
+                )))
+            }
+        };
+
+        let capacity = capacity.max(1);
+
+        Ok(Self {
+            particles: Vec::with_capacity(capacity),
+            exports: Arc::new(AtomicUsize::new(0)),
+            rng: match seed {
+                Some(seed) => ChaCha8Rng::seed_from_u64(seed),
+                None => ChaCha8Rng::from_rng(&mut rand::rng()),
+            },
+            spawners: BTreeMap::new(),
             next_spawner_id: 0,
+            settings: HashMap::new(),
+            chunk_size,
+            capacity,
+            overflow,
+            oldest: 0,
+            images: Vec::new(),
+            image_start: Vec::new(),
+            image_length: Vec::new(),
+            grid: ParticleGrid::new(),
+            colliders: ColliderGrid::new(chunk_size),
+            affectors: Vec::new(),
+            threads,
+            pool: build_pool(threads),
+        })
+    }
+
+    /// Registers a named particle preset, mirroring `Common.add_particle_setting`.
+    /// `styles` are the `(cache_id, color)` pairs to pick from. Replaces any preset with the same name.
+    pub fn add_particle_setting(
+        &mut self,
+        name: String,
+        styles: Vec<(u32, (u8, u8, u8))>,
+        size: (f64, f64),
+        size_decay: (f64, f64),
+        velocity_decay: (f64, f64),
+        gravity: (f64, f64),
+        effector: bool,
+        bounce: ((f64, f64), (f64, f64)),
+    ) -> PyResult<()> {
+        if styles.is_empty() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "At least one style is needed",
+            ));
         }
+
+        self.settings.insert(
+            name,
+            Arc::new(ParticleSettings {
+                styles,
+                size,
+                size_decay,
+                velocity_decay,
+                gravity,
+                effector,
+                bounce,
+            }),
+        );
+        Ok(())
     }
 
-    pub fn activate_spawner(&mut self, index: usize) -> PyResult<()> {
+    pub fn has_particle_setting(&self, name: &str) -> bool {
+        self.settings.contains_key(name)
+    }
+
+    #[pyo3(signature=(pos, cooldown, amount, start_active, setting, angle_range=(0.0, 360.0), velocity_range=(100.0, 200.0)))]
+    pub fn add_point_spawner(
+        &mut self,
+        pos: (f64, f64),
+        cooldown: f64,
+        amount: usize,
+        start_active: bool,
+        setting: &str,
+        angle_range: (f64, f64),
+        velocity_range: (f64, f64),
+    ) -> PyResult<usize> {
+        let base = SpawnerBase::new(pos, cooldown, amount, start_active, self.get_setting(setting)?);
+        Ok(self.add_spawner(Box::new(PointSpawner::new(base, angle_range, velocity_range))))
+    }
+
+    #[pyo3(signature=(
+        pos,
+        cooldown,
+        amount,
+        radius,
+        start_active,
+        setting,
+        spawn_velocity=(0.0, 0.0),
+        linear_velocity_range=((0.0, 0.0), (0.0, 0.0)),
+        radial_velocity_range=(0.0, 0.0),
+        radial_offset_range=(0.0, 0.0),
+    ))]
+    pub fn add_circle_spawner(
+        &mut self,
+        pos: (f64, f64),
+        cooldown: f64,
+        amount: usize,
+        radius: f64,
+        start_active: bool,
+        setting: &str,
+        spawn_velocity: (f64, f64),
+        linear_velocity_range: ((f64, f64), (f64, f64)),
+        radial_velocity_range: (f64, f64),
+        radial_offset_range: (f64, f64),
+    ) -> PyResult<usize> {
+        let base = SpawnerBase::new(pos, cooldown, amount, start_active, self.get_setting(setting)?);
+        Ok(self.add_spawner(Box::new(CircleSpawner::new(
+            base,
+            radius,
+            spawn_velocity,
+            linear_velocity_range,
+            radial_velocity_range,
+            radial_offset_range,
+        ))))
+    }
+
+    pub fn add_rect_spawner(
+        &mut self,
+        pos: (f64, f64),
+        cooldown: f64,
+        amount: usize,
+        size: (f64, f64),
+        start_active: bool,
+        setting: &str,
+    ) -> PyResult<usize> {
+        let base = SpawnerBase::new(pos, cooldown, amount, start_active, self.get_setting(setting)?);
+        Ok(self.add_spawner(Box::new(RectSpawner::new(base, size))))
+    }
+
+    pub fn remove_spawner(&mut self, index: usize) -> PyResult<()> {
         self.spawners
-            .get_mut(&index)
-            .map(|s| s.activate())
+            .remove(&index)
             .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(index.to_string()))?;
         Ok(())
     }
 
+    pub fn activate_spawner(&mut self, index: usize) -> PyResult<()> {
+        self.spawner_base(index)?.set_active(true);
+        Ok(())
+    }
+
     pub fn deactivate_spawner(&mut self, index: usize) -> PyResult<()> {
-        self.spawners
-            .get_mut(&index)
-            .map(|s| s.deactivate())
-            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(index.to_string()))?;
+        self.spawner_base(index)?.set_active(false);
         Ok(())
     }
 
-    #[pyo3(signature=(pos, cooldown, amount, start_active, radial_vel_range=(0.0, 0.0)))]
-    pub fn add_point_spawner(
+    /// Moves a spawner, sets whether it is active and updates what it spawns,
+    /// so the Python spawner can be synced with one call per frame.
+    pub fn set_spawner_state(
         &mut self,
+        index: usize,
         pos: (f64, f64),
-        cooldown: f64,
+        active: bool,
         amount: usize,
-        start_active: bool,
-        radial_vel_range: (f64, f64),
-    ) -> usize {
-        let spawner = PointSpawner::new(pos, cooldown, amount, start_active, radial_vel_range);
-        self.add_spawner(Box::new(spawner))
+        cooldown: f64,
+        setting: &str,
+    ) -> PyResult<()> {
+        let settings = self.get_setting(setting)?;
+        let base = self.spawner_base(index)?;
+        base.pos = Vec2::from_tuple(pos);
+        base.set_active(active);
+        base.set_spawning(amount, cooldown, settings);
+        Ok(())
     }
 
+    #[pyo3(signature=(pos, vel, vel_decay, gravity, effector, size, size_decay, color, bounce=((0.0, 0.0), (0.0, 0.0)), cache_id=0))]
     pub fn add_particle(
         &mut self,
         pos: (f64, f64),
@@ -68,70 +264,342 @@ impl ParticleManager {
         size: f64,
         size_decay: f64,
         color: (u8, u8, u8),
-    ) {
-        self.particles.push(Particle::new(
-            Vec2::from_tuple(pos),
-            Vec2::from_tuple(vel),
-            vel_decay,
-            Vec2::from_tuple(gravity),
-            effector,
-            size,
-            size_decay,
-            color,
-        ));
-    }
-
-    pub fn update(&mut self, delta: f64) {
-        // Let every spawner emit new particles.
-        let mut new_particles = Vec::new();
-        for spawner in self.spawners.values_mut() {
-            new_particles.extend(spawner.update(delta, &mut self.rng));
+        bounce: ((f64, f64), (f64, f64)),
+        cache_id: u32,
+    ) -> PyResult<()> {
+        if self.make_room(1)? == 1 {
+            self.insert([Particle {
+                pos: Vec2::from_tuple(pos),
+                velocity: Vec2::from_tuple(vel),
+                velocity_decay: vel_decay,
+                gravity: Vec2::from_tuple(gravity),
+                effector,
+                size,
+                size_decay,
+                color: [color.0, color.1, color.2],
+                bounce: [bounce.0, bounce.1],
+                cache_id,
+            }]);
         }
-        for p in new_particles {
-            self.add_particle_from_data(p);
+        Ok(())
+    }
+
+    /// Adds a burst of particles from a preset registered with `add_particle_setting`.
+    #[pyo3(signature=(setting, positions, velocities=None))]
+    pub fn add_particles(
+        &mut self,
+        setting: &str,
+        positions: Vec<[f64; 2]>,
+        velocities: Option<Vec<[f64; 2]>>,
+    ) -> PyResult<()> {
+        let settings = self.get_setting(setting)?;
+        if let Some(velocities) = &velocities {
+            if velocities.len() != positions.len() {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "Positions and velocities have different lengths",
+                ));
+            }
         }
 
-        // Update existing particles.
-        for particle in &mut self.particles {
-            particle.update(delta);
+        // When dropping the oldest particles, the newest of the burst are kept
+        let amount = self.make_room(positions.len())?;
+        let start = if self.overflow == Overflow::DropOldest {
+            positions.len() - amount
+        } else {
+            0
+        };
+
+        let mut particles = Vec::with_capacity(amount);
+        for index in start..start + amount {
+            let [x, y] = positions[index];
+            let [vel_x, vel_y] = velocities.as_ref().map_or([0.0, 0.0], |v| v[index]);
+
+            particles.push(settings.create(&mut self.rng, Vec2::new(x, y), Vec2::new(vel_x, vel_y)));
         }
 
-        // Drop particles that have effectively disappeared.
-        self.particles.retain(|p| p.size > 0.2);
+        self.insert(particles);
+        Ok(())
     }
 
-    pub fn particle_positions<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
-        let data: Vec<(f64, f64)> = self.particles.iter().map(|p| (p.pos.x, p.pos.y)).collect();
-        PyList::new(py, data)
+    pub fn clear(&mut self) {
+        self.particles.clear();
+        self.oldest = 0;
+        self.grid.invalidate();
+    }
+
+    pub fn __len__(&self) -> usize {
+        self.particles.len()
+    }
+
+    /// Rects are `(left, top, right, bottom, truncate)`, with `truncate` set for integer pygame `Rect`s.
+    pub fn set_colliders(&mut self, colliders: Vec<(f64, f64, f64, f64, bool)>) {
+        self.colliders
+            .set_static(colliders.into_iter().map(Rect::from_tuple).collect());
+    }
+
+    /// Rects are `(left, top, right, bottom, truncate)`, with `truncate` set for integer pygame `Rect`s.
+    pub fn set_dynamic_colliders(&mut self, colliders: Vec<(f64, f64, f64, f64, bool)>) {
+        self.colliders
+            .set_dynamic(colliders.into_iter().map(Rect::from_tuple).collect());
+    }
+
+    pub fn clear_affectors(&mut self) {
+        self.affectors.clear();
+    }
+
+    pub fn add_attractor(&mut self, pos: (f64, f64), radius: f64, strength: f64) {
+        self.affectors.push(Affector::Attractor {
+            pos: Vec2::from_tuple(pos),
+            radius,
+            strength,
+        });
+    }
+
+    pub fn add_repulsor(&mut self, pos: (f64, f64), radius: f64, strength: f64) {
+        self.affectors.push(Affector::Repulsor {
+            pos: Vec2::from_tuple(pos),
+            radius,
+            strength,
+        });
+    }
+
+    pub fn add_vortex(&mut self, pos: (f64, f64), radius: f64, strength: f64) {
+        self.affectors.push(Affector::Vortex {
+            pos: Vec2::from_tuple(pos),
+            radius,
+            strength,
+        });
+    }
+
+    /// `bounds` is `(left, top, right, bottom)`.
+    pub fn add_drag_zone(&mut self, bounds: (f64, f64, f64, f64), drag: f64, wind: (f64, f64)) {
+        self.affectors.push(Affector::DragZone {
+            bounds,
+            drag,
+            wind: Vec2::from_tuple(wind),
+        });
+    }
+
+    /// `flow` holds `rows * columns` cells, row by row.
+    pub fn add_flow_field(
+        &mut self,
+        pos: (f64, f64),
+        cell_size: f64,
+        columns: usize,
+        rows: usize,
+        flow: Vec<(f64, f64)>,
+        strength: f64,
+    ) -> PyResult<()> {
+        if flow.len() != columns * rows {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "Flow field needs `columns * rows` cells",
+            ));
+        }
+
+        self.affectors.push(Affector::FlowField {
+            pos: Vec2::from_tuple(pos),
+            cell_size,
+            columns,
+            rows,
+            flow: flow.into_iter().map(Vec2::from_tuple).collect(),
+            strength,
+        });
+        Ok(())
+    }
+
+    pub fn set_threads(&mut self, threads: usize) {
+        if threads != self.threads {
+            self.threads = threads;
+            self.pool = build_pool(threads);
+        }
     }
 
-    pub fn particle_sizes<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
-        let data: Vec<f64> = self.particles.iter().map(|p| p.size).collect();
-        PyList::new(py, data)
+    /// Runs without the GIL, so other Python threads can run alongside it.
+    pub fn update(&mut self, py: Python<'_>, delta: f64) -> PyResult<()> {
+        py.allow_threads(|| self.step(delta))
     }
 
-    pub fn particle_colors<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
-        let data: Vec<(u8, u8, u8)> = self
-            .particles
-            .iter()
-            .map(|p| (p.color.0, p.color.1, p.color.2))
-            .collect();
-        PyList::new(py, data)
+    /// Occupied `(column, row)` chunks.
+    pub fn particle_chunks(&mut self) -> Vec<(i64, i64)> {
+        self.grid.cells(&self.particles, self.chunk_size).keys().copied().collect()
+    }
+
+    /// Indices of particles in the chunks from `(left, top)` to `(right, bottom)`, inclusive.
+    pub fn particles_in_chunks(&mut self, left: i64, top: i64, right: i64, bottom: i64) -> Vec<usize> {
+        self.grid
+            .query(&self.particles, self.chunk_size, ((left, top), (right, bottom)))
+    }
+
+    /// `(pos, velocity, size, effector)` of a single particle.
+    pub fn get_particle(&self, index: usize) -> PyResult<((f64, f64), (f64, f64), f64, bool)> {
+        let p = self.particles.get(index).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyIndexError, _>(index.to_string())
+        })?;
+        Ok((p.pos.into(), p.velocity.into(), p.size, p.effector))
+    }
+
+    pub fn set_particle_pos(&mut self, index: usize, pos: (f64, f64)) -> PyResult<()> {
+        self.particle_mut(index)?.pos = Vec2::from_tuple(pos);
+        self.grid.invalidate();
+        Ok(())
+    }
+
+    pub fn set_particle_velocity(&mut self, index: usize, velocity: (f64, f64)) -> PyResult<()> {
+        self.particle_mut(index)?.velocity = Vec2::from_tuple(velocity);
+        Ok(())
+    }
+
+    pub fn set_particle_size(&mut self, index: usize, size: f64) -> PyResult<()> {
+        self.particle_mut(index)?.size = size;
+        Ok(())
+    }
+
+    /// Registers the surfaces used by `build_blits`, see `ParticleImageTable` in pygbase.
+    pub fn set_images(
+        &mut self,
+        images: Vec<Py<PyAny>>,
+        image_start: Vec<usize>,
+        image_length: Vec<usize>,
+    ) -> PyResult<()> {
+        if image_start.len() != image_length.len()
+            || image_start
+                .iter()
+                .zip(&image_length)
+                .any(|(start, length)| *length == 0 || start + length > images.len())
+        {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "Image ranges do not fit the images",
+            ));
+        }
+
+        self.images = images;
+        self.image_start = image_start;
+        self.image_length = image_length;
+        Ok(())
+    }
+
+    /// Builds the `Surface.fblits` sequence for the particles inside `view`.
+    ///
+    /// `origin` is the world position of the surface's top left corner,
+    /// `view` is the world space `(left, top, right, bottom)` of particles to draw.
+    pub fn build_blits<'py>(
+        &mut self,
+        py: Python<'py>,
+        origin: (f64, f64),
+        view: (f64, f64, f64, f64),
+    ) -> PyResult<Bound<'py, PyList>> {
+        let (left, top, right, bottom) = view;
+
+        // Only particles in chunks overlapping the view get checked
+        let visible_chunks = covered_chunks(view, self.chunk_size);
+
+        let mut blits = Vec::new();
+        for index in self.grid.query(&self.particles, self.chunk_size, visible_chunks) {
+            let p = &self.particles[index];
+            if !(left <= p.pos.x && p.pos.x < right && top <= p.pos.y && p.pos.y < bottom) {
+                continue;
+            }
+
+            let cache_id = p.cache_id as usize;
+            let (Some(start), Some(length)) = (self.image_start.get(cache_id), self.image_length.get(cache_id)) else {
+                return Err(PyErr::new::<pyo3::exceptions::PyIndexError, _>(format!(
+                    "No images registered for cache id {cache_id}"
+                )));
+            };
+
+            let size = (p.size as usize).min(length - 1);
+
+            // Same as `Particle.get_blit_pair`, rounding half to even like Python's `round`
+            let half_size = (p.size / 2.0).round_ties_even();
+            blits.push((
+                self.images[start + size].clone_ref(py),
+                (
+                    (p.pos.x - half_size - origin.0).round_ties_even() as i64,
+                    (p.pos.y - half_size - origin.1).round_ties_even() as i64,
+                ),
+            ));
+        }
+
+        PyList::new(py, blits)
+    }
+
+    /// `(n, 2)` doubles, read in place through the buffer protocol.
+    pub fn particle_positions(slf: &Bound<'_, Self>) -> PyResult<ParticleArray> {
+        ParticleArray::new(slf, ParticleField::Pos)
+    }
+
+    /// `n` doubles, read in place through the buffer protocol.
+    pub fn particle_sizes(slf: &Bound<'_, Self>) -> PyResult<ParticleArray> {
+        ParticleArray::new(slf, ParticleField::Size)
+    }
+
+    /// `(n, 3)` bytes, read in place through the buffer protocol.
+    pub fn particle_colors(slf: &Bound<'_, Self>) -> PyResult<ParticleArray> {
+        ParticleArray::new(slf, ParticleField::Color)
+    }
+
+    /// `n` unsigned ints, read in place through the buffer protocol.
+    pub fn particle_cache_ids(slf: &Bound<'_, Self>) -> PyResult<ParticleArray> {
+        ParticleArray::new(slf, ParticleField::CacheId)
     }
 }
 
 impl ParticleManager {
-    fn add_particle_from_data(&mut self, data: ParticleSpawnData) {
-        self.add_particle(
-            data.pos,
-            data.vel,
-            data.vel_decay,
-            data.gravity,
-            data.effector,
-            data.size,
-            data.size_decay,
-            data.color,
-        );
+    pub fn particles(&self) -> &[Particle] {
+        &self.particles
+    }
+
+    pub fn exports(&self) -> Arc<AtomicUsize> {
+        self.exports.clone()
+    }
+
+    fn add_spawned(&mut self, particles: Vec<Particle>) -> PyResult<()> {
+        // Same overflow handling as a burst from `add_particles`
+        let amount = self.make_room(particles.len())?;
+        let skip = if self.overflow == Overflow::DropOldest {
+            particles.len() - amount
+        } else {
+            0
+        };
+
+        self.insert(particles.into_iter().skip(skip).take(amount));
+        Ok(())
+    }
+
+    /// Adds particles `make_room` made room for.
+    /// When full, each one replaces the oldest particle, instead of moving every other particle down.
+    fn insert(&mut self, particles: impl IntoIterator<Item = Particle>) {
+        let first = self.particles.len();
+        let mut replaced = false;
+
+        for particle in particles {
+            if self.particles.len() < self.capacity {
+                self.particles.push(particle);
+            } else {
+                self.particles[self.oldest] = particle;
+                self.oldest = (self.oldest + 1) % self.particles.len();
+                replaced = true;
+            }
+        }
+
+        if replaced {
+            self.grid.invalidate();
+        } else {
+            self.grid.extend(&self.particles, first, self.chunk_size);
+        }
+    }
+
+    fn get_setting(&self, name: &str) -> PyResult<Arc<ParticleSettings>> {
+        self.settings.get(name).cloned().ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyKeyError, _>(format!("Unknown particle setting: {name}"))
+        })
+    }
+
+    fn spawner_base(&mut self, index: usize) -> PyResult<&mut SpawnerBase> {
+        self.spawners
+            .get_mut(&index)
+            .map(|s| s.base())
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(index.to_string()))
     }
 
     fn add_spawner(&mut self, spawner: Box<dyn ParticleSpawner>) -> usize {
@@ -140,4 +608,128 @@ impl ParticleManager {
         self.next_spawner_id += 1;
         id
     }
+
+    /// Applies the overflow policy before adding `amount` particles.
+    /// Returns how many of them can be added.
+    fn make_room(&mut self, amount: usize) -> PyResult<usize> {
+        let free = self.capacity.saturating_sub(self.particles.len());
+        if amount <= free {
+            return Ok(amount);
+        }
+
+        match self.overflow {
+            Overflow::Grow => {
+                let mut capacity = self.capacity;
+                while capacity - self.particles.len() < amount {
+                    capacity *= 2;
+                }
+
+                if self.particles.capacity() < capacity {
+                    // Moving the particles would leave taken buffers pointing at freed memory
+                    if self.exports.load(Ordering::SeqCst) > 0 {
+                        return Err(PyBufferError::new_err(
+                            "Particle arrays have to be released before the manager can grow",
+                        ));
+                    }
+                    self.particles.reserve_exact(capacity - self.particles.len());
+                }
+
+                self.capacity = capacity;
+                Ok(amount)
+            }
+            Overflow::DropNew => Ok(free),
+            // `insert` replaces the oldest particles
+            Overflow::DropOldest => Ok(amount.min(self.capacity)),
+        }
+    }
+
+    fn step(&mut self, delta: f64) -> PyResult<()> {
+        // Let every spawner emit new particles.
+        let mut new_particles = Vec::new();
+        for spawner in self.spawners.values_mut() {
+            new_particles.extend(spawner.update(delta, &mut self.rng));
+        }
+        self.add_spawned(new_particles)?;
+
+        // The grid only gets rebuilt here if particles moved or got removed since the last frame
+        let chunk_size = self.chunk_size;
+        let cells = self.grid.cells(&self.particles, chunk_size);
+
+        // Fill in the colliders around every occupied chunk, so workers can share them
+        for chunk in cells.keys() {
+            self.colliders.neighbourhood(*chunk);
+        }
+
+        // Affectors only visit the particles in the chunks they cover
+        for affector in &self.affectors {
+            for cell in cells_in_range(cells, covered_chunks(affector.bounds(), chunk_size)) {
+                for &index in cell {
+                    affector.affect(delta, &mut self.particles[index]);
+                }
+            }
+        }
+
+        let colliders = &self.colliders;
+
+        let workers = self.worker_count();
+        if workers <= 1 {
+            update_particles(&mut self.particles, delta, chunk_size, colliders, &mut self.rng);
+        } else {
+            // Each worker gets its own generator, seeded from the shared one
+            let mut rngs: Vec<ChaCha8Rng> = (0..workers).map(|_| ChaCha8Rng::from_rng(&mut self.rng)).collect();
+            let per_worker = self.particles.len().div_ceil(workers);
+
+            let pool = self.pool.as_ref().expect("More than one worker needs a pool");
+            pool.run(self.particles.chunks_mut(per_worker).zip(rngs.iter_mut()).map(|(particles, rng)| {
+                Box::new(move || update_particles(particles, delta, chunk_size, colliders, rng))
+                    as Box<dyn FnOnce() + Send + '_>
+            }));
+        }
+
+        // Back to oldest first, which `retain` keeps
+        self.particles.rotate_left(self.oldest);
+        self.oldest = 0;
+
+        // Drop particles that have effectively disappeared.
+        self.particles.retain(|p| p.alive());
+        self.grid.invalidate();
+        Ok(())
+    }
+
+    fn worker_count(&self) -> usize {
+        let threads = self.pool.as_ref().map_or(1, WorkerPool::size);
+        threads.min(self.particles.len() / MIN_PARTICLES_PER_WORKER).max(1)
+    }
+
+    fn particle_mut(&mut self, index: usize) -> PyResult<&mut Particle> {
+        self.particles
+            .get_mut(index)
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyIndexError, _>(index.to_string()))
+    }
+}
+
+/// Worker threads for `threads`, 0 uses every core.
+fn build_pool(threads: usize) -> Option<WorkerPool> {
+    let threads = if threads == 0 {
+        std::thread::available_parallelism().map_or(1, |n| n.get())
+    } else {
+        threads
+    };
+
+    (threads > 1).then(|| WorkerPool::new(threads))
+}
+
+/// Moves a run of particles.
+/// Particles only collide with the colliders around their chunk.
+fn update_particles(
+    particles: &mut [Particle],
+    delta: f64,
+    chunk_size: f64,
+    colliders: &ColliderGrid,
+    rng: &mut ChaCha8Rng,
+) {
+    for particle in particles {
+        let chunk = get_chunk(particle.pos, chunk_size);
+        particle.update(delta, colliders.cached_neighbourhood(chunk), rng);
+    }
 }
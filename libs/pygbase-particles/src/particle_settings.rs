@@ -0,0 +1,43 @@
+use rand::Rng;
+use rand_chacha::ChaCha8Rng;
+
+use crate::{
+    particle::Particle,
+    utils::{random::uniform, vec2::Vec2},
+};
+
+/// Named particle preset, mirroring `Common.add_particle_setting`.
+/// Each particle samples its size, decays and style from the ranges.
+pub struct ParticleSettings {
+    /// `(cache_id, color)` pairs to pick from.
+    pub styles: Vec<(u32, (u8, u8, u8))>,
+    pub size: (f64, f64),
+    pub size_decay: (f64, f64),
+    pub velocity_decay: (f64, f64),
+    pub gravity: (f64, f64),
+    pub effector: bool,
+    pub bounce: ((f64, f64), (f64, f64)),
+}
+
+impl ParticleSettings {
+    pub fn create(&self, rng: &mut ChaCha8Rng, pos: Vec2, velocity: Vec2) -> Particle {
+        // Same order as `Particle.reset`
+        let size = uniform(rng, self.size);
+        let size_decay = uniform(rng, self.size_decay);
+        let (cache_id, color) = self.styles[rng.random_range(0..self.styles.len())];
+        let velocity_decay = uniform(rng, self.velocity_decay);
+
+        Particle {
+            pos,
+            velocity,
+            velocity_decay,
+            gravity: Vec2::from_tuple(self.gravity),
+            effector: self.effector,
+            size,
+            size_decay,
+            color: [color.0, color.1, color.2],
+            bounce: [self.bounce.0, self.bounce.1],
+            cache_id,
+        }
+    }
+}
@@ -0,0 +1,63 @@
+use rand_chacha::ChaCha8Rng;
+
+use crate::{
+    particle::Particle,
+    utils::{random::uniform, vec2::Vec2},
+};
+
+use super::{ParticleSpawner, SpawnerBase};
+
+pub struct CircleSpawner {
+    base: SpawnerBase,
+    radius: f64,
+    spawn_velocity: Vec2,
+    linear_velocity_range: ((f64, f64), (f64, f64)),
+    radial_velocity_range: (f64, f64),
+    radial_offset_range: (f64, f64),
+}
+
+impl CircleSpawner {
+    pub fn new(
+        base: SpawnerBase,
+        radius: f64,
+        spawn_velocity: (f64, f64),
+        linear_velocity_range: ((f64, f64), (f64, f64)),
+        radial_velocity_range: (f64, f64),
+        radial_offset_range: (f64, f64),
+    ) -> Self {
+        Self {
+            base,
+            radius,
+            spawn_velocity: Vec2::from_tuple(spawn_velocity),
+            linear_velocity_range,
+            radial_velocity_range,
+            radial_offset_range,
+        }
+    }
+}
+
+impl ParticleSpawner for CircleSpawner {
+    fn base(&mut self) -> &mut SpawnerBase {
+        &mut self.base
+    }
+
+    fn spawn(&self, rng: &mut ChaCha8Rng, origin: Vec2) -> Particle {
+        // Uniform over the area of the circle
+        let mut angle = uniform(rng, (0.0, 360.0)).to_radians();
+        let distance = uniform(rng, (0.0, self.radius * self.radius)).sqrt();
+        angle += uniform(rng, self.radial_offset_range); // Already in radians
+
+        let direction = Vec2::new(angle.cos(), angle.sin());
+
+        let velocity = direction * uniform(rng, self.radial_velocity_range)
+            + Vec2::new(
+                uniform(rng, self.linear_velocity_range.0),
+                uniform(rng, self.linear_velocity_range.1),
+            )
+            + self.spawn_velocity;
+
+        self.base
+            .settings
+            .create(rng, origin + direction * distance, velocity)
+    }
+}
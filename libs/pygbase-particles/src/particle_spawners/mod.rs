@@ -1,22 +1,99 @@
-use rand::rngs::SmallRng;
+use std::sync::Arc;
 
+use rand_chacha::ChaCha8Rng;
+
+use crate::{
+    particle::Particle,
+    particle_settings::ParticleSettings,
+    utils::{timer::Timer, vec2::Vec2},
+};
+
+pub mod circle_spawner;
 pub mod point_spawner;
+pub mod rect_spawner;
 
-pub trait ParticleSpawner: Send + Sync {
-    fn activate(&mut self);
-    fn deactivate(&mut self);
-    
-    fn spawn(&self, manager: &mut SmallRng) -> ParticleSpawnData;
-    fn update(&mut self, delta: f64, manager: &mut SmallRng) -> Vec<ParticleSpawnData>;
+/// State shared by every spawner, mirroring `ParticleSpawner` in pygbase.
+pub struct SpawnerBase {
+    active: bool,
+    pub pos: Vec2,
+    // Position at the last update, catch up bursts get spread along the path moved since
+    prev_pos: Vec2,
+    timer: Timer,
+    amount: usize,
+    pub settings: Arc<ParticleSettings>,
+}
+
+impl SpawnerBase {
+    pub fn new(
+        pos: (f64, f64),
+        cooldown: f64,
+        amount: usize,
+        start_active: bool,
+        settings: Arc<ParticleSettings>,
+    ) -> Self {
+        Self {
+            active: start_active,
+            pos: Vec2::from_tuple(pos),
+            prev_pos: Vec2::from_tuple(pos),
+            timer: Timer::new(cooldown, true, true, true),
+            amount,
+            settings,
+        }
+    }
+
+    pub fn set_active(&mut self, active: bool) {
+        if active && !self.active {
+            self.prev_pos = self.pos;
+        }
+
+        self.active = active;
+    }
+
+    pub fn set_spawning(&mut self, amount: usize, cooldown: f64, settings: Arc<ParticleSettings>) {
+        self.amount = amount;
+        self.timer.set_cooldown(cooldown);
+        self.settings = settings;
+    }
+
+    /// Ticks the timer, returning where each particle that is due should spawn.
+    fn tick(&mut self, delta: f64) -> Vec<Vec2> {
+        let mut origins = Vec::new();
+
+        self.timer.tick(delta);
+        if self.timer.done() {
+            let bursts = self.timer.times_done();
+
+            if bursts == 1 || self.prev_pos == self.pos {
+                origins.resize(self.amount * bursts, self.pos);
+            } else {
+                // Each burst spawns where the spawner was when its cooldown finished
+                for burst in 0..bursts {
+                    let origin = self.prev_pos.lerp(self.pos, (burst + 1) as f64 / bursts as f64);
+                    origins.extend(std::iter::repeat_n(origin, self.amount));
+                }
+            }
+        }
+
+        self.prev_pos = self.pos;
+        origins
+    }
 }
 
-pub struct ParticleSpawnData {
-    pub pos: (f64, f64),
-    pub vel: (f64, f64),
-    pub vel_decay: f64,
-    pub gravity: (f64, f64),
-    pub effector: bool,
-    pub size: f64,
-    pub size_decay: f64,
-    pub color: (u8, u8, u8),
+pub trait ParticleSpawner: Send + Sync {
+    fn base(&mut self) -> &mut SpawnerBase;
+
+    /// Creates a particle around `origin`.
+    fn spawn(&self, rng: &mut ChaCha8Rng, origin: Vec2) -> Particle;
+
+    fn update(&mut self, delta: f64, rng: &mut ChaCha8Rng) -> Vec<Particle> {
+        if !self.base().active {
+            return Vec::new();
+        }
+
+        let origins = self.base().tick(delta);
+        origins
+            .into_iter()
+            .map(|origin| self.spawn(rng, origin))
+            .collect()
+    }
 }
@@ -0,0 +1,31 @@
+use rand_chacha::ChaCha8Rng;
+
+use crate::{
+    particle::Particle,
+    utils::{random::uniform, vec2::Vec2},
+};
+
+use super::{ParticleSpawner, SpawnerBase};
+
+pub struct RectSpawner {
+    base: SpawnerBase,
+    size: (f64, f64),
+}
+
+impl RectSpawner {
+    pub fn new(base: SpawnerBase, size: (f64, f64)) -> Self {
+        Self { base, size }
+    }
+}
+
+impl ParticleSpawner for RectSpawner {
+    fn base(&mut self) -> &mut SpawnerBase {
+        &mut self.base
+    }
+
+    fn spawn(&self, rng: &mut ChaCha8Rng, origin: Vec2) -> Particle {
+        let offset = Vec2::new(uniform(rng, (0.0, self.size.0)), uniform(rng, (0.0, self.size.1)));
+
+        self.base.settings.create(rng, origin + offset, Vec2::new(0.0, 0.0))
+    }
+}
@@ -1,2 +1,4 @@
+pub mod pool;
+pub mod random;
 pub mod timer;
 pub mod vec2;
@@ -0,0 +1,94 @@
+use std::{
+    mem,
+    panic::{self, AssertUnwindSafe},
+    sync::{mpsc, Arc, Mutex},
+    thread::{self, JoinHandle},
+};
+
+type Job = Box<dyn FnOnce() + Send + 'static>;
+
+/// Long lived worker threads, so `ParticleManager::update` doesn't start new ones every frame.
+pub struct WorkerPool {
+    jobs: Option<mpsc::Sender<Job>>,
+    workers: Vec<JoinHandle<()>>,
+}
+
+impl WorkerPool {
+    pub fn new(size: usize) -> Self {
+        let (jobs, receiver) = mpsc::channel::<Job>();
+        let receiver = Arc::new(Mutex::new(receiver));
+
+        let workers = (0..size)
+            .map(|_| {
+                let receiver = Arc::clone(&receiver);
+                thread::spawn(move || loop {
+                    // The lock is released before the job runs
+                    let job = receiver.lock().unwrap().recv();
+                    match job {
+                        Ok(job) => job(),
+                        Err(_) => break, // The pool was dropped
+                    }
+                })
+            })
+            .collect();
+
+        Self {
+            jobs: Some(jobs),
+            workers,
+        }
+    }
+
+    pub fn size(&self) -> usize {
+        self.workers.len()
+    }
+
+    /// Runs the tasks on the workers and waits for all of them, like `std::thread::scope`.
+    /// If a task panics, the panic is passed on once the other tasks are done.
+    pub fn run<'a>(&self, tasks: impl IntoIterator<Item = Box<dyn FnOnce() + Send + 'a>>) {
+        let jobs = self.jobs.as_ref().expect("Worker pool has stopped");
+        // Collected first, so nothing can panic between sending jobs and waiting for them
+        let tasks: Vec<_> = tasks.into_iter().collect();
+
+        let (done, finished) = mpsc::channel();
+        let mut stopped = false;
+
+        for task in tasks {
+            let done = done.clone();
+            let job: Box<dyn FnOnce() + Send + 'a> = Box::new(move || {
+                let _ = done.send(panic::catch_unwind(AssertUnwindSafe(task)));
+            });
+
+            // SAFETY: Only the lifetime changes. Every job holds a `done` sender, and `run` doesn't return
+            // until all of them are dropped, so no job can outlive what its task borrows.
+            let job: Job = unsafe { mem::transmute::<Box<dyn FnOnce() + Send + 'a>, Job>(job) };
+
+            if jobs.send(job).is_err() {
+                stopped = true;
+                break;
+            }
+        }
+        drop(done);
+
+        let mut panicked = None;
+        for result in finished {
+            if let Err(payload) = result {
+                panicked.get_or_insert(payload);
+            }
+        }
+
+        if let Some(payload) = panicked {
+            panic::resume_unwind(payload);
+        }
+        assert!(!stopped, "Worker pool has stopped");
+    }
+}
+
+impl Drop for WorkerPool {
+    fn drop(&mut self) {
+        // Closing the channel ends every worker's loop
+        drop(self.jobs.take());
+        for worker in self.workers.drain(..) {
+            let _ = worker.join();
+        }
+    }
+}
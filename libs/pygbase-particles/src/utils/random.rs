@@ -0,0 +1,6 @@
+use rand::Rng;
+
+/// Same as Python's `random.uniform`, the range may be empty or reversed.
+pub fn uniform<R: Rng>(rng: &mut R, range: (f64, f64)) -> f64 {
+    range.0 + (range.1 - range.0) * rng.random::<f64>()
+}
@@ -1,20 +1,25 @@
 pub struct Timer {
     cooldown: f64,
     repeating: bool,
+    catch_up: bool,
     time: f64,
     is_done: bool,
     is_just_done: bool,
+    times_done: usize,
 }
 
 #[allow(dead_code)]
 impl Timer {
-    pub fn new(cooldown: f64, start_done: bool, repeating: bool) -> Self {
+    /// With `catch_up`, repeating timers count every cooldown that elapsed during a tick (see `times_done`).
+    pub fn new(cooldown: f64, start_done: bool, repeating: bool, catch_up: bool) -> Self {
         Self {
             cooldown,
             repeating,
+            catch_up,
             time: if start_done { 0.0 } else { cooldown },
             is_done: start_done,
             is_just_done: start_done,
+            times_done: if start_done { 1 } else { 0 },
         }
     }
 
@@ -28,9 +33,16 @@ impl Timer {
         if self.repeating {
             self.is_done = false;
             self.is_just_done = false;
+            self.times_done = 0;
 
             if self.time < 0.0 {
-                self.time += self.cooldown;
+                self.times_done = if self.catch_up && self.cooldown > 0.0 {
+                    (-self.time / self.cooldown).floor() as usize + 1
+                } else {
+                    1
+                };
+
+                self.time += self.cooldown * self.times_done as f64;
                 self.is_done = true;
                 self.is_just_done = true;
             }
@@ -52,12 +64,14 @@ impl Timer {
         self.time = self.cooldown;
         self.is_done = false;
         self.is_just_done = false;
+        self.times_done = 0;
     }
 
     pub fn finish(&mut self) {
         self.time = 0.0;
         self.is_done = true;
         self.is_just_done = true;
+        self.times_done = 1;
     }
     pub fn done(&self) -> bool {
         self.is_done
@@ -66,4 +80,9 @@ impl Timer {
     pub fn just_done(&self) -> bool {
         self.is_just_done
     }
+
+    /// Number of times a repeating timer finished during the last tick.
+    pub fn times_done(&self) -> usize {
+        self.times_done
+    }
 }
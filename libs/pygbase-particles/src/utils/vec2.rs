@@ -1,6 +1,7 @@
 use std::ops::{Add, AddAssign, Mul, MulAssign, Sub, SubAssign};
 
-#[derive(Clone, Copy)]
+#[derive(Clone, Copy, PartialEq)]
+#[repr(C)]
 pub struct Vec2 {
     pub x: f64,
     pub y: f64,
@@ -19,6 +20,14 @@ impl Vec2 {
     pub fn length(&self) -> f64 {
         (self.x.powi(2) + self.y.powi(2)).sqrt()
     }
+
+    pub fn length_squared(&self) -> f64 {
+        self.x * self.x + self.y * self.y
+    }
+
+    pub fn lerp(&self, other: Vec2, amount: f64) -> Vec2 {
+        *self + (other - *self) * amount
+    }
 }
 
 impl Into<(f64, f64)> for Vec2 {
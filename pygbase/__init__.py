@@ -47,7 +47,12 @@ def init(
 	max_shadow_radius: int = 50,
 	light_radius_interval: int = 2,
 	shadow_ratio: float = 1,
+	lighting_cache_dir: str | None = None,
 ):
+	"""
+	:param lighting_cache_dir: Directory to keep generated light and shadow gradients in between runs
+	"""
+
 	logging.basicConfig(level=logging_level, format="%(asctime)s - %(levelname)s - %(message)s")
 
 	pygame.init()
@@ -62,7 +67,7 @@ def init(
 	Input.register_handlers()
 
 	lighting.init_lighting_system(
-		max_light_radius, max_shadow_radius, light_radius_interval, shadow_ratio
+		max_light_radius, max_shadow_radius, light_radius_interval, shadow_ratio, cache_dir=lighting_cache_dir
 	)
 
 	Debug.init()
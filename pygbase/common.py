@@ -37,6 +37,7 @@ class Common:
 			ParticleOptions.BOUNCE: ((0.0, 0.1), (0.0, 0.1)),
 		}
 	}
+	_largest_particle_size: float | None = None  # Worked out again after settings get added
 
 	@classmethod
 	def set(cls, name: str, value: Any):
@@ -106,6 +107,7 @@ class Common:
 				ParticleOptions.EFFECTOR: effector,
 				ParticleOptions.BOUNCE: bounce,
 			}
+			cls._largest_particle_size = None
 		else:
 			logging.warning(f"Particle setting name: `{name}` already taken")
 
@@ -124,3 +126,14 @@ class Common:
 	@classmethod
 	def get_particle_settings(cls) -> dict[str, dict["ParticleOptions", str | list[pygame.typing.ColorLike] | tuple | bool]]:
 		return cls._particle_settings
+
+	@classmethod
+	def get_largest_particle_size(cls) -> float:
+		"""Largest size a particle of any setting can start with"""
+
+		if cls._largest_particle_size is None:
+			cls._largest_particle_size = max(
+				(settings[ParticleOptions.SIZE][1] for settings in cls._particle_settings.values()), default=0
+			)
+
+		return cls._largest_particle_size
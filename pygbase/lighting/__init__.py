@@ -1,6 +1,7 @@
-import pygame
+from typing import Sequence
 
 import pygbase
+from .gradients import GradientCache
 from .light import Light
 from .lighting_manager import LightingManager
 from .shadow import Shadow
@@ -9,73 +10,39 @@ __all__ = ["Light", "LightingManager", "Shadow"]
 
 
 def init_lighting_system(
-	max_light_radius: int, max_shadow_radius: int, interval: int, shadow_ratio: float
+	max_light_radius: int,
+	max_shadow_radius: int,
+	interval: int,
+	shadow_ratio: float,
+	warm_up_light_radii: Sequence[float] = (),
+	warm_up_shadow_sizes: Sequence[float] = (),
+	cache_dir: str | None = None,
 ):
+	"""
+	Gradients are generated the first time each radius is used.
+	:param warm_up_light_radii: Light radii to generate right away
+	:param warm_up_shadow_sizes: Shadow sizes to generate right away
+	:param cache_dir: Directory to keep generated gradients in between runs
+	"""
+
 	pygbase.Common.set("max_light_radius", max_light_radius)
 	pygbase.Common.set("lighting_radius_interval", interval)
 	pygbase.Common.set("shadow_ratio", shadow_ratio)
 
-	generate_lights(max_light_radius, interval)
-	generate_shadows(max_shadow_radius, interval, shadow_ratio)
-
-
-def generate_lights(max_radius: int, interval: int, power: float = 1.4):
-	lights = Light.cached_lights
-
-	# Create largest light surface
-	max_light_surf = pygame.Surface((max_radius * 2, max_radius * 2), flags=pygame.SRCALPHA)
-	for inner in range(max_radius, 0, -1):
-		factor = 1 - (inner / max_radius) ** power
-		colour = int(255 * factor)
-
-		pygame.draw.circle(
-			max_light_surf, (colour, colour, colour, colour), (max_radius, max_radius), inner
-		)
-
-	lights.append(max_light_surf)
-
-	# Generate the rest based on max (and shrink the reference every so often for performance)
-	reference_surface = max_light_surf
-	for radius in range(max_radius - 1, 0, -interval):
-		new_light_surf = pygame.transform.smoothscale(reference_surface, (radius * 2, radius * 2))
-		lights.append(new_light_surf)
+	generate_lights(max_light_radius, interval, cache_dir=cache_dir)
+	generate_shadows(max_shadow_radius, interval, shadow_ratio, cache_dir=cache_dir)
 
-		if radius <= int((reference_surface.get_width() * 0.75) / 2):
-			reference_surface = new_light_surf
+	Light.cached_lights.warm_up(int(radius / interval) - 1 for radius in warm_up_light_radii)
+	Shadow.cached_shadows.warm_up(int(size / interval) for size in warm_up_shadow_sizes)
 
-	lights.reverse()
 
+def generate_lights(max_radius: int, interval: int, power: float = 1.4, cache_dir: str | None = None):
+	Light.cached_lights = GradientCache(max_radius, interval, power, cache_dir=cache_dir)
+	Light.tinted_lights.clear()
 
-def generate_shadows(max_radius: int, interval: int, shadow_ratio: float, power: float = 3):
-	shadows = Shadow.cached_shadows
 
-	# Create the largest shadow surface
-	max_shadow_surf = pygame.Surface((max_radius * 2, max_radius * 2), flags=pygame.SRCALPHA)
-	for inner in range(max_radius, 0, -1):
-		factor = 1 - (inner / max_radius) ** power
-		colour = int(255 * factor)
-
-		pygame.draw.circle(
-			max_shadow_surf, (colour, colour, colour, colour), (max_radius, max_radius), inner
-		)
-
-	shadows.append(
-		pygame.transform.smoothscale(
-			max_shadow_surf, (2 * max_radius * shadow_ratio, 2 * max_radius / shadow_ratio)
-		)
-	)
-
-	# Generate the rest based on max (and shrink the reference every so often for performance)
-	reference_surface = max_shadow_surf
-	for radius in range(max_radius - 1, 0, -interval):
-		new_shadow_surf = pygame.transform.smoothscale(reference_surface, (radius * 2, radius * 2))
-		shadows.append(
-			pygame.transform.smoothscale(
-				new_shadow_surf, (2 * radius * shadow_ratio, 2 * radius / shadow_ratio)
-			)
-		)
-
-		if radius <= int((reference_surface.get_width() * 0.75) / 2):
-			reference_surface = new_shadow_surf
-
-	shadows.reverse()
+def generate_shadows(
+	max_radius: int, interval: int, shadow_ratio: float, power: float = 3, cache_dir: str | None = None
+):
+	Shadow.cached_shadows = GradientCache(max_radius, interval, power, shadow_ratio, cache_dir=cache_dir)
+	Shadow.shaded_shadows.clear()
@@ -0,0 +1,305 @@
+import logging
+import math
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+import pygame
+
+# Packed gradient file: header, then (offset, width, height) of each bucket, then RGBA pixels of each stored bucket
+_HEADER = struct.Struct("<4sIiiddI")
+_ENTRY = struct.Struct("<QII")
+_MAGIC = b"PGBG"
+_VERSION = 1
+
+
+def draw_radial_gradient(radius: int, power: float) -> pygame.Surface:
+	surface = pygame.Surface((radius * 2, radius * 2), flags=pygame.SRCALPHA)
+
+	prev_colour = None
+	for inner in range(radius, 0, -1):
+		factor = 1 - (inner / radius) ** power
+		colour = int(255 * factor)
+
+		# A circle the same colour as the one it is drawn over would not change anything
+		if colour != prev_colour:
+			pygame.draw.circle(surface, (colour, colour, colour, colour), (radius, radius), inner)
+			prev_colour = colour
+
+	return surface
+
+
+CachedSurface = pygame.Surface | tuple[pygame.Surface | None, ...]
+
+
+class SurfaceCache:
+	"""
+	Surfaces by key, dropping the least recently used ones once they take up more than `max_bytes`.
+	Tuples of surfaces can be stored too, which get dropped together.
+	"""
+
+	def __init__(self, max_bytes: int):
+		self.max_bytes = max_bytes
+		self.bytes = 0
+
+		self._surfaces: OrderedDict[Hashable, CachedSurface] = OrderedDict()
+
+	def __len__(self):
+		return len(self._surfaces)
+
+	def __iter__(self):
+		return iter(self._surfaces)
+
+	def __contains__(self, key: Hashable) -> bool:
+		return key in self._surfaces
+
+	def items(self):
+		return self._surfaces.items()
+
+	def values(self):
+		return self._surfaces.values()
+
+	def get(self, key: Hashable) -> CachedSurface | None:
+		surface = self._surfaces.get(key)
+		if surface is not None:
+			self._surfaces.move_to_end(key)
+
+		return surface
+
+	def add(self, key: Hashable, surface: CachedSurface):
+		if key in self._surfaces:
+			self.bytes -= self.get_bytes(self._surfaces.pop(key))
+
+		self._surfaces[key] = surface
+		self.bytes += self.get_bytes(surface)
+
+		# The newest surface is always kept, even if it is over budget on its own
+		while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+			self.bytes -= self.get_bytes(self._surfaces.popitem(last=False)[1])
+
+	def discard(self, key: Hashable):
+		surface = self._surfaces.pop(key, None)
+		if surface is not None:
+			self.bytes -= self.get_bytes(surface)
+
+	@staticmethod
+	def get_bytes(surface: CachedSurface) -> int:
+		if isinstance(surface, tuple):
+			return sum(SurfaceCache.get_bytes(part) for part in surface if part is not None)
+
+		return surface.get_height() * surface.get_pitch()
+
+	def clear(self):
+		self._surfaces.clear()
+		self.bytes = 0
+
+
+class GradientCache:
+	"""
+	Radial gradients for each radius bucket, from the smallest radius up to `max_radius` in `interval` steps.
+	Each bucket is generated the first time it is used, and the least recently used ones are dropped
+	once they take up more than `max_bytes`.
+
+	With a `cache_dir`, generated buckets also get appended to a packed file there,
+	which later runs memory map and read from instead of drawing the gradients again.
+	Several runs can share the file, as it only ever gets appended to or replaced as a whole.
+	"""
+
+	def __init__(
+			self,
+			max_radius: int,
+			interval: int,
+			power: float,
+			shadow_ratio: float | None = None,
+			max_bytes: int = 32 * 1024 * 1024,
+			cache_dir: str | None = None,
+	):
+		"""
+		:param shadow_ratio: Stretches gradients to `(2 * radius * shadow_ratio, 2 * radius / shadow_ratio)`
+		:param cache_dir: Directory for the packed gradient file, None to not keep gradients between runs
+		"""
+
+		self.max_radius = max_radius
+		self.interval = interval
+		self.power = power
+		self.shadow_ratio = shadow_ratio
+
+		self._radii = [*range(max_radius - 1, 0, -interval)][::-1] + [max_radius]
+
+		self._surfaces = SurfaceCache(max_bytes)
+
+		self.cache_path: str | None = None
+		self._packed: mmap.mmap | None = None
+		self._packed_entries: list[tuple[int, int, int]] = []  # Offset of 0 for buckets not in the file yet
+		if cache_dir is not None:
+			self._open_packed(cache_dir)
+
+	def __len__(self):
+		return len(self._radii)
+
+	def __getitem__(self, bucket: int) -> pygame.Surface:
+		bucket = pygame.math.clamp(bucket, 0, len(self._radii) - 1)
+
+		surface = self._surfaces.get(bucket)
+		if surface is None:
+			surface = self.generate(bucket)
+			self._surfaces.add(bucket, surface)
+
+		return surface
+
+	def get_radius(self, bucket: int) -> int:
+		return self._radii[bucket]
+
+	def _get_header(self) -> bytes:
+		return _HEADER.pack(
+			_MAGIC,
+			_VERSION,
+			self.max_radius,
+			self.interval,
+			self.power,
+			math.nan if self.shadow_ratio is None else self.shadow_ratio,
+			len(self._radii),
+		)
+
+	def _open_packed(self, cache_dir: str):
+		name = f"gradients_{self.max_radius}_{self.interval}_{self.power:g}_{self.shadow_ratio}.bin"
+		path = os.path.join(cache_dir, name)
+
+		header = self._get_header()
+		table_size = _ENTRY.size * len(self._radii)
+
+		try:
+			os.makedirs(cache_dir, exist_ok=True)
+
+			self._packed = self._map_packed(path, header, table_size)
+			if self._packed is None:
+				# Start over if the file is missing, from another version, or was cut off while being written.
+				# Other runs may have the old file mapped, so it gets replaced instead of truncated
+				temp_path = f"{path}.{os.getpid()}.tmp"
+				with open(temp_path, "wb") as file:
+					file.write(header + bytes(table_size))
+				os.replace(temp_path, path)
+
+				self._packed = self._map_packed(path, header, table_size)
+				if self._packed is None:
+					raise OSError("File was replaced by an incompatible one")
+		except OSError as e:
+			logging.warning(f"Could not use gradient cache `{path}`: {e}")
+			return
+
+		self.cache_path = path
+		self._packed_entries = [
+			_ENTRY.unpack_from(self._packed, len(header) + bucket * _ENTRY.size) for bucket in range(len(self._radii))
+		]
+
+	@staticmethod
+	def _map_packed(path: str, header: bytes, table_size: int) -> mmap.mmap | None:
+		"""Maps the packed file at `path`, if it exists and matches `header`"""
+
+		try:
+			with open(path, "rb") as file:
+				packed = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		except (FileNotFoundError, ValueError):  # Empty files can't be mapped
+			return None
+
+		if packed[: len(header)] != header or len(packed) < len(header) + table_size:
+			packed.close()
+			return None
+
+		return packed
+
+	def _read_packed_file(self, offset: int, size: int) -> bytes | None:
+		"""Reads from the packed file, None if another run replaced it with an incompatible one since it was mapped"""
+
+		with open(self.cache_path, "rb") as file:
+			if file.read(_HEADER.size) != self._packed[: _HEADER.size]:
+				return None
+
+			file.seek(offset)
+			return file.read(size)
+
+	def _load_packed(self, bucket: int) -> pygame.Surface | None:
+		offset, width, height = self._packed_entries[bucket]
+		size = width * height * 4
+
+		if offset == 0:
+			return None
+		elif offset + size <= len(self._packed):
+			# Copied out of the map, so surfaces never point into a file another run could change
+			data = self._packed[offset : offset + size]
+		else:
+			# Added after the file was mapped
+			data = self._read_packed_file(offset, size)
+
+		if data is None or len(data) != size:
+			return None
+
+		return pygame.image.frombytes(data, (width, height), "RGBA")
+
+	def _store_packed(self, bucket: int, surface: pygame.Surface):
+		entry_offset = _HEADER.size + bucket * _ENTRY.size
+
+		try:
+			# Another run may have stored the bucket since the file was mapped, storing it again would only grow the file
+			data = self._read_packed_file(entry_offset, _ENTRY.size)
+			if data is None:
+				return
+
+			entry = _ENTRY.unpack(data)
+			if entry[0] != 0:
+				self._packed_entries[bucket] = entry
+				return
+
+			# Appending makes each run write its pixels after everything already in the file
+			pixels = pygame.image.tobytes(surface, "RGBA")
+			with open(self.cache_path, "ab") as file:
+				file.write(pixels)
+				file.flush()
+				offset = file.tell() - len(pixels)
+
+			# Only point at the pixels once they are written
+			entry = offset, surface.get_width(), surface.get_height()
+			with open(self.cache_path, "r+b") as file:
+				if file.read(_HEADER.size) != self._packed[: _HEADER.size]:
+					return
+
+				file.seek(entry_offset)
+				file.write(_ENTRY.pack(*entry))
+		except OSError as e:
+			logging.warning(f"Could not write to gradient cache `{self.cache_path}`: {e}")
+			return
+
+		self._packed_entries[bucket] = entry
+
+	def generate(self, bucket: int) -> pygame.Surface:
+		if self._packed is not None:
+			surface = self._load_packed(bucket)
+			if surface is None:
+				surface = self.draw(bucket)
+				self._store_packed(bucket, surface)
+
+			return surface
+
+		return self.draw(bucket)
+
+	def draw(self, bucket: int) -> pygame.Surface:
+		radius = self._radii[bucket]
+		surface = draw_radial_gradient(radius, self.power)
+
+		if self.shadow_ratio is not None and self.shadow_ratio != 1:
+			surface = pygame.transform.smoothscale(
+				surface, (2 * radius * self.shadow_ratio, 2 * radius / self.shadow_ratio)
+			)
+
+		return surface
+
+	def warm_up(self, buckets: Iterable[int]):
+		"""Generates buckets ahead of time, so their first use does not stall a frame"""
+
+		for bucket in buckets:
+			self[bucket]
+
+	def clear(self):
+		self._surfaces.clear()
@@ -1,13 +1,21 @@
 import math
+from typing import TYPE_CHECKING
 
 import pygame
 
+from .gradients import GradientCache, SurfaceCache
 from ..camera import Camera
 from ..common import Common
 
+if TYPE_CHECKING:
+	from .lighting_manager import LightingManager
+
 
 class Light:
-	cached_lights: list[pygame.Surface] = []
+	cached_lights: GradientCache
+
+	# Light surfaces multiplied by a brightness and tint, shared by every light with the same radius bucket, brightness and tint
+	tinted_lights = SurfaceCache(32 * 1024 * 1024)
 
 	def __init__(
 			self,
@@ -19,119 +27,225 @@ class Light:
 			camera_affected: bool = True,
 			tint=(255, 255, 255),
 	):
+		# Flicker starts from here, in seconds of `LightingManager.time` once added to a manager
 		self.start_time = pygame.time.get_ticks() / 1000
 
 		self._linked_pos: bool
 		if isinstance(pos, pygame.Vector2):
 			self._linked_pos = True
-			self.pos = pos
+			self._pos = pos
 		else:
 			self._linked_pos = False
-			self.pos = pygame.Vector2(pos)
+			self._pos = pygame.Vector2(pos)
 
-		self.brightness = pygame.math.clamp(brightness, 0, 1)
+		# Changing these through their properties lets the manager re-bucket the light and re-bake its tiles
+		self._brightness = pygame.math.clamp(brightness, 0, 1)
 		self.add_brightness = pygame.math.clamp(brightness - 1, 0, 1)
 
-		self.radius = radius
-		self.variation = variation
-		self.variation_speed = variation_speed
-
-		self.brightness_surface = pygame.Surface(
-			((self.radius + self.variation) * 2, (self.radius + self.variation) * 2), flags=pygame.SRCALPHA
-		)
-		self.brightness_surface.fill(
-			(int(255 * self.brightness), int(255 * self.brightness), int(255 * self.brightness))
-		)
+		self._radius = radius
+		self._variation = variation
+		self._variation_speed = variation_speed
 
-		if self.add_brightness > 0:
-			self.add_brightness_surface = pygame.Surface(
-				((self.radius + self.variation) * 2, (self.radius + self.variation) * 2),
-				flags=pygame.SRCALPHA,
-			)
-			self.add_brightness_surface.fill(
-				(
-					int(255 * self.add_brightness),
-					int(255 * self.add_brightness),
-					int(255 * self.add_brightness),
-				)
-			)
-
-		self.tint = tint
-		self.tint_surface = pygame.Surface(
-			((self.radius + self.variation) * 2, (self.radius + self.variation) * 2), flags=pygame.SRCALPHA
-		)
-		self.tint_surface.fill(self.tint)
+		self._tint = tint
 
 		self.camera_affected = camera_affected
 
 		self.radius_interval = Common.get("lighting_radius_interval")
 
+		self.manager: "LightingManager | None" = None  # Set by `LightingManager.add_light`
+
+	@property
+	def linked_pos(self) -> bool:
+		return self._linked_pos
+
+	@property
+	def pos(self) -> pygame.Vector2:
+		"""
+		The linked position, or a copy of the light's own position.
+		Only assigning to it moves the light, changing the copy does not.
+		"""
+
+		return self._pos if self._linked_pos else self._pos.copy()
+
+	@pos.setter
+	def pos(self, pos: pygame.typing.Point):
+		self.update_pos(pos)
+
 	def update_pos(self, pos):
 		if self._linked_pos:
 			raise RuntimeError("Cannot modify linked position")
 
-		self.pos.update(pos)
+		self._pos.update(pos)
 
-	def set_brightness(self, brightness: float):
-		self.brightness = pygame.math.clamp(brightness, 0, 1)
+		if self.manager is not None:
+			self.manager.move_light(self)
+
+	@property
+	def radius(self) -> float:
+		return self._radius
+
+	@radius.setter
+	def radius(self, radius: float):
+		self._radius = radius
+
+		if self.manager is not None:
+			self.manager.move_light(self)
+
+	@property
+	def variation(self) -> float:
+		return self._variation
+
+	@variation.setter
+	def variation(self, variation: float):
+		self._variation = variation
+
+		# Changes how far the light reaches, and whether it can be baked
+		if self.manager is not None:
+			self.manager.light_changed(self)
+			self.manager.move_light(self)
+
+	@property
+	def variation_speed(self) -> float:
+		return self._variation_speed
+
+	@variation_speed.setter
+	def variation_speed(self, variation_speed: float):
+		self._variation_speed = variation_speed
+
+		if self.manager is not None:
+			self.manager.light_changed(self)
+
+	@property
+	def static(self) -> bool:
+		"""Whether the light never moves or flickers, so it can be baked into the lightmap"""
+
+		return self.variation == 0 and self.camera_affected and not self._linked_pos
+
+	def get_bounds(self) -> tuple[float, float, float, float]:
+		"""(left, top, right, bottom) of the area this light can reach, including its variation"""
+
+		reach = self.radius + abs(self.variation)
+		return self._pos.x - reach, self._pos.y - reach, self._pos.x + reach, self._pos.y + reach
+
+	@property
+	def brightness(self) -> float:
+		"""Brightness up to 1, anything above that is kept in `add_brightness`"""
+
+		return self._brightness
+
+	@brightness.setter
+	def brightness(self, brightness: float):
+		self._brightness = pygame.math.clamp(brightness, 0, 1)
 		self.add_brightness = pygame.math.clamp(brightness - 1, 0, 1)
 
-		self.brightness_surface.fill(
-			(int(255 * self.brightness), int(255 * self.brightness), int(255 * self.brightness))
+		if self.manager is not None:
+			self.manager.light_changed(self)
+
+	def set_brightness(self, brightness: float):
+		self.brightness = brightness
+
+	@property
+	def tint(self):
+		return self._tint
+
+	@tint.setter
+	def tint(self, tint):
+		self._tint = tint
+
+		if self.manager is not None:
+			self.manager.light_changed(self)
+
+	def set_tint(self, tint):
+		self.tint = tint
+
+	def _get_tinted_surface(self, bucket: int, brightness: float, tint: tuple[int, int, int, int]) -> pygame.Surface:
+		level = int(255 * brightness)
+
+		key = bucket, level, tint
+		tinted_surface = self.tinted_lights.get(key)
+		if tinted_surface is None:
+			tinted_surface = self.cached_lights[bucket].copy()
+			tinted_surface.fill((level, level, level), special_flags=pygame.BLEND_MULT)
+			tinted_surface.fill(tint, special_flags=pygame.BLEND_MULT)
+
+			self.tinted_lights.add(key, tinted_surface)
+
+		return tinted_surface
+
+	def get_surfaces(self, radius: int) -> tuple[pygame.Surface, pygame.Surface | None]:
+		"""
+		Light surface for a radius, and the surface for brightness above 1 if there is any.
+		Built the first time each radius bucket, brightness and tint is used by any light, then shared through `tinted_lights`.
+		"""
+
+		bucket = max(int(radius / self.radius_interval) - 1, 0)
+		tint = tuple(pygame.Color(self._tint))
+
+		return (
+			self._get_tinted_surface(bucket, self._brightness, tint),
+			self._get_tinted_surface(bucket, self.add_brightness, tint) if self.add_brightness > 0 else None,
 		)
 
-		if self.add_brightness > 0:
-			self.add_brightness_surface.fill(
-				(
-					int(255 * self.add_brightness),
-					int(255 * self.add_brightness),
-					int(255 * self.add_brightness),
-				)
-			)
+	def get_variation(self, time: float, phases: int | None = None) -> float:
+		"""
+		Change in radius from flickering at `time`.
+		:param phases: Number of steps to round the flicker to over each cycle, so only a few radii get used
+		"""
+
+		phase = (time - self.start_time) * self.variation_speed
+		if phases:
+			phase = round(phase * phases / math.tau) * math.tau / phases
+
+		return math.sin(phase) * self.variation
 
 	def update(self, delta):
 		pass
 
-	def draw(self, surface: pygame.Surface, add_surface: pygame.Surface, camera: Camera):
-		current_time = pygame.time.get_ticks() / 1000
-		variation = math.sin((current_time - self.start_time) * self.variation_speed) * self.variation
+	def draw(
+			self,
+			surface: pygame.Surface,
+			add_surface: pygame.Surface,
+			camera: Camera,
+			scale: float = 1,
+			variation: float | None = None,
+	):
+		"""
+		:param scale: Size of `surface` and `add_surface` relative to the screen
+		:param variation: Change in radius from flickering, worked out from `pygame.time.get_ticks` if None
+		"""
 
-		radius = int(self.radius + variation)
-		# colour = int(max(0.0, min(1.0, self.brightness + variation / 20)))
+		if variation is None:
+			variation = self.get_variation(pygame.time.get_ticks() / 1000)
 
-		light_surface = self.cached_lights[int(radius / self.radius_interval) - 1].copy()
+		center = camera.world_to_screen(self._pos) if self.camera_affected else self._pos
+		self.draw_at(surface, add_surface, center, self.radius + variation, scale)
 
-		light_surface.blit(self.brightness_surface, (0, 0), special_flags=pygame.BLEND_MULT)
-		light_surface.blit(self.tint_surface, (0, 0), special_flags=pygame.BLEND_MULT)
+	def draw_at(
+			self,
+			surface: pygame.Surface,
+			add_surface: pygame.Surface | None,
+			center: pygame.typing.Point,
+			radius: float,
+			scale: float = 1,
+	):
+		"""
+		:param center: Position on `surface` before scaling
+		:param scale: Size of `surface` and `add_surface` relative to the screen
+		"""
 
-		if self.add_brightness > 0:
-			add_light_surface = self.cached_lights[int(radius / self.radius_interval) - 1].copy()
+		# Rounded like `Camera.world_to_screen`, as `Rect` truncates, so baked tiles line up with drawn lights
+		center = round(center[0]), round(center[1])
 
-			add_light_surface.blit(self.add_brightness_surface, (0, 0), special_flags=pygame.BLEND_MULT)
-			add_light_surface.blit(self.tint_surface, (0, 0), special_flags=pygame.BLEND_MULT)
+		if scale != 1:
+			# Truncating to a radius bucket would shrink the light by a whole bucket once scaled back up
+			radius = radius * scale + self.radius_interval / 2
+			center = math.floor(center[0] * scale + 0.5), math.floor(center[1] * scale + 0.5)
 
-		if self.camera_affected:
-			surface.blit(
-				light_surface,
-				light_surface.get_rect(center=camera.world_to_screen(self.pos)),
-				special_flags=pygame.BLEND_ADD,
-			)
+		light_surface, add_light_surface = self.get_surfaces(int(radius))
 
-			if self.add_brightness > 0:
-				add_surface.blit(
-					add_light_surface,
-					add_light_surface.get_rect(center=camera.world_to_screen(self.pos)),
-					special_flags=pygame.BLEND_ADD,
-				)
+		surface.blit(light_surface, light_surface.get_rect(center=center), special_flags=pygame.BLEND_ADD)
 
-		else:
-			surface.blit(
-				light_surface, light_surface.get_rect(center=self.pos), special_flags=pygame.BLEND_ADD
+		if add_light_surface is not None and add_surface is not None:
+			add_surface.blit(
+				add_light_surface, add_light_surface.get_rect(center=center), special_flags=pygame.BLEND_ADD
 			)
-
-			if self.add_brightness > 0:
-				add_surface.blit(
-					add_light_surface,
-					add_light_surface.get_rect(center=self.pos),
-					special_flags=pygame.BLEND_ADD,
-				)
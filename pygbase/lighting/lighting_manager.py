@@ -1,5 +1,14 @@
+import logging
+import math
+
 import pygame
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+from .gradients import SurfaceCache
 from .light import Light
 from .shadow import Shadow
 from ..camera import Camera
@@ -7,29 +16,226 @@ from ..common import Common
 
 
 class LightingManager:
-	def __init__(self, default_brightness: float, shadow_brightness: float):
+	def __init__(
+			self,
+			default_brightness: float,
+			shadow_brightness: float,
+			chunk_size: int = 400,
+			lightmap_scale: float = 1,
+			smooth_lightmap: bool = True,
+			bake_static_lights: bool = False,
+			flicker_phases: int | None = None,
+			max_tile_bytes: int = 64 * 1024 * 1024,
+	):
+		"""
+		:param chunk_size: Size of the chunks lights with fixed positions are bucketed into, for culling
+		:param lightmap_scale: Resolution of the lighting buffers relative to the screen, such as 0.5 or 0.25.
+		Lights get drawn at this resolution, and the result is scaled up once per frame
+		:param smooth_lightmap: Scale the lighting up with `smoothscale` instead of `scale`
+		:param bake_static_lights: Pre-draw static lights (see `Light.static`) into a tile for each chunk,
+		so each frame only draws the visible tiles and the other lights
+		:param flicker_phases: Rounds light flicker to this many steps per cycle (see `Light.get_variation`),
+		so flickering lights reuse a few cached surfaces
+		:param max_tile_bytes: Baked tiles used longest ago get dropped once they take up more than this
+		"""
+
 		self.brightness = default_brightness
 		self.shadow_brightness = shadow_brightness
 
-		self.lighting_surf = pygame.Surface((Common.get("screen_width"), Common.get("screen_height")))
-		self.lighting_surf.fill((int(255 * default_brightness), int(255 * default_brightness), int(255 * default_brightness)))
+		# Lighting clock, advanced by `update`, which light flicker is based on
+		self.time: float = 0
+		self.flicker_phases = flicker_phases
 
-		self.add_lighting_surf = pygame.Surface((Common.get("screen_width"), Common.get("screen_height")), flags=pygame.SRCALPHA)
-		self.add_lighting_surf.fill((0, 0, 0))
+		# Start time, speed and amount of flickering for each flickering light, and the resulting variations.
+		# Only used when numpy is available
+		self._flicker_index: dict[Light, int] | None = None
+		self._flicker_arrays: tuple["np.ndarray", "np.ndarray", "np.ndarray"] | None = None
+		self._variations: "np.ndarray | None" = None
 
-		self.shadow_surf = pygame.Surface((Common.get("screen_width"), Common.get("screen_height")))
-		self.shadow_surf.fill((255, 255, 255))
+		self.lightmap_scale = lightmap_scale
+		self.smooth_lightmap = smooth_lightmap
+
+		# Scratch buffers, cleared every frame and only reallocated when the screen size changes
+		self.lighting_surf: pygame.Surface
+		self.add_lighting_surf: pygame.Surface
+		self.shadow_surf: pygame.Surface
+		self._upscaled_surf: pygame.Surface | None  # Only used with a `lightmap_scale` other than 1
+		self._allocate_buffers((Common.get("screen_width"), Common.get("screen_height")))
 
 		self.lights: list[Light] = []
 		self.shadows: list[Shadow] = []
 
+		self.chunk_size = chunk_size
+
+		# Lights with fixed world positions, bucketed into the chunks they reach
+		self._light_chunks: dict[tuple[int, int], list[Light]] = {}
+		self._light_chunk_ranges: dict[Light, tuple[tuple[int, int], tuple[int, int]]] = {}
+
+		# Lights with linked or screen space positions, checked against the view every frame
+		self._moving_lights: list[Light] = []
+
+		# Static lights of each chunk, pre-drawn at lightmap resolution, and the same for brightness above 1.
+		# Chunks without static lights are not stored, as they are quick to check again
+		if bake_static_lights and (chunk_size * lightmap_scale) % 1 != 0:
+			logging.error(f"Baked light tiles need a whole number of pixels, not {chunk_size * lightmap_scale}")
+			raise ValueError(f"Baked light tiles need a whole number of pixels, not {chunk_size * lightmap_scale}")
+
+		self.bake_static_lights = bake_static_lights
+		self._tiles = SurfaceCache(max_tile_bytes)
+
+	def get_chunk(self, pos: pygame.typing.Point):
+		return int(pos[0] // self.chunk_size), int(pos[1] // self.chunk_size)
+
+	def _get_chunk_range(self, left: float, top: float, right: float, bottom: float):
+		return self.get_chunk((left, top)), self.get_chunk((right, bottom))
+
+	def _hash_light(self, light: Light):
+		top_left, bottom_right = self._light_chunk_ranges[light] = self._get_chunk_range(*light.get_bounds())
+
+		for row in range(top_left[1], bottom_right[1] + 1):
+			for col in range(top_left[0], bottom_right[0] + 1):
+				self._light_chunks.setdefault((col, row), []).append(light)
+
+	def _unhash_light(self, light: Light):
+		top_left, bottom_right = self._light_chunk_ranges.pop(light)
+
+		for row in range(top_left[1], bottom_right[1] + 1):
+			for col in range(top_left[0], bottom_right[0] + 1):
+				chunk = self._light_chunks[(col, row)]
+				chunk.remove(light)
+				if not chunk:
+					del self._light_chunks[(col, row)]
+
 	def add_light(self, light_source: Light) -> Light:
 		self.lights.append(light_source)
+		light_source.manager = self
+		light_source.start_time = self.time
+		self._flicker_index = None
+
+		if light_source.linked_pos or not light_source.camera_affected:
+			self._moving_lights.append(light_source)
+		else:
+			self._hash_light(light_source)
+			self._clear_tiles(light_source)
+
 		return light_source
 
 	def remove_light(self, light_source: Light):
 		if light_source in self.lights:
 			self.lights.remove(light_source)
+			light_source.manager = None
+			self._flicker_index = None
+
+			if light_source in self._light_chunk_ranges:
+				self._clear_tiles(light_source)
+				self._unhash_light(light_source)
+			else:
+				self._moving_lights.remove(light_source)
+
+	def move_light(self, light_source: Light):
+		"""Re-buckets a light with a fixed position, after it moved or how far it reaches changed"""
+
+		if light_source in self._light_chunk_ranges:
+			self._clear_tiles(light_source)
+
+			if self._light_chunk_ranges[light_source] != self._get_chunk_range(*light_source.get_bounds()):
+				self._unhash_light(light_source)
+				self._hash_light(light_source)
+
+			self._clear_tiles(light_source)
+
+	def light_changed(self, light_source: Light):
+		"""Re-bakes the tiles under a light, after its brightness, tint or flicker changed"""
+
+		self._flicker_index = None
+
+		if light_source in self._light_chunk_ranges:
+			self._clear_tiles(light_source)
+
+	def _clear_tiles(self, light_source: Light):
+		top_left, bottom_right = self._light_chunk_ranges[light_source]
+
+		for row in range(top_left[1], bottom_right[1] + 1):
+			for col in range(top_left[0], bottom_right[0] + 1):
+				self._tiles.discard((col, row))
+
+	def _bake_tile(self, chunk_pos: tuple[int, int]) -> tuple[pygame.Surface, pygame.Surface | None] | None:
+		"""Draws the static lights reaching into a chunk onto a tile, or returns None if there are none"""
+
+		lights = [light for light in self._light_chunks.get(chunk_pos, ()) if light.static]
+		if not lights:
+			return None
+
+		tile_size = int(self.chunk_size * self.lightmap_scale)
+		tile = pygame.Surface((tile_size, tile_size))
+		add_tile = None
+		if any(light.add_brightness > 0 for light in lights):
+			add_tile = pygame.Surface((tile_size, tile_size))
+
+		origin = chunk_pos[0] * self.chunk_size, chunk_pos[1] * self.chunk_size
+		for light in lights:
+			light.draw_at(
+				tile, add_tile, (light.pos.x - origin[0], light.pos.y - origin[1]), light.radius, self.lightmap_scale
+			)
+
+		return tile, add_tile
+
+	def _draw_tiles(self, surface: pygame.Surface, camera: Camera):
+		view_left, view_top, view_right, view_bottom = self._get_view(surface, camera)
+
+		top_left, bottom_right = self._get_chunk_range(view_left, view_top, view_right, view_bottom)
+		for row in range(top_left[1], bottom_right[1] + 1):
+			for col in range(top_left[0], bottom_right[0] + 1):
+				tiles = self._tiles.get((col, row))
+				if tiles is None:
+					tiles = self._bake_tile((col, row))
+					if tiles is None:
+						continue
+
+					self._tiles.add((col, row), tiles)
+
+				tile, add_tile = tiles
+				x, y = camera.world_to_screen((col * self.chunk_size, row * self.chunk_size))
+				pos = math.floor(x * self.lightmap_scale + 0.5), math.floor(y * self.lightmap_scale + 0.5)
+
+				self.lighting_surf.blit(tile, pos, special_flags=pygame.BLEND_ADD)
+				if add_tile is not None:
+					self.add_lighting_surf.blit(add_tile, pos, special_flags=pygame.BLEND_ADD)
+
+	def _get_view(self, surface: pygame.Surface, camera: Camera) -> tuple[float, float, float, float]:
+		"""World space (left, top, right, bottom) shown on `surface`"""
+
+		return *camera.screen_to_world((0, 0)), *camera.screen_to_world(surface.get_size())
+
+	def get_visible_lights(self, surface: pygame.Surface, camera: Camera) -> list[Light]:
+		"""Lights that reach onto `surface` when drawn with `camera`"""
+
+		view_left, view_top, view_right, view_bottom = self._get_view(surface, camera)
+
+		# Lights spanning multiple chunks only get added once
+		lights: dict[Light, None] = {}
+		top_left, bottom_right = self._get_chunk_range(view_left, view_top, view_right, view_bottom)
+		for row in range(top_left[1], bottom_right[1] + 1):
+			for col in range(top_left[0], bottom_right[0] + 1):
+				for light in self._light_chunks.get((col, row), ()):
+					lights[light] = None
+
+		for light in self._moving_lights:
+			lights[light] = None
+
+		visible_lights = []
+		for light in lights:
+			left, top, right, bottom = light.get_bounds()
+
+			if light.camera_affected:
+				visible = left < view_right and view_left < right and top < view_bottom and view_top < bottom
+			else:
+				visible = left < surface.get_width() and 0 < right and top < surface.get_height() and 0 < bottom
+
+			if visible:
+				visible_lights.append(light)
+
+		return visible_lights
 
 	def add_shadow(self, shadow: Shadow) -> Shadow:
 		shadow.init_surf(int(self.shadow_brightness * 255))
@@ -40,24 +246,110 @@ class LightingManager:
 		if shadow in self.shadows:
 			self.shadows.remove(shadow)
 
+	def _allocate_buffers(self, size: tuple[int, int]):
+		lightmap_size = max(1, round(size[0] * self.lightmap_scale)), max(1, round(size[1] * self.lightmap_scale))
+
+		self.lighting_surf = pygame.Surface(lightmap_size)
+		self.add_lighting_surf = pygame.Surface(lightmap_size, flags=pygame.SRCALPHA)
+		self.shadow_surf = pygame.Surface(size)
+		self._upscaled_surf = pygame.Surface(size, flags=pygame.SRCALPHA) if self.lightmap_scale != 1 else None
+
+	def _check_buffer_size(self, surface: pygame.Surface):
+		if surface.get_size() != self.shadow_surf.get_size():
+			self._allocate_buffers(surface.get_size())
+
+	def _blit_lightmap(self, surface: pygame.Surface, lightmap: pygame.Surface, special_flags: int):
+		if self._upscaled_surf is None:
+			surface.blit(lightmap, (0, 0), special_flags=special_flags)
+			return
+
+		if self.smooth_lightmap:
+			pygame.transform.smoothscale(lightmap, surface.get_size(), self._upscaled_surf)
+		else:
+			pygame.transform.scale(lightmap, surface.get_size(), self._upscaled_surf)
+
+		surface.blit(self._upscaled_surf, (0, 0), special_flags=special_flags)
+
+	def _update_flicker(self):
+		"""Works out the flicker of every flickering light in one go"""
+
+		if self._flicker_index is None:
+			lights = [light for light in self.lights if light.variation != 0]
+
+			self._flicker_index = {light: index for index, light in enumerate(lights)}
+			self._flicker_arrays = (
+				np.array([light.start_time for light in lights], dtype=np.float64),
+				np.array([light.variation_speed for light in lights], dtype=np.float64),
+				np.array([light.variation for light in lights], dtype=np.float64),
+			)
+
+		start_time, speed, variation = self._flicker_arrays
+
+		phase = (self.time - start_time) * speed
+		if self.flicker_phases:
+			phase = np.round(phase * (self.flicker_phases / math.tau)) * (math.tau / self.flicker_phases)
+
+		self._variations = np.sin(phase) * variation
+
+	def get_variation(self, light_source: Light) -> float:
+		"""Change in radius from flickering of a light, at the current `time`"""
+
+		if light_source.variation == 0:
+			return 0
+
+		if self._variations is not None and self._flicker_index is not None:
+			index = self._flicker_index.get(light_source)
+			if index is not None:
+				return float(self._variations[index])
+
+		return light_source.get_variation(self.time, self.flicker_phases)
+
 	def update(self, delta):
+		self.time += delta
+
 		for light in self.lights:
 			light.update(delta)
 
+		if np is not None:
+			self._update_flicker()
+
 	def draw_shadows(self, surface: pygame.Surface, camera: Camera):
-		shadow_surf = self.shadow_surf.copy()
+		self._check_buffer_size(surface)
+
+		shadow_surf = self.shadow_surf
+		shadow_surf.fill((255, 255, 255))
+
+		view_left, view_top, view_right, view_bottom = self._get_view(surface, camera)
 
+		blits = []
 		for shadow in self.shadows:
-			shadow.draw(shadow_surf, camera)
+			width, height = shadow.surf_rect.size
+
+			# Placed the same way as `Shadow.draw`, which centers its rect on the position
+			left = int(shadow.pos.x) - width // 2
+			top = int(shadow.pos.y) - height // 2
+
+			if left < view_right and view_left < left + width and top < view_bottom and view_top < top + height:
+				blits.append((shadow.surf, camera.world_to_screen((left, top))))
+
+		shadow_surf.fblits(blits)
 
 		surface.blit(shadow_surf, (0, 0), special_flags=pygame.BLEND_MULT)
 
 	def draw_lights(self, surface: pygame.Surface, camera: Camera):
-		lighting_surf = self.lighting_surf.copy()
-		add_lighting_surf = self.add_lighting_surf.copy()
+		self._check_buffer_size(surface)
 
-		for light in self.lights:
-			light.draw(lighting_surf, add_lighting_surf, camera)
+		lighting_surf = self.lighting_surf
+		lighting_surf.fill((int(255 * self.brightness), int(255 * self.brightness), int(255 * self.brightness)))
+		add_lighting_surf = self.add_lighting_surf
+		add_lighting_surf.fill((0, 0, 0))
+
+		if self.bake_static_lights:
+			self._draw_tiles(surface, camera)
+
+		for light in self.get_visible_lights(surface, camera):
+			if not (self.bake_static_lights and light.static):
+				light.draw(lighting_surf, add_lighting_surf, camera, self.lightmap_scale, self.get_variation(light))
 
-		surface.blit(lighting_surf, (0, 0), special_flags=pygame.BLEND_MULT)
-		surface.blit(add_lighting_surf, (0, 0), special_flags=pygame.BLEND_ADD)
+		self._blit_lightmap(surface, lighting_surf, pygame.BLEND_MULT)
+		self._blit_lightmap(surface, add_lighting_surf, pygame.BLEND_ADD)
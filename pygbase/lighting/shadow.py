@@ -1,11 +1,15 @@
 import pygame
 
+from .gradients import GradientCache
 from ..camera import Camera
 from ..common import Common
 
 
 class Shadow:
-	cached_shadows: list[pygame.Surface] = []
+	cached_shadows: GradientCache
+
+	# Shadow surfaces multiplied by a brightness, shared by every shadow with the same size bucket and brightness
+	shaded_shadows: dict[tuple[int, int], pygame.Surface] = {}
 
 	def __init__(self, pos: pygame.typing.Point, size: float):
 		self._linked_pos: bool
@@ -20,12 +24,21 @@ class Shadow:
 
 		self.radius_interval = Common.get("lighting_radius_interval")
 
-		self.surf = self.cached_shadows[int(size / self.radius_interval)].copy()
+		self._bucket = int(size / self.radius_interval)
+
+		self.surf = self.cached_shadows[self._bucket]  # Shared, so should not be modified
 		self.surf_rect = self.surf.get_rect(center=self.pos)
 
 	def init_surf(self, brightness: int):
 		"""Called by LightingManager"""
-		self.surf.fill((brightness, brightness, brightness), special_flags=pygame.BLEND_MULT)
+
+		key = self._bucket, brightness
+		if key not in self.shaded_shadows:
+			shaded_surf = self.cached_shadows[self._bucket].copy()
+			shaded_surf.fill((brightness, brightness, brightness), special_flags=pygame.BLEND_MULT)
+			self.shaded_shadows[key] = shaded_surf
+
+		self.surf = self.shaded_shadows[key]
 
 	def update_pos(self, pos):
 		if self._linked_pos:
@@ -0,0 +1,462 @@
+import os
+
+import pygame
+import pytest
+
+from . import generate_lights, generate_shadows
+from .light import Light
+from .shadow import Shadow
+from ..camera import Camera
+from ..common import Common
+
+
+@pytest.fixture(autouse=True)
+def lighting_cache():
+	Common.set("lighting_radius_interval", 2)
+
+	generate_lights(40, 2)
+	generate_shadows(20, 2, 1)
+
+
+def composite_light(light: Light, radius: int, brightness: float) -> pygame.Surface:
+	"""Light surface built the way `Light.draw` used to build it every frame"""
+
+	light_surface = Light.cached_lights[int(radius / 2) - 1].copy()
+
+	brightness_surface = pygame.Surface(light_surface.get_size(), flags=pygame.SRCALPHA)
+	brightness_surface.fill((int(255 * brightness), int(255 * brightness), int(255 * brightness)))
+	tint_surface = pygame.Surface(light_surface.get_size(), flags=pygame.SRCALPHA)
+	tint_surface.fill(light.tint)
+
+	light_surface.blit(brightness_surface, (0, 0), special_flags=pygame.BLEND_MULT)
+	light_surface.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_MULT)
+	return light_surface
+
+
+def test_light_surfaces_are_cached_until_changed():
+	light = Light((50, 50), 1.5, 20, 0, 0, tint=(255, 128, 64))
+
+	light_surface, add_light_surface = light.get_surfaces(20)
+	assert light.get_surfaces(20)[0] is light_surface
+	assert pygame.image.tobytes(light_surface, "RGBA") == pygame.image.tobytes(composite_light(light, 20, 1), "RGBA")
+	assert pygame.image.tobytes(add_light_surface, "RGBA") == pygame.image.tobytes(composite_light(light, 20, 0.5), "RGBA")
+
+	light.set_tint((0, 255, 0))
+	light_surface = light.get_surfaces(20)[0]
+	assert pygame.image.tobytes(light_surface, "RGBA") == pygame.image.tobytes(composite_light(light, 20, 1), "RGBA")
+
+	light.set_brightness(0.5)
+	assert light.get_surfaces(20)[0] is not light_surface
+	assert light.get_surfaces(20)[1] is None
+
+
+def test_light_surfaces_are_shared_and_bounded(monkeypatch):
+	from .gradients import SurfaceCache
+
+	monkeypatch.setattr(Light, "tinted_lights", SurfaceCache(3 * 40 * 40 * 4))
+
+	first = Light((0, 0), 1, 20, 0, 0, tint="orange")
+	second = Light((100, 100), 1, 20, 0, 0, tint=(255, 165, 0))
+	assert first.get_surfaces(20)[0] is second.get_surfaces(20)[0]
+	assert len(Light.tinted_lights) == 1
+
+	# Only the surfaces used most recently are kept
+	for brightness in (0.2, 0.4, 0.6, 0.8):
+		first.set_brightness(brightness)
+		first.get_surfaces(20)
+
+	assert len(Light.tinted_lights) == 3
+	assert Light.tinted_lights.bytes <= Light.tinted_lights.max_bytes
+	assert [level for _, level, _ in Light.tinted_lights] == [102, 153, 204]
+
+
+def test_light_draw_adds_light():
+	light = Light((50, 50), 0.8, 20, 0, 0)
+
+	surface = pygame.Surface((100, 100))
+	add_surface = pygame.Surface((100, 100))
+	light.draw(surface, add_surface, Camera((10, 0)))
+
+	assert surface.get_at((40, 50))[0] > 150
+	assert surface.get_at((90, 50)) == pygame.Color("black")
+	assert add_surface.get_at((40, 50)) == pygame.Color("black")
+
+
+def test_lighting_buffers_are_reused():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 100)
+	Common.set("screen_height", 80)
+
+	manager = LightingManager(0.5, 0.5)
+	manager.add_light(Light((50, 40), 1, 20, 0, 0))
+	manager.add_shadow(Shadow((20, 20), 10))
+	lighting_surf = manager.lighting_surf
+
+	frames = []
+	for _ in range(2):
+		surface = pygame.Surface((100, 80))
+		surface.fill((200, 200, 200))
+		manager.draw_shadows(surface, Camera())
+		manager.draw_lights(surface, Camera())
+		frames.append(pygame.image.tobytes(surface, "RGB"))
+
+	assert frames[0] == frames[1]
+	assert manager.lighting_surf is lighting_surf
+	assert surface.get_at((0, 79))[0] == 100
+	assert surface.get_at((50, 40))[0] > 150
+	assert surface.get_at((20, 20))[0] < 100
+
+	manager.draw_lights(pygame.Surface((160, 90)), Camera())
+	assert manager.lighting_surf.get_size() == (160, 90)
+
+
+def test_lights_are_culled_to_view():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 100)
+	Common.set("screen_height", 80)
+
+	manager = LightingManager(0.2, 0.5, chunk_size=50)
+	lights = [manager.add_light(Light((x * 30, y * 30), 1, 10, 4, 1)) for x in range(-20, 20) for y in range(-20, 20)]
+	linked_light = manager.add_light(Light(pygame.Vector2(5000, 0), 1, 10, 0, 0))
+	screen_light = manager.add_light(Light((50, 40), 1, 10, 0, 0, camera_affected=False))
+
+	surface = pygame.Surface((100, 80))
+	camera = Camera((0, 0))
+
+	visible = manager.get_visible_lights(surface, camera)
+	assert set(visible) == {
+		light for light in lights if -14 < light.pos.x < 114 and -14 < light.pos.y < 94
+	} | {screen_light}
+
+	moved_light = lights[0]
+	moved_light.update_pos((50, 40))
+	linked_light.pos.update(60, 40)
+	visible = manager.get_visible_lights(surface, camera)
+	assert moved_light in visible and linked_light in visible
+
+	moved_light.update_pos((-5000, 0))
+	manager.remove_light(lights[1])
+	manager.remove_light(linked_light)
+	visible = manager.get_visible_lights(surface, Camera((-5050, -40)))
+	assert visible == [moved_light, screen_light]
+
+
+@pytest.mark.parametrize("smooth", [True, False])
+def test_low_resolution_lightmap(smooth: bool):
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 100)
+	Common.set("screen_height", 80)
+
+	surfaces = []
+	for scale in (1, 0.5):
+		manager = LightingManager(0.2, 0.5, lightmap_scale=scale, smooth_lightmap=smooth)
+		manager.add_light(Light((50, 40), 1.5, 30, 0, 0))
+		assert manager.lighting_surf.get_size() == (100 * scale, 80 * scale)
+
+		surface = pygame.Surface((100, 80))
+		surface.fill((100, 100, 100))
+		manager.draw_lights(surface, Camera())
+		surfaces.append(surface)
+
+	for pos in ((50, 40), (65, 40), (50, 20), (0, 0)):
+		assert surfaces[0].get_at(pos)[0] == pytest.approx(surfaces[1].get_at(pos)[0], abs=12)
+
+
+def test_gradients_are_generated_lazily():
+	from .gradients import GradientCache, SurfaceCache
+
+	cache = GradientCache(40, 3, 1.4, max_bytes=2 * 80 * 80 * 4)
+	assert len(cache) == 14
+	assert [cache.get_radius(bucket) for bucket in (0, 1, 12, 13)] == [3, 6, 39, 40]
+	assert not cache._surfaces
+
+	cache.warm_up([12, 13])
+	assert cache[13].get_size() == (80, 80)
+	assert cache[99] is cache[13]
+	assert cache[-1].get_size() == (6, 6)
+
+	# The bucket used longest ago gets dropped once over budget
+	cache[11]
+	assert list(cache._surfaces) == [13, 0, 11]
+	assert cache._surfaces.bytes == sum(SurfaceCache.get_bytes(surface) for surface in cache._surfaces.values())
+
+
+def test_gradient_matches_drawing_every_circle():
+	from .gradients import draw_radial_gradient
+
+	expected = pygame.Surface((60, 60), flags=pygame.SRCALPHA)
+	for inner in range(30, 0, -1):
+		colour = int(255 * (1 - (inner / 30) ** 3))
+		pygame.draw.circle(expected, (colour, colour, colour, colour), (30, 30), inner)
+
+	assert pygame.image.tobytes(draw_radial_gradient(30, 3), "RGBA") == pygame.image.tobytes(expected, "RGBA")
+
+
+def test_gradients_are_kept_on_disk(tmp_path, monkeypatch):
+	from .gradients import GradientCache
+
+	cache = GradientCache(40, 2, 3, 1.5, cache_dir=str(tmp_path))
+	expected = {bucket: pygame.image.tobytes(cache[bucket], "RGBA") for bucket in (3, 10, 19)}
+	assert cache[10].get_size() == (int(2 * 21 * 1.5), int(2 * 21 / 1.5))
+	assert len(list(tmp_path.iterdir())) == 1
+
+	# Another run reads them back instead of drawing them
+	def draw(self, bucket):
+		raise AssertionError("Gradient should have been loaded from disk")
+
+	with monkeypatch.context() as patch:
+		patch.setattr(GradientCache, "draw", draw)
+
+		cache = GradientCache(40, 2, 3, 1.5, cache_dir=str(tmp_path))
+		for bucket, data in expected.items():
+			assert pygame.image.tobytes(cache[bucket], "RGBA") == data
+
+	# Buckets added after the file was mapped are read from the file
+	cache[5]
+	cache.clear()
+	assert pygame.image.tobytes(cache[5], "RGBA") == pygame.image.tobytes(GradientCache(40, 2, 3, 1.5).draw(5), "RGBA")
+
+	# Other settings get their own file
+	GradientCache(40, 2, 1.4, cache_dir=str(tmp_path))[3]
+	assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_gradient_file_is_safe_to_share(tmp_path):
+	import mmap
+
+	from .gradients import GradientCache
+
+	first = GradientCache(40, 2, 3, cache_dir=str(tmp_path))
+	second = GradientCache(40, 2, 3, cache_dir=str(tmp_path))
+
+	# Loaded surfaces are copies, so nothing keeps pointing into the map
+	first[4]
+	third = GradientCache(40, 2, 3, cache_dir=str(tmp_path))
+	surface = third[4]
+	third._packed.close()
+	assert pygame.image.tobytes(surface, "RGBA") == pygame.image.tobytes(first[4], "RGBA")
+
+	# A bucket another run already stored is not appended again
+	size = os.path.getsize(first.cache_path)
+	assert pygame.image.tobytes(second[4], "RGBA") == pygame.image.tobytes(surface, "RGBA")
+	assert os.path.getsize(first.cache_path) == size
+
+	# A file from another version gets replaced, while runs that mapped it can keep reading it
+	with open(first.cache_path, "r+b") as file:
+		file.write(b"XXXX")
+		file.flush()
+		stale = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+	GradientCache(40, 2, 3, cache_dir=str(tmp_path))[1]
+	assert len(stale) == size
+	assert stale[:4] == b"XXXX"
+	assert len(list(tmp_path.iterdir())) == 1
+
+	# Runs that still have the old file mapped stop writing to the replaced one
+	size = os.path.getsize(second.cache_path)
+	second[2]
+	assert os.path.getsize(second.cache_path) == size
+	stale.close()
+
+
+@pytest.mark.parametrize("scale", [1, 0.5])
+def test_baked_lights_match_drawn_lights(scale: float):
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 160)
+	Common.set("screen_height", 120)
+
+	managers = [
+		LightingManager(0.2, 0.5, chunk_size=50, lightmap_scale=scale, bake_static_lights=bake) for bake in (False, True)
+	]
+	for manager in managers:
+		for i in range(12):
+			manager.add_light(Light((i * 23 - 40, (i * 37) % 160 - 20), 0.6 + i * 0.1, 20 + i, 0, 0))
+		# Baked and drawn lights have to round fractional positions the same way
+		for pos in ((30.4, 40.7), (101.6, 12.2), (-5.7, 90.4), (64.8, 99.3)):
+			manager.add_light(Light(pos, 0.9, 18, 0, 0))
+		manager.add_light(Light(pygame.Vector2(80, 60), 1, 25, 3, 2))
+
+	# Offset by whole lightmap pixels, as baked lights can otherwise move by a lightmap pixel
+	camera = Camera((-14, 8))
+	frames = []
+	for manager in managers:
+		surface = pygame.Surface((160, 120))
+		surface.fill((150, 150, 150))
+		manager.draw_lights(surface, camera)
+		frames.append(surface)
+
+	baked_manager = managers[1]
+	tiles = dict(baked_manager._tiles.items())
+	assert any(tile[1] is not None for tile in tiles.values())
+
+	assert pygame.image.tobytes(frames[0], "RGB") == pygame.image.tobytes(frames[1], "RGB")
+
+	baked_manager.draw_lights(pygame.Surface((160, 120)), camera)
+	assert all(baked_manager._tiles.get(chunk) is tile for chunk, tile in tiles.items())
+
+	light = baked_manager.lights[3]
+	top_left, bottom_right = baked_manager._light_chunk_ranges[light]
+	light.set_brightness(0.1)
+	assert top_left not in baked_manager._tiles and bottom_right not in baked_manager._tiles
+
+	with pytest.raises(ValueError):
+		LightingManager(0.2, 0.5, chunk_size=50, lightmap_scale=0.25, bake_static_lights=True)
+
+
+def test_baked_tiles_are_bounded():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 40)
+	Common.set("screen_height", 40)
+
+	manager = LightingManager(0.2, 0.5, chunk_size=50, bake_static_lights=True, max_tile_bytes=3 * 50 * 50 * 4)
+	for chunk in range(6):
+		manager.add_light(Light((chunk * 50 + 25, 25), 1, 10, 0, 0))
+
+	# Each view only covers one chunk
+	for chunk in range(6):
+		manager.draw_lights(pygame.Surface((40, 40)), Camera((chunk * 50 + 5, 5)))
+
+	assert list(manager._tiles) == [(3, 0), (4, 0), (5, 0)]
+	assert manager._tiles.bytes <= manager._tiles.max_bytes
+
+
+def test_changing_light_reach_updates_manager():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 160)
+	Common.set("screen_height", 120)
+
+	manager = LightingManager(0.2, 0.5, chunk_size=50, bake_static_lights=True)
+	light = manager.add_light(Light((25, 25), 1, 20, 0, 0))
+	camera = Camera((-50, -50))
+
+	manager.draw_lights(pygame.Surface((160, 120)), camera)
+	assert manager._light_chunk_ranges[light] == ((0, 0), (0, 0))
+	assert list(manager._tiles) == [(0, 0)]
+
+	light.radius = 40
+	assert manager._light_chunk_ranges[light] == ((-1, -1), (1, 1))
+	assert (0, 0) not in manager._tiles
+
+	manager.draw_lights(pygame.Surface((160, 120)), camera)
+	assert (1, 1) in manager._tiles
+
+	light.variation = 40
+	assert not light.static
+	assert manager._light_chunk_ranges[light] == ((-2, -2), (2, 2))
+	assert len(manager._tiles) == 0
+
+
+
+def test_changing_light_updates_baked_tiles():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 160)
+	Common.set("screen_height", 120)
+
+	manager = LightingManager(0.2, 0.5, chunk_size=50, bake_static_lights=True)
+	light = manager.add_light(Light((25, 25), 0.5, 20, 0, 0))
+	camera = Camera((-50, -50))
+
+	def draw() -> list[tuple[int, int]]:
+		manager.draw_lights(pygame.Surface((160, 120)), camera)
+		return list(manager._tiles)
+
+	assert draw() == [(0, 0)]
+
+	# Changing the copy doesn't move the light
+	light.pos.x += 50
+	assert light.pos == (25, 25)
+	assert draw() == [(0, 0)]
+
+	light.pos += (50, 0)
+	assert manager._light_chunk_ranges[light] == ((1, 0), (1, 0))
+	assert draw() == [(1, 0)]
+
+	light.brightness = 1.5
+	assert (light.brightness, light.add_brightness) == (1, 0.5)
+	assert len(manager._tiles) == 0
+	assert draw() == [(1, 0)]
+
+	light.tint = (255, 0, 0)
+	assert len(manager._tiles) == 0
+
+	linked = Light(pygame.Vector2(0, 0), 1, 20, 0, 0)
+	assert linked.pos is linked.pos
+	with pytest.raises(RuntimeError):
+		linked.pos = (10, 10)
+
+
+def test_shadows_are_batched():
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 100)
+	Common.set("screen_height", 80)
+
+	manager = LightingManager(0.5, 0.4)
+	shadows = [manager.add_shadow(Shadow((x * 13.7 - 30, x * 7.3 - 20), 8 + x % 3 * 2)) for x in range(14)]
+	assert len({id(shadow.surf) for shadow in shadows}) == 3
+
+	camera = Camera((-5, 3))
+	surface = pygame.Surface((100, 80))
+	surface.fill((200, 200, 200))
+	manager.draw_shadows(surface, camera)
+
+	# Drawn one at a time instead
+	shadow_surf = pygame.Surface((100, 80))
+	shadow_surf.fill((255, 255, 255))
+	for shadow in shadows:
+		shadow.draw(shadow_surf, camera)
+	expected = pygame.Surface((100, 80))
+	expected.fill((200, 200, 200))
+	expected.blit(shadow_surf, (0, 0), special_flags=pygame.BLEND_MULT)
+
+	assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(expected, "RGB")
+	assert surface.get_at(shadows[5].pos - camera.pos)[0] < 200
+
+
+def test_flicker_follows_lighting_clock():
+	from . import lighting_manager
+	from .lighting_manager import LightingManager
+
+	Common.set("screen_width", 100)
+	Common.set("screen_height", 80)
+
+	def run(phases: int | None) -> list[bytes]:
+		manager = LightingManager(0.2, 0.5, flicker_phases=phases)
+		for i in range(5):
+			manager.add_light(Light((20 * i + 10, 40), 1, 20, 4, 1 + i * 0.7))
+
+		frames = []
+		for _ in range(20):
+			manager.update(0.1)
+
+			surface = pygame.Surface((100, 80))
+			surface.fill((150, 150, 150))
+			manager.draw_lights(surface, Camera())
+			frames.append(pygame.image.tobytes(surface, "RGB"))
+
+		return frames
+
+	# Replays draw the same no matter how long frames really took
+	assert run(None) == run(None)
+	assert len(set(run(None))) > 1
+
+	manager = LightingManager(0.2, 0.5, flicker_phases=4)
+	light = manager.add_light(Light((50, 40), 1, 20, 4, 2))
+	variations = set()
+	for _ in range(50):
+		manager.update(0.05)
+		assert manager.get_variation(light) == pytest.approx(light.get_variation(manager.time, 4))
+		variations.add(round(manager.get_variation(light), 6))
+	assert variations <= {0, 4, -4}
+
+	# Without numpy, each drawn light works out its own flicker
+	with pytest.MonkeyPatch.context() as patch:
+		patch.setattr(lighting_manager, "np", None)
+		assert run(4) == run(4)
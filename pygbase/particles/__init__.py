@@ -1,11 +1,26 @@
-from .particle_affectors import AffectorTypes, ParticleAttractor
-from .particle_manager import ParticleManager
+from .particle_affectors import (
+	AffectorTypes,
+	ParticleAffector,
+	ParticleAttractor,
+	ParticleRepulsor,
+	ParticleVortex,
+	ParticleDragZone,
+	ParticleFlowField,
+)
+from .particle_manager import ParticleBackends, ParticleManager, ParticleOverflow
 from .particle_spawners import ParticleSpawner, PointSpawner, CircleSpawner, RectSpawner
 
 __all__ = [
 	"AffectorTypes",
+	"ParticleAffector",
 	"ParticleAttractor",
+	"ParticleRepulsor",
+	"ParticleVortex",
+	"ParticleDragZone",
+	"ParticleFlowField",
+	"ParticleBackends",
 	"ParticleManager",
+	"ParticleOverflow",
 	"ParticleSpawner",
 	"PointSpawner",
 	"CircleSpawner",
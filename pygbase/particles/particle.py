@@ -9,6 +9,31 @@ from ..camera import Camera
 from ..common import ParticleOptions as Options, Common
 
 
+class ParticleImageTable:
+	"""
+	Flattens the image caches of `Particle` into one list of surfaces, so particles can refer to their cache by id.
+	`start[cache_id] + int(size)` indexes into `surfaces`.
+	"""
+
+	def __init__(self):
+		self._ids: dict[tuple[str, pygame.typing.ColorLike], int] = {}
+		self.start: list[int] = []
+		self.length: list[int] = []
+		self.surfaces: list[pygame.Surface] = []
+
+	def get_id(self, settings: dict, color: pygame.typing.ColorLike) -> int:
+		key = settings[Options.NAME], color
+		if key not in self._ids:
+			cache = Particle.PARTICLE_IMAGE_CACHE[settings[Options.NAME]][color]
+
+			self._ids[key] = len(self.start)
+			self.start.append(len(self.surfaces))
+			self.length.append(len(cache))
+			self.surfaces.extend(cache)
+
+		return self._ids[key]
+
+
 class Particle:
 	__slots__ = [
 		"pos",
@@ -21,7 +46,10 @@ class Particle:
 		"effector",
 		"bounce_ranges",
 		"cache",
-		"has_moved_chunk",
+		"spawn_id",
+		"chunk",
+		"chunk_index",
+		"rng",
 	]
 
 	PARTICLE_IMAGE_CACHE: dict[str, dict[pygame.typing.ColorLike, list[pygame.Surface]]] = {}
@@ -45,18 +73,39 @@ class Particle:
 
 			cls.PARTICLE_IMAGE_CACHE[particle_type] = cache
 
-	def __init__(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0)):
-		self.pos = pygame.Vector2(pos)
+	def __init__(
+			self,
+			pos: pygame.typing.Point,
+			settings: dict,
+			initial_velocity=(0, 0),
+			rng: random.Random | None = None,
+	):
+		"""
+		:param rng: Generator for the random attributes and bounces, the global `random` state if None
+		"""
 
-		self.size: float = random.uniform(settings[Options.SIZE][0], settings[Options.SIZE][1])
-		self.size_decay: float = random.uniform(
+		self.pos = pygame.Vector2()
+		self.velocity = pygame.Vector2()
+
+		self.reset(pos, settings, initial_velocity, rng)
+
+	def reset(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0), rng: random.Random | None = None):
+		"""Re-initialises the particle, so it can be reused by the pool in `ParticleManager`"""
+
+		self.rng = random if rng is None else rng
+		rng = self.rng
+
+		self.pos.update(pos)
+
+		self.size: float = rng.uniform(settings[Options.SIZE][0], settings[Options.SIZE][1])
+		self.size_decay: float = rng.uniform(
 			settings[Options.SIZE_DECAY][0], settings[Options.SIZE_DECAY][1]
 		)
 
-		self.color = random.choice(settings[Options.COLOR])
+		self.color = rng.choice(settings[Options.COLOR])
 
-		self.velocity: pygame.Vector2 = pygame.Vector2(initial_velocity)
-		self.velocity_decay: float = random.uniform(
+		self.velocity.update(initial_velocity)
+		self.velocity_decay: float = rng.uniform(
 			settings[Options.VELOCITY_DECAY][0], settings[Options.VELOCITY_DECAY][1]
 		)
 
@@ -67,13 +116,10 @@ class Particle:
 
 		self.cache = self.PARTICLE_IMAGE_CACHE[settings[Options.NAME]][self.color]
 
-		self.has_moved_chunk = False
-
-	def moved_chunk(self):
-		self.has_moved_chunk = True
+		self.spawn_id = 0
 
 	def alive(self):
-		return self.size > 0.2 and not self.has_moved_chunk
+		return self.size > 0.2
 
 	def update(self, delta: float, colliders: list[pygame.Rect | pygame.FRect]):
 		# Pre-calculate some repeated values
@@ -92,7 +138,7 @@ class Particle:
 		for collider in colliders:
 			if collider.collidepoint(new_pos_x, self.pos.y):
 				new_pos_x -= vel_x * delta
-				vel_x *= -random.uniform(*self.bounce_ranges[0])
+				vel_x *= -self.rng.uniform(*self.bounce_ranges[0])
 				break  # TODO: Potentially buggy
 
 		# Update y velocity
@@ -106,7 +152,7 @@ class Particle:
 		for collider in colliders:
 			if collider.collidepoint(new_pos_x, new_pos_y):
 				new_pos_y -= vel_y * delta
-				vel_y *= -random.uniform(*self.bounce_ranges[1])
+				vel_y *= -self.rng.uniform(*self.bounce_ranges[1])
 				break
 
 		# Update position and velocity
@@ -1,18 +1,61 @@
 import enum
-from typing import TYPE_CHECKING
+from abc import abstractmethod
+from typing import TYPE_CHECKING, Self, Sequence
 
 import pygame
 
+from ..debug import Debug
+
+try:
+	import numpy as np
+except ImportError:
+	np = None  # Only needed by the `NUMPY` particle backend
+
 if TYPE_CHECKING:
+	import pygbase_particles
+
+	from ..camera import Camera
 	from .particle import Particle
 
 
 class AffectorTypes(enum.Enum):
 	ATTRACTOR = enum.auto()
+	REPULSOR = enum.auto()
+	VORTEX = enum.auto()
+	DRAG_ZONE = enum.auto()
+	FLOW_FIELD = enum.auto()
 
 
-class ParticleAttractor:
-	def __init__(self, pos: pygame.typing.Point, radius: float, strength: float):
+class ArrayParticle:
+	"""Stand-in particle over one row of the arrays passed to `ParticleAffector.affect_arrays`"""
+
+	__slots__ = ["pos", "velocity", "size", "effector"]
+
+	def __init__(self, pos: pygame.typing.Point, velocity: pygame.typing.Point, size: float):
+		self.pos = pygame.Vector2(pos)
+		self.velocity = pygame.Vector2(velocity)
+		self.size = size
+		self.effector = True  # Only effector particles get passed to affectors
+
+
+class ParticleAffector:
+	"""
+	Base class for affectors.
+	Subclasses implement `get_bounds`, `affect_particles` (`PYTHON` backend) and optionally `affect_arrays` (`NUMPY` backend).
+	Each is called once per affector for every chunk of particles within its bounds.
+	The `NATIVE` backend only supports affectors that set `supports_native` and implement `add_native`.
+	"""
+
+	supports_native = False  # Whether `add_native` is implemented
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+
+		# The native copy would not behave the same way, so subclasses changing the behaviour have to opt in again
+		if "affect_particles" in cls.__dict__ or "affect_arrays" in cls.__dict__:
+			cls.supports_native = cls.__dict__.get("supports_native", False)
+
+	def __init__(self, pos: pygame.typing.Point):
 		self._linked_pos: bool
 		if isinstance(pos, pygame.Vector2):
 			self._linked_pos = True
@@ -21,9 +64,6 @@ class ParticleAttractor:
 			self._linked_pos = False
 			self.pos = pygame.Vector2(pos)
 
-		self.radius = radius
-		self.strength = strength
-
 		self.active = True
 
 	def update_pos(self, pos):
@@ -32,22 +72,378 @@ class ParticleAttractor:
 
 		self.pos.update(pos)
 
-	def _get_towards(self, pos: pygame.Vector2) -> tuple[pygame.Vector2, float]:
-		direction_vector = self.pos - pos
-		return direction_vector.normalize(), direction_vector.length()
+	@abstractmethod
+	def get_bounds(self) -> tuple[float, float, float, float]:
+		"""World space (left, top, right, bottom) of the area this affector can affect"""
+
+	@abstractmethod
+	def affect_particles(self, delta: float, particles: list["Particle"]):
+		"""Will run when active"""
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		"""
+		Array version of `affect_particles`, used by the `NUMPY` backend.
+		Only gets effector particles, and modifies `velocity` and `size` in place.
+
+		Runs `affect_particles` on stand-in particles by default, which is much slower than working on the arrays.
+		"""
+
+		particles = [
+			ArrayParticle(particle_pos, particle_velocity, particle_size)
+			for particle_pos, particle_velocity, particle_size in zip(pos.tolist(), velocity.tolist(), size.tolist())
+		]
+
+		self.affect_particles(delta, particles)
+
+		velocity[:] = [(particle.velocity.x, particle.velocity.y) for particle in particles]
+		size[:] = [particle.size for particle in particles]
+
+	@classmethod
+	def affect_particles_many(cls, delta: float, affectors: Sequence[Self], particles: list["Particle"]):
+		"""Applies several affectors of this type to the same particles"""
+
+		for affector in affectors:
+			affector.affect_particles(delta, particles)
+
+	@classmethod
+	def affect_arrays_many(
+			cls,
+			delta: float,
+			affectors: Sequence[Self],
+			pos: "np.ndarray",
+			velocity: "np.ndarray",
+			size: "np.ndarray",
+	):
+		for affector in affectors:
+			affector.affect_arrays(delta, pos, velocity, size)
+
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		"""Adds the native equivalent of this affector, used by the `NATIVE` backend when `supports_native` is set"""
+
+		raise NotImplementedError(f"`{type(self).__name__}` does not support the `NATIVE` particle backend")
+
+	def draw_debug(self, camera: "Camera"):
+		left, top, right, bottom = self.get_bounds()
+		Debug.draw_rect(pygame.Rect(camera.world_to_screen((left, top)), (right - left, bottom - top)), "yellow")
+
+
+class RadialAffector(ParticleAffector):
+	def __init__(self, pos: pygame.typing.Point, radius: float, strength: float):
+		super().__init__(pos)
+
+		self.radius = radius
+		self.strength = strength
+
+	def get_bounds(self) -> tuple[float, float, float, float]:
+		return self.pos.x - self.radius, self.pos.y - self.radius, self.pos.x + self.radius, self.pos.y + self.radius
+
+	def _get_offsets(self, pos: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+		"""Offsets from particles to the affector, and their squared lengths"""
+
+		offset = np.array((self.pos.x, self.pos.y)) - pos
+		return offset, np.einsum("ij,ij->i", offset, offset)
+
+	def draw_debug(self, camera: "Camera"):
+		Debug.draw_circle(camera.world_to_screen(self.pos), self.radius, "yellow")
+
+
+class ParticleAttractor(RadialAffector):
+	"""Pulls particles in, and removes them once they get close enough"""
+
+	supports_native = True
 
 	def affect_particles(self, delta: float, particles: list["Particle"]):
 		"""Will run when active"""
 
+		pos_x, pos_y = self.pos
+		radius_squared = self.radius ** 2
+		strength = self.strength * delta
+
+		for particle in particles:
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			offset_x = pos_x - particle_pos.x
+			offset_y = pos_y - particle_pos.y
+			distance_squared = offset_x * offset_x + offset_y * offset_y
+
+			if distance_squared > radius_squared:
+				continue
+
+			if distance_squared < 36:
+				particle.size = 0
+				continue
+
+			# Normalised direction * (strength / distance), without the square root
+			factor = strength / distance_squared
+			velocity = particle.velocity
+			velocity.x += offset_x * factor
+			velocity.y += offset_y * factor
+
+	@classmethod
+	def affect_particles_many(cls, delta: float, attractors: Sequence["ParticleAttractor"], particles: list["Particle"]):
+		"""Applies several attractors in a single pass over the particles"""
+
+		attractor_data = [
+			(attractor.pos.x, attractor.pos.y, attractor.radius ** 2, attractor.strength * delta)
+			for attractor in attractors
+		]
+
 		for particle in particles:
-			if particle.effector:
-				direction_vector, distance = self._get_towards(particle.pos)
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			particle_x = particle_pos.x
+			particle_y = particle_pos.y
+			velocity = particle.velocity
+
+			for pos_x, pos_y, radius_squared, strength in attractor_data:
+				offset_x = pos_x - particle_x
+				offset_y = pos_y - particle_y
+				distance_squared = offset_x * offset_x + offset_y * offset_y
 
-				if distance > self.radius:
+				if distance_squared > radius_squared:
 					continue
 
-				if distance < 6:
+				if distance_squared < 36:
 					particle.size = 0
-					continue
+					break
+
+				factor = strength / distance_squared
+				velocity.x += offset_x * factor
+				velocity.y += offset_y * factor
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		self.affect_arrays_many(delta, (self,), pos, velocity, size)
+
+	@classmethod
+	def affect_arrays_many(
+			cls,
+			delta: float,
+			attractors: Sequence["ParticleAttractor"],
+			pos: "np.ndarray",
+			velocity: "np.ndarray",
+			size: "np.ndarray",
+	):
+		centers = np.array([(attractor.pos.x, attractor.pos.y) for attractor in attractors], dtype=np.float64)
+		radius_squared = np.array([attractor.radius ** 2 for attractor in attractors], dtype=np.float64)
+		strength = np.array([attractor.strength * delta for attractor in attractors], dtype=np.float64)
+
+		offset = centers[None, :, :] - pos[:, None, :]  # (particle, attractor, axis)
+		distance_squared = np.einsum("ijk,ijk->ij", offset, offset)
+
+		in_range = distance_squared <= radius_squared
+		absorbed = in_range & (distance_squared < 36)
+		pulled = in_range & ~absorbed
+
+		factor = np.divide(strength, distance_squared, out=np.zeros_like(distance_squared), where=pulled)
+		velocity += np.einsum("ijk,ij->ik", offset, factor)
+		size[absorbed.any(axis=1)] = 0
+
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		native_manager.add_attractor((self.pos.x, self.pos.y), self.radius, self.strength)
+
+
+class ParticleRepulsor(RadialAffector):
+	"""Pushes particles away, more strongly the closer they are"""
+
+	supports_native = True
+
+	def affect_particles(self, delta: float, particles: list["Particle"]):
+		pos_x, pos_y = self.pos
+		radius_squared = self.radius ** 2
+		strength = self.strength * delta
+
+		for particle in particles:
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			offset_x = particle_pos.x - pos_x
+			offset_y = particle_pos.y - pos_y
+			distance_squared = offset_x * offset_x + offset_y * offset_y
+
+			if distance_squared > radius_squared or distance_squared == 0:
+				continue
+
+			factor = strength / distance_squared
+			velocity = particle.velocity
+			velocity.x += offset_x * factor
+			velocity.y += offset_y * factor
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		offset, distance_squared = self._get_offsets(pos)
+		pushed = (distance_squared <= self.radius ** 2) & (distance_squared > 0)
+
+		factor = np.divide(self.strength * delta, distance_squared, out=np.zeros_like(distance_squared), where=pushed)
+		velocity -= offset * factor[:, None]
+
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		native_manager.add_repulsor((self.pos.x, self.pos.y), self.radius, self.strength)
+
+
+class ParticleVortex(RadialAffector):
+	"""Swirls particles around its position. Positive strength spins anticlockwise on screen"""
+
+	supports_native = True
+
+	def affect_particles(self, delta: float, particles: list["Particle"]):
+		pos_x, pos_y = self.pos
+		radius_squared = self.radius ** 2
+		strength = self.strength * delta
+
+		for particle in particles:
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			offset_x = pos_x - particle_pos.x
+			offset_y = pos_y - particle_pos.y
+			distance_squared = offset_x * offset_x + offset_y * offset_y
+
+			if distance_squared > radius_squared or distance_squared == 0:
+				continue
+
+			# Perpendicular to the direction towards the centre
+			factor = strength / distance_squared
+			velocity = particle.velocity
+			velocity.x -= offset_y * factor
+			velocity.y += offset_x * factor
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		offset, distance_squared = self._get_offsets(pos)
+		swirled = (distance_squared <= self.radius ** 2) & (distance_squared > 0)
+
+		factor = np.divide(self.strength * delta, distance_squared, out=np.zeros_like(distance_squared), where=swirled)
+		velocity[:, 0] -= offset[:, 1] * factor
+		velocity[:, 1] += offset[:, 0] * factor
+
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		native_manager.add_vortex((self.pos.x, self.pos.y), self.radius, self.strength)
+
+
+class ParticleDragZone(ParticleAffector):
+	"""
+	Rectangle of moving air. Particles inside get dragged towards the `wind` velocity,
+	with `drag` being how quickly they match it (per second).
+	"""
+
+	supports_native = True
+
+	def __init__(self, pos: pygame.typing.Point, size: pygame.typing.Point, drag: float, wind: pygame.typing.Point = (0, 0)):
+		super().__init__(pos)
+
+		self.size = size
+		self.drag = drag
+		self.wind = pygame.Vector2(wind)
+
+	def get_bounds(self) -> tuple[float, float, float, float]:
+		return self.pos.x, self.pos.y, self.pos.x + self.size[0], self.pos.y + self.size[1]
+
+	def affect_particles(self, delta: float, particles: list["Particle"]):
+		left, top, right, bottom = self.get_bounds()
+		wind_x, wind_y = self.wind
+		amount = min(self.drag * delta, 1)
+
+		for particle in particles:
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			if left <= particle_pos.x < right and top <= particle_pos.y < bottom:
+				velocity = particle.velocity
+				velocity.x += (wind_x - velocity.x) * amount
+				velocity.y += (wind_y - velocity.y) * amount
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		left, top, right, bottom = self.get_bounds()
+		inside = (pos[:, 0] >= left) & (pos[:, 0] < right) & (pos[:, 1] >= top) & (pos[:, 1] < bottom)
+
+		velocity[inside] += (np.array((self.wind.x, self.wind.y)) - velocity[inside]) * min(self.drag * delta, 1)
+
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		native_manager.add_drag_zone(self.get_bounds(), self.drag, (self.wind.x, self.wind.y))
+
+
+class ParticleFlowField(ParticleAffector):
+	"""
+	Grid of accelerations, with `pos` as its top left corner.
+	Particles get accelerated by the cell they are in, scaled by `strength`.
+	"""
+
+	supports_native = True
+
+	def __init__(
+			self,
+			pos: pygame.typing.Point,
+			cell_size: float,
+			flow: Sequence[Sequence[pygame.typing.Point]],
+			strength: float = 1,
+	):
+		super().__init__(pos)
+
+		self.cell_size = cell_size
+		self.flow: list[list[pygame.Vector2]] = [[pygame.Vector2(cell) for cell in row] for row in flow]
+		self.strength = strength
+
+		self.rows = len(self.flow)
+		self.columns = len(self.flow[0]) if self.rows > 0 else 0
+
+		self._flow_array: "np.ndarray | None" = None
+
+	def set_flow(self, column: int, row: int, flow: pygame.typing.Point):
+		self.flow[row][column].update(flow)
+		self._flow_array = None
+
+	def get_bounds(self) -> tuple[float, float, float, float]:
+		return (
+			self.pos.x,
+			self.pos.y,
+			self.pos.x + self.columns * self.cell_size,
+			self.pos.y + self.rows * self.cell_size,
+		)
+
+	def affect_particles(self, delta: float, particles: list["Particle"]):
+		left, top = self.pos
+		cell_size = self.cell_size
+		columns = self.columns
+		rows = self.rows
+		flow = self.flow
+		strength = self.strength * delta
+
+		for particle in particles:
+			if not particle.effector:
+				continue
+
+			particle_pos = particle.pos
+			column = int((particle_pos.x - left) // cell_size)
+			row = int((particle_pos.y - top) // cell_size)
+
+			if 0 <= column < columns and 0 <= row < rows:
+				cell = flow[row][column]
+				velocity = particle.velocity
+				velocity.x += cell.x * strength
+				velocity.y += cell.y * strength
+
+	def affect_arrays(self, delta: float, pos: "np.ndarray", velocity: "np.ndarray", size: "np.ndarray"):
+		if self._flow_array is None:
+			self._flow_array = np.array(
+				[[(cell.x, cell.y) for cell in row] for row in self.flow], dtype=np.float64
+			).reshape(self.rows, self.columns, 2)
+
+		cells = np.floor_divide(pos - np.array((self.pos.x, self.pos.y)), self.cell_size).astype(np.int64)
+		inside = (cells[:, 0] >= 0) & (cells[:, 0] < self.columns) & (cells[:, 1] >= 0) & (cells[:, 1] < self.rows)
+
+		velocity[inside] += self._flow_array[cells[inside, 1], cells[inside, 0]] * (self.strength * delta)
 
-				particle.velocity += direction_vector * (self.strength / distance) * delta
+	def add_native(self, native_manager: "pygbase_particles.ParticleManager"):
+		native_manager.add_flow_field(
+			(self.pos.x, self.pos.y),
+			self.cell_size,
+			self.columns,
+			self.rows,
+			[(cell.x, cell.y) for row in self.flow for cell in row],
+			self.strength,
+		)
@@ -1,71 +1,330 @@
+import enum
+import logging
+import random
+from collections import deque
 from typing import TYPE_CHECKING
 
 import pygame
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 from ..camera import Camera
+from ..common import Common
 from ..debug import Debug
 from ..particles.particle import Particle
-from .particle_affectors import AffectorTypes, ParticleAttractor
+from .particle_affectors import AffectorTypes, ParticleAffector
 
 if TYPE_CHECKING:
+	from .particle_native import NativeParticleStore, NativeParticleView
 	from .particle_spawners import ParticleSpawner
+	from .particle_store import ParticleStore, ParticleView
+
+
+class ParticleBackends(enum.Enum):
+	PYTHON = enum.auto()
+	NUMPY = enum.auto()
+	NATIVE = enum.auto()  # Uses the `pygbase_particles` extension, falling back to `PYTHON` if it is not installed
+
+
+class ParticleOverflow(enum.Enum):
+	"""What happens when a particle gets added to a full `ParticleManager`"""
+
+	GROW = enum.auto()  # Double the capacity
+	DROP_NEW = enum.auto()  # Don't add the new particle
+	DROP_OLDEST = enum.auto()  # Replace the oldest particle
 
 
 class ParticleManager:
-	def __init__(self, chunk_size: int = 400, colliders: tuple[pygame.Rect | pygame.FRect] = ()):
+	def __init__(
+			self,
+			chunk_size: int = 400,
+			colliders: tuple[pygame.Rect | pygame.FRect] = (),
+			backend: ParticleBackends = ParticleBackends.PYTHON,
+			capacity: int = 4096,
+			overflow: ParticleOverflow = ParticleOverflow.GROW,
+			seed: int | None = None,
+			threads: int = 1,
+	):
+		"""
+		:param seed: Seeds every random draw of the manager, so the same seed and inputs replay the same particles.
+		The `NATIVE` backend only replays exactly with the same number of `threads`
+		:param threads: Worker threads the `NATIVE` backend splits its update across, 0 uses every core
+		"""
+
 		self.chunk_size = chunk_size
 
+		self.seed = seed
+		self.py_rng = random.Random(seed)  # Used for single particles and bounces
+
+		# Used by the `NUMPY` backend to sample whole bursts of particles at once.
+		# The other backends never draw from numpy, so whether it is installed does not change their particles
+		self.rng: "np.random.Generator | None" = None
+
+		self.capacity = capacity
+		self.overflow = overflow
+
 		self.particles: dict[tuple[int, int], list[Particle]] = {}
+		self._particle_count = 0
+
+		# Dead particles are kept to be reused, instead of allocating new ones
+		self._free_particles: list[Particle] = []
+		self._next_spawn_id = 0
+		self._spawn_order: deque[tuple[int, Particle]] = deque()  # Only used with `DROP_OLDEST`
+
+		# Only used by the `NUMPY` and `NATIVE` backends, which replace `particles`
+		self.store: "ParticleStore | NativeParticleStore | None" = None
+		if backend == ParticleBackends.NATIVE:
+			try:
+				from .particle_native import NativeParticleStore
+			except ImportError:
+				logging.warning("`pygbase_particles` is not installed, using the `PYTHON` particle backend instead")
+				backend = ParticleBackends.PYTHON
+			else:
+				self.store = NativeParticleStore(chunk_size, capacity, overflow, threads, seed)
+		elif backend == ParticleBackends.NUMPY:
+			if np is None:
+				logging.error("The `NUMPY` particle backend requires numpy to be installed")
+				raise ImportError("The `NUMPY` particle backend requires numpy to be installed")
+
+			from .particle_store import ParticleStore
+
+			self.rng = np.random.default_rng(seed)
+			self.store = ParticleStore(chunk_size, self.rng, capacity, overflow, self.py_rng)
+
+		self.backend = backend
 
 		self.spawners: list[ParticleSpawner] = []
 
-		self.affectors: dict[AffectorTypes, list[ParticleAttractor]] = {AffectorTypes.ATTRACTOR: []}
+		self.affectors: dict[AffectorTypes, list[ParticleAffector]] = {
+			affector_type: [] for affector_type in AffectorTypes
+		}
+
+		# Neighbourhood of colliders around each chunk, rebuilt only when the colliders change
+		self._surrounding_colliders: dict[tuple[int, int], list[pygame.Rect]] = {}
+		self._chunk_colliders: dict[tuple[int, int], list[pygame.Rect]] = {}
+		self.collider_version = 0  # Incremented whenever the colliders change
 
 		self.chunked_colliders: dict[tuple[int, int], list[pygame.Rect]] = {}
 		self.generate_chunked_colliders(colliders)
+
 		self.dynamic_colliders: list[pygame.Rect] = []
+		self.chunked_dynamic_colliders: dict[tuple[int, int], list[pygame.Rect]] = {}
+		self._dynamic_collider_state: list[tuple[float, float, float, float]] = []
 
-	def generate_chunked_colliders(self, colliders):
+	def _get_covered_chunks(self, left: float, top: float, right: float, bottom: float):
+		left_chunk_col, top_chunk_row = self.get_chunk((left, top))
+		right_chunk_col, bottom_chunk_row = self.get_chunk((right, bottom))
+
+		for row in range(top_chunk_row, bottom_chunk_row + 1):
+			for col in range(left_chunk_col, right_chunk_col + 1):
+				yield col, row
+
+	def _bucket_colliders(self, colliders) -> dict[tuple[int, int], list[pygame.Rect]]:
 		chunked_colliders = {}
 
 		for collider in colliders:
-			for x in range(collider.left, collider.right, self.chunk_size):
-				for y in range(collider.top, collider.bottom, self.chunk_size):
-					chunk_pos = self.get_chunk((x, y))
+			for chunk_pos in self._get_covered_chunks(collider.left, collider.top, collider.right, collider.bottom):
+				chunked_colliders.setdefault(chunk_pos, []).append(collider)
 
-					chunked_colliders.setdefault(chunk_pos, []).append(collider)
+		return chunked_colliders
 
-		self.chunked_colliders = chunked_colliders
+	def _invalidate_colliders(self, static: bool):
+		if static:
+			self._surrounding_colliders.clear()
+
+		self._chunk_colliders.clear()
+		self.collider_version += 1
+
+	def generate_chunked_colliders(self, colliders):
+		self.chunked_colliders = self._bucket_colliders(colliders)
+		self._invalidate_colliders(True)
 
 	def pass_dynamic_colliders(self, colliders: list[pygame.Rect]):
+		state = [(collider.x, collider.y, collider.w, collider.h) for collider in colliders]
+		if state == self._dynamic_collider_state:
+			return
+
+		self._dynamic_collider_state = state
+
 		self.dynamic_colliders[:] = colliders[:]  # Contents of dynamic_colliders gets set to contents of colliders
+		self.chunked_dynamic_colliders = self._bucket_colliders(self.dynamic_colliders)
+		self._invalidate_colliders(False)
 
-	def get_surrounding_colliders(self, chunk_pos: tuple):
-		min_row = chunk_pos[1] - 1
-		max_row = chunk_pos[1] + 2
-		min_col = chunk_pos[0] - 1
-		max_col = chunk_pos[0] + 2
+	def _get_neighbourhood(self, chunked_colliders: dict, chunk_pos: tuple) -> list[pygame.Rect]:
+		colliders = {}
+		for row in range(chunk_pos[1] - 1, chunk_pos[1] + 2):
+			for col in range(chunk_pos[0] - 1, chunk_pos[0] + 2):
+				for collider in chunked_colliders.get((col, row), ()):
+					colliders[id(collider)] = collider  # Colliders spanning multiple chunks only get added once
 
-		colliders = []
-		for row in range(min_row, max_row):
-			for col in range(min_col, max_col):
-				colliders.extend(self.chunked_colliders.get((col, row), []))
+		return list(colliders.values())
 
-		return colliders
+	def get_surrounding_colliders(self, chunk_pos: tuple) -> list[pygame.Rect]:
+		"""Static colliders around a chunk. The returned list is cached, and should not be modified"""
 
-	def add_particle(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0)):
-		chunk_pos = self.get_chunk(pos)
+		if chunk_pos not in self._surrounding_colliders:
+			self._surrounding_colliders[chunk_pos] = self._get_neighbourhood(self.chunked_colliders, chunk_pos)
 
-		self.particles.setdefault(chunk_pos, []).append(Particle(pos, settings, initial_velocity))
+		return self._surrounding_colliders[chunk_pos]
 
-	def get_particles(self, pos: pygame.typing.Point, size: pygame.typing.Point) -> list[Particle]:
-		# TODO: Optimize in same way as `get_surrounding_colliders`
+	def get_chunk_colliders(self, chunk_pos: tuple) -> list[pygame.Rect]:
+		"""Static and dynamic colliders around a chunk. The returned list is cached, and should not be modified"""
+
+		if chunk_pos not in self._chunk_colliders:
+			self._chunk_colliders[chunk_pos] = [
+				*self.get_surrounding_colliders(chunk_pos),
+				*self._get_neighbourhood(self.chunked_dynamic_colliders, chunk_pos),
+			]
+
+		return self._chunk_colliders[chunk_pos]
+
+	def add_particle(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0)):
+		if self.store is not None:
+			self.store.add(pos, settings, initial_velocity)
+			return
+
+		if self._particle_count >= self.capacity:
+			if self.overflow == ParticleOverflow.DROP_NEW:
+				return
+			elif self.overflow == ParticleOverflow.DROP_OLDEST:
+				self._remove_oldest_particle()
+			else:
+				self.capacity *= 2
+
+		self._add_pooled_particle(pos, settings, initial_velocity)
+		self._prune_spawn_order()
+
+	def add_particles(self, positions, settings: dict, velocities=None):
+		"""
+		Adds a burst of particles with the same settings in one call.
+
+		:param positions: Sequence or (n, 2) array of positions
+		:param velocities: Sequence or (n, 2) array of initial velocities, or None to start still
+		"""
+
+		if self.store is not None:
+			self.store.add_many(positions, settings, velocities)
+			return
+
+		if hasattr(positions, "tolist"):
+			positions = positions.tolist()
+		if hasattr(velocities, "tolist"):
+			velocities = velocities.tolist()
+
+		# The overflow policy is applied once for the whole burst
+		free = self.capacity - self._particle_count
+		if len(positions) > free:
+			if self.overflow == ParticleOverflow.DROP_NEW:
+				positions = positions[:max(free, 0)]
+				if velocities is not None:
+					velocities = velocities[:len(positions)]
+			elif self.overflow == ParticleOverflow.DROP_OLDEST:
+				# The newest particles of the burst are kept
+				positions = positions[-self.capacity:]
+				if velocities is not None:
+					velocities = velocities[-self.capacity:]
+
+				for _ in range(min(len(positions) - free, self._particle_count)):
+					self._remove_oldest_particle()
+			else:
+				while self.capacity - self._particle_count < len(positions):
+					self.capacity *= 2
+
+		add_pooled_particle = self._add_pooled_particle
+		if velocities is None:
+			for pos in positions:
+				add_pooled_particle(pos, settings, (0, 0))
+		else:
+			for pos, velocity in zip(positions, velocities):
+				add_pooled_particle(pos, settings, velocity)
+
+		self._prune_spawn_order()
+
+	def _add_pooled_particle(self, pos: pygame.typing.Point, settings: dict, initial_velocity):
+		"""Adds a particle, reusing a dead one if possible. Does not check the capacity"""
+
+		if self._free_particles:
+			particle = self._free_particles.pop()
+			particle.reset(pos, settings, initial_velocity, self.py_rng)
+		else:
+			particle = Particle(pos, settings, initial_velocity, self.py_rng)
+
+		particle.spawn_id = self._next_spawn_id
+		self._next_spawn_id += 1
+
+		if self.overflow == ParticleOverflow.DROP_OLDEST:
+			self._spawn_order.append((particle.spawn_id, particle))
+
+		self._file_particle(particle, (int(pos[0] // self.chunk_size), int(pos[1] // self.chunk_size)))
+		self._particle_count += 1
+
+	def _prune_spawn_order(self):
+		# Drop entries of particles that already died
+		if len(self._spawn_order) > self.capacity * 2:
+			self._spawn_order = deque(
+				(spawn_id, particle) for spawn_id, particle in self._spawn_order if particle.spawn_id == spawn_id
+			)
+
+	def _file_particle(self, particle: Particle, chunk_pos: tuple[int, int]):
+		"""Adds a particle to a chunk, remembering where it went so it can be removed without searching"""
+
+		chunk = self.particles.setdefault(chunk_pos, [])
+		particle.chunk = chunk_pos
+		particle.chunk_index = len(chunk)
+		chunk.append(particle)
+
+	def _free_particle(self, particle: Particle):
+		self._particle_count -= 1
+		particle.spawn_id = -1
+
+		if len(self._free_particles) < self.capacity:
+			self._free_particles.append(particle)
+
+	def _remove_oldest_particle(self):
+		while self._spawn_order:
+			spawn_id, particle = self._spawn_order.popleft()
+			if particle.spawn_id != spawn_id:
+				continue  # Already died, and was possibly reused
+
+			# Swap remove
+			chunk = self.particles[particle.chunk]
+			last = chunk.pop()
+			if last is not particle:
+				chunk[particle.chunk_index] = last
+				last.chunk_index = particle.chunk_index
+			elif not chunk:
+				del self.particles[particle.chunk]
+
+			self._free_particle(particle)
+			return
+
+	def get_particles(
+			self, pos: pygame.typing.Point, size: pygame.typing.Point
+	) -> list["Particle | ParticleView | NativeParticleView"]:
 		left_chunk_col, top_chunk_row = self.get_chunk(pos)
 		(
 			right_chunk_col,
 			bottom_chunk_row,
 		) = self.get_chunk((pos[0] + size[0], pos[1] + size[1]))
 
+		if self.store is not None:
+			return self.store.views(
+				self.store.in_chunks(left_chunk_col, top_chunk_row, right_chunk_col, bottom_chunk_row)
+			)
+
+		# Particles move every frame, so unlike colliders there is nothing worth caching.
+		# Large areas check the occupied chunks instead of every chunk in range.
+		if (right_chunk_col - left_chunk_col + 1) * (bottom_chunk_row - top_chunk_row + 1) > len(self.particles):
+			return [
+				particle
+				for (col, row), chunk in self.particles.items()
+				if left_chunk_col <= col <= right_chunk_col and top_chunk_row <= row <= bottom_chunk_row
+				for particle in chunk
+			]
+
 		return [
 			particle
 			for row in range(top_chunk_row, bottom_chunk_row + 1)
@@ -74,62 +333,138 @@ class ParticleManager:
 		]
 
 	def clear(self):
+		if self.store is not None:
+			self.store.clear()
+
 		for chunk_pos, chunk in self.particles.items():
+			for particle in chunk:
+				self._free_particle(particle)
+
 			chunk.clear()
 
 		self.particles.clear()
+		self._spawn_order.clear()
+
+	def particle_count(self) -> int:
+		if self.store is not None:
+			return len(self.store)
+
+		return self._particle_count
+
+	def get_particle_chunks(self) -> list[tuple[int, int]]:
+		if self.store is not None:
+			return self.store.chunks()
+
+		return list(self.particles.keys())
 
 	def get_chunk(self, pos: pygame.typing.Point):
 		return int(pos[0] // self.chunk_size), int(pos[1] // self.chunk_size)
 
 	def add_spawner[SpawnerType: "ParticleSpawner"](self, spawner: SpawnerType) -> SpawnerType:
-		self.spawners.append(spawner)
+		# The `NATIVE` backend runs the spawners it supports itself
+		if self.backend != ParticleBackends.NATIVE or not self.store.add_spawner(spawner):
+			self.spawners.append(spawner)
+
 		return spawner
 
 	def remove_spawner(self, spawner: "ParticleSpawner"):
 		if spawner in self.spawners:
 			self.spawners.remove(spawner)
 
-	def add_affector[AffectorType](
+		if self.backend == ParticleBackends.NATIVE:
+			self.store.remove_spawner(spawner)
+
+	def add_affector[AffectorType: ParticleAffector](
 			self, affector_type: AffectorTypes, affector: AffectorType
 	) -> AffectorType:
-		self.affectors[affector_type].append(affector)
+		self.affectors.setdefault(affector_type, []).append(affector)
 		return affector
 
+	def remove_affector(self, affector_type: AffectorTypes, affector: ParticleAffector):
+		if affector in self.affectors.get(affector_type, []):
+			self.affectors[affector_type].remove(affector)
+
+	def _get_affected_chunks[AffectorType](self, affectors: list[AffectorType]) -> dict[tuple[int, int], list[AffectorType]]:
+		chunk_affectors = {}
+		for affector in affectors:
+			for chunk_pos in self._get_covered_chunks(*affector.get_bounds()):
+				chunk_affectors.setdefault(chunk_pos, []).append(affector)
+
+		return chunk_affectors
+
+	def _update_affectors(self, delta: float):
+		if self.backend == ParticleBackends.NATIVE:
+			# The extension applies them during its update
+			self.store.set_affectors(
+				[affector for affectors in self.affectors.values() for affector in affectors if affector.active]
+			)
+			return
+
+		# Affectors of the same class get applied together, so they can share a pass over each chunk
+		affector_classes: dict[type[ParticleAffector], list[ParticleAffector]] = {}
+		for affectors in self.affectors.values():
+			for affector in affectors:
+				if affector.active:
+					affector_classes.setdefault(type(affector), []).append(affector)
+
+		for affector_class, affectors in affector_classes.items():
+			chunk_affectors = self._get_affected_chunks(affectors)
+
+			if self.store is not None:
+				self.store.affect(delta, chunk_affectors, affector_class.affect_arrays_many)
+				continue
+
+			# Walk the chunk lists in place
+			for chunk_pos, chunk_affector_list in chunk_affectors.items():
+				chunk = self.particles.get(chunk_pos)
+				if chunk is None:
+					continue
+
+				if len(chunk_affector_list) == 1:
+					chunk_affector_list[0].affect_particles(delta, chunk)
+				else:
+					affector_class.affect_particles_many(delta, chunk_affector_list, chunk)
+
 	def update(self, delta: float):
+		if self.backend == ParticleBackends.NATIVE:
+			self.store.sync_spawners(delta)
+
 		for spawner in self.spawners:
 			if spawner.active:
 				spawner.update(delta)
 
-		for affector_type, affectors in self.affectors.items():
-			for affector in affectors:
-				if affector.active:
-					affector.affect_particles(
-						delta,
-						self.get_particles(
-							affector.pos - pygame.Vector2(affector.radius),
-							pygame.Vector2(affector.radius) * 2,
-						),
-					)
+		self._update_affectors(delta)
+
+		if self.store is not None:
+			self.store.update(delta, self)
+			return
 
 		particles_to_move: list[Particle] = []
 		chunks_to_delete: list[tuple[int, int]] = []
 		for chunk_pos, chunk in self.particles.items():
-			surrounding_colliders = [
-				*self.get_surrounding_colliders(chunk_pos),
-				*self.dynamic_colliders,
-			]
+			surrounding_colliders = self.get_chunk_colliders(chunk_pos)
 
-			for particle in chunk:
+			index = 0
+			while index < len(chunk):
+				particle = chunk[index]
 				particle.update(delta, surrounding_colliders)
 
-				new_chunk_pos = self.get_chunk(particle.pos)
+				alive = particle.alive()
+				if alive and self.get_chunk(particle.pos) == chunk_pos:
+					index += 1
+					continue
 
-				if new_chunk_pos != chunk_pos:
+				# Swap remove, the swapped in particle has not been updated yet
+				last = chunk.pop()
+				if last is not particle:
+					chunk[index] = last
+					last.chunk_index = index
+
+				if alive:
 					particles_to_move.append(particle)
-					particle.moved_chunk()
+				else:
+					self._free_particle(particle)
 
-			chunk[:] = [particle for particle in chunk if particle.alive()]
 			if len(chunk) == 0:
 				chunks_to_delete.append(chunk_pos)
 
@@ -137,17 +472,47 @@ class ParticleManager:
 			del self.particles[chunk_pos]
 
 		for particle in particles_to_move:
-			chunk_pos = self.get_chunk(particle.pos)
-
-			self.particles.setdefault(chunk_pos, []).append(particle)
-			particle.has_moved_chunk = False
+			self._file_particle(particle, self.get_chunk(particle.pos))
 
 	def draw(self, surface: pygame.Surface, camera: Camera):
-		surface.fblits([particle.get_blit_pair(camera) for chunk in self.particles.values() for particle in chunk])
+		# Screen position = world position - origin, rounded like `Camera.world_to_screen`
+		origin_x, origin_y = camera.screen_to_world((0, 0))
+
+		margin = Common.get_largest_particle_size()
+		view_left = origin_x - margin
+		view_top = origin_y - margin
+		view_right = origin_x + surface.get_width() + margin
+		view_bottom = origin_y + surface.get_height() + margin
+
+		if self.store is not None:
+			self.store.draw(surface, (origin_x, origin_y), (view_left, view_top, view_right, view_bottom))
+		else:
+			left_chunk_col, top_chunk_row = self.get_chunk((view_left, view_top))
+			right_chunk_col, bottom_chunk_row = self.get_chunk((view_right, view_bottom))
+
+			blits = []
+			add_blit = blits.append
+			for (col, row), chunk in self.particles.items():
+				if not (left_chunk_col <= col <= right_chunk_col and top_chunk_row <= row <= bottom_chunk_row):
+					continue
+
+				for particle in chunk:
+					size = particle.size
+					half_size = round(size / 2)
+					pos = particle.pos
+
+					add_blit(
+						(
+							particle.cache[int(size)],
+							(round(pos.x - half_size - origin_x), round(pos.y - half_size - origin_y)),
+						)
+					)
+
+			surface.fblits(blits)
 
 		# Debug
 		if Debug.is_active():
-			for col, row in self.particles.keys():
+			for col, row in self.get_particle_chunks():
 				Debug.draw_rect(
 					pygame.Rect(
 						camera.world_to_screen((col * self.chunk_size, row * self.chunk_size)),
@@ -167,24 +532,13 @@ class ParticleManager:
 
 			for affector_type, affectors in self.affectors.items():
 				for affector in affectors:
-					left_chunk_col, top_chunk_row = self.get_chunk(
-						affector.pos - pygame.Vector2(affector.radius)
-					)
-					(
-						right_chunk_col,
-						bottom_chunk_row,
-					) = self.get_chunk(
-						(affector.pos - pygame.Vector2(affector.radius)) + pygame.Vector2(affector.radius) * 2
-					)
-
-					for row in range(top_chunk_row, bottom_chunk_row + 1):
-						for col in range(left_chunk_col, right_chunk_col + 1):
-							Debug.draw_circle(camera.world_to_screen(affector.pos), affector.radius, "yellow")
-
-							Debug.draw_rect(
-								pygame.Rect(
-									camera.world_to_screen((col * self.chunk_size, row * self.chunk_size)),
-									(self.chunk_size, self.chunk_size),
-								),
-								"yellow",
-							)
+					affector.draw_debug(camera)
+
+					for col, row in self._get_covered_chunks(*affector.get_bounds()):
+						Debug.draw_rect(
+							pygame.Rect(
+								camera.world_to_screen((col * self.chunk_size, row * self.chunk_size)),
+								(self.chunk_size, self.chunk_size),
+							),
+							"yellow",
+						)
@@ -0,0 +1,287 @@
+import logging
+from typing import TYPE_CHECKING
+
+import pygame
+import pygbase_particles
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+from ..common import ParticleOptions as Options
+from .particle import ParticleImageTable
+from .particle_manager import ParticleOverflow
+
+if TYPE_CHECKING:
+	from .particle_affectors import ParticleAffector
+	from .particle_manager import ParticleManager
+	from .particle_spawners import ParticleSpawner
+
+
+class NativeParticleView:
+	"""
+	Proxy to a single particle inside a `NativeParticleStore`.
+	Only valid until the next `NativeParticleStore.update`, as dead particles get removed.
+	Like `ParticleView`, `pos` and `velocity` return copies, which only write back when assigned.
+	"""
+
+	__slots__ = ["_store", "_index"]
+
+	def __init__(self, store: "NativeParticleStore", index: int):
+		self._store = store
+		self._index = index
+
+	@property
+	def pos(self) -> pygame.Vector2:
+		pos = self._store.pos
+		return pygame.Vector2(pos[self._index, 0], pos[self._index, 1])
+
+	@pos.setter
+	def pos(self, value: pygame.typing.Point):
+		self._store.native.set_particle_pos(self._index, (value[0], value[1]))
+
+	@property
+	def velocity(self) -> pygame.Vector2:
+		return pygame.Vector2(self._store.native.get_particle(self._index)[1])
+
+	@velocity.setter
+	def velocity(self, value: pygame.typing.Point):
+		self._store.native.set_particle_velocity(self._index, (value[0], value[1]))
+
+	@property
+	def size(self) -> float:
+		return float(self._store.size[self._index])
+
+	@size.setter
+	def size(self, value: float):
+		self._store.native.set_particle_size(self._index, value)
+
+	@property
+	def effector(self) -> bool:
+		return self._store.native.get_particle(self._index)[3]
+
+
+class NativeParticleStore:
+	"""
+	Particles stored and updated by the `pygbase_particles` extension, used by the `NATIVE` backend of `ParticleManager`.
+	Has the same interface as `ParticleStore`.
+	"""
+
+	def __init__(
+			self,
+			chunk_size: int,
+			capacity: int = 4096,
+			overflow: ParticleOverflow = ParticleOverflow.GROW,
+			threads: int = 1,
+			seed: int | None = None,
+	):
+		self.native = pygbase_particles.ParticleManager(chunk_size, capacity, overflow.name.lower(), threads, seed)
+
+		# Collider dicts of the `ParticleManager` that were last passed to the extension
+		self._static_colliders: dict | None = None
+		self._dynamic_colliders: dict | None = None
+
+		self.images = ParticleImageTable()
+		self._registered_images = 0  # Number of surfaces last passed to the extension
+
+		# Particle settings already registered with the extension
+		self._registered_settings: set[str] = set()
+
+		# Extension spawner index of each `ParticleSpawner` it runs
+		self._spawners: dict["ParticleSpawner", int] = {}
+
+		self._unsupported_affectors: set[type] = set()
+
+		# Arrays reading the extension's particles in place, taken when first used and dropped when the particles change
+		self._arrays: dict[str, "np.ndarray | memoryview"] = {}
+
+	def __len__(self):
+		return len(self.native)
+
+	def _get_array(self, name: str) -> "np.ndarray | memoryview":
+		if name not in self._arrays:
+			array = getattr(self.native, name)()
+			self._arrays[name] = memoryview(array) if np is None else np.asarray(array)
+
+		return self._arrays[name]
+
+	def _release_arrays(self):
+		# The extension can't grow while its particles are borrowed
+		for array in self._arrays.values():
+			if isinstance(array, memoryview):
+				array.release()
+
+		self._arrays.clear()
+
+	@property
+	def pos(self) -> "np.ndarray | memoryview":
+		"""
+		`(n, 2)` array of positions, read in place from the extension.
+		Like the other arrays, it is read only and only valid until particles get added, removed or updated.
+		A `memoryview` when numpy is not installed.
+		"""
+
+		return self._get_array("particle_positions")
+
+	@property
+	def size(self) -> "np.ndarray | memoryview":
+		return self._get_array("particle_sizes")
+
+	@property
+	def color(self) -> "np.ndarray | memoryview":
+		"""`(n, 3)` array of RGB colors"""
+
+		return self._get_array("particle_colors")
+
+	@property
+	def cache_id(self) -> "np.ndarray | memoryview":
+		return self._get_array("particle_cache_ids")
+
+	def register_settings(self, settings: dict) -> str:
+		"""Passes a particle setting to the extension if needed, returning its name"""
+
+		name = settings[Options.NAME]
+		if name not in self._registered_settings:
+			self.native.add_particle_setting(
+				name,
+				[
+					(self.images.get_id(settings, color), tuple(pygame.Color(color))[:3])
+					for color in settings[Options.COLOR]
+				],
+				tuple(settings[Options.SIZE]),
+				tuple(settings[Options.SIZE_DECAY]),
+				tuple(settings[Options.VELOCITY_DECAY]),
+				tuple(settings[Options.GRAVITY]),
+				settings[Options.EFFECTOR],
+				tuple(tuple(axis) for axis in settings[Options.BOUNCE]),
+			)
+			self._registered_settings.add(name)
+
+		return name
+
+	def add(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0)):
+		self._release_arrays()
+		self.native.add_particles(
+			self.register_settings(settings),
+			[(pos[0], pos[1])],
+			[(initial_velocity[0], initial_velocity[1])],
+		)
+
+	def add_many(self, pos, settings: dict, initial_velocity=None):
+		self._release_arrays()
+
+		# Arrays get converted to nested lists, which are much faster for the extension to read
+		if hasattr(pos, "tolist"):
+			pos = pos.tolist()
+		if hasattr(initial_velocity, "tolist"):
+			initial_velocity = initial_velocity.tolist()
+
+		self.native.add_particles(self.register_settings(settings), pos, initial_velocity)
+
+	def add_spawner(self, spawner: "ParticleSpawner") -> bool:
+		"""
+		Lets the extension run `spawner`, if it supports it.
+		:return: Whether the spawner was added
+		"""
+
+		if not spawner.supports_native:
+			return False
+
+		self._spawners[spawner] = spawner.add_native(self)
+		return True
+
+	def remove_spawner(self, spawner: "ParticleSpawner"):
+		if spawner in self._spawners:
+			self.native.remove_spawner(self._spawners.pop(spawner))
+
+	def sync_spawners(self, delta: float):
+		"""
+		Passes the position, state and spawning parameters of each spawner to the extension.
+		Also ticks the spawners' timers in step with the extension's, so they can still be read.
+		"""
+
+		for spawner, index in self._spawners.items():
+			self.native.set_spawner_state(
+				index,
+				(spawner.pos.x, spawner.pos.y),
+				spawner.active,
+				spawner.amount,
+				spawner.timer.get_cooldown(),
+				self.register_settings(spawner.particle_settings),
+			)
+
+			if spawner.active:
+				spawner.timer.tick(delta)
+
+	def clear(self):
+		self._release_arrays()
+		self.native.clear()
+
+	def chunks(self) -> list[tuple[int, int]]:
+		return self.native.particle_chunks()
+
+	def in_chunks(self, left: int, top: int, right: int, bottom: int) -> list[int]:
+		"""Indices of particles in the chunks from (left, top) to (right, bottom), inclusive"""
+
+		return self.native.particles_in_chunks(left, top, right, bottom)
+
+	def views(self, indices: list[int]) -> list[NativeParticleView]:
+		return [NativeParticleView(self, index) for index in indices]
+
+	def set_affectors(self, affectors: list["ParticleAffector"]):
+		"""Replaces the affectors applied during the next `update`"""
+
+		self.native.clear_affectors()
+
+		for affector in affectors:
+			if affector.supports_native:
+				affector.add_native(self.native)
+			else:
+				if type(affector) not in self._unsupported_affectors:
+					self._unsupported_affectors.add(type(affector))
+					logging.warning(f"`{type(affector).__name__}` is not supported by the `NATIVE` particle backend")
+
+	@staticmethod
+	def _get_rect(collider: pygame.Rect | pygame.FRect) -> tuple[float, float, float, float, bool]:
+		# `Rect` truncates points before testing them, see `collide_points`
+		return collider.left, collider.top, collider.right, collider.bottom, isinstance(collider, pygame.Rect)
+
+	def _sync_colliders(self, manager: "ParticleManager"):
+		# The manager replaces its collider dicts whenever the colliders change
+		if manager.chunked_colliders is not self._static_colliders:
+			self._static_colliders = manager.chunked_colliders
+
+			colliders = {
+				id(collider): collider for chunk in manager.chunked_colliders.values() for collider in chunk
+			}
+			self.native.set_colliders([self._get_rect(collider) for collider in colliders.values()])
+
+		if manager.chunked_dynamic_colliders is not self._dynamic_colliders:
+			self._dynamic_colliders = manager.chunked_dynamic_colliders
+
+			self.native.set_dynamic_colliders([self._get_rect(collider) for collider in manager.dynamic_colliders])
+
+	def update(self, delta: float, manager: "ParticleManager"):
+		self._sync_colliders(manager)
+		self._release_arrays()
+		self.native.update(delta)
+
+	def draw(
+			self,
+			surface: pygame.Surface,
+			origin: tuple[float, float],
+			view: tuple[float, float, float, float],
+	):
+		"""
+		:param origin: World position of the surface's top left corner
+		:param view: World space `(left, top, right, bottom)` of particles to draw
+		"""
+
+		images = self.images
+		if len(images.surfaces) != self._registered_images:
+			self.native.set_images(images.surfaces, images.start, images.length)
+			self._registered_images = len(images.surfaces)
+
+		# Culling and screen positions are worked out by the extension
+		surface.fblits(self.native.build_blits(origin, view))
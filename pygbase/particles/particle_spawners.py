@@ -1,18 +1,33 @@
-import random
+import math
 from abc import abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Sequence
 
 import pygame
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 from ..common import Common
 from ..timer import Timer
 from ..utils import get_angled_vector
 
 if TYPE_CHECKING:
 	from ..particles.particle_manager import ParticleManager
+	from ..particles.particle_native import NativeParticleStore
 
 
 class ParticleSpawner:
+	supports_native = False  # Whether `add_native` is implemented
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+
+		# The native copy would not spawn the same way, so subclasses changing spawning have to opt in again
+		if "spawn" in cls.__dict__ or "spawn_many" in cls.__dict__:
+			cls.supports_native = cls.__dict__.get("supports_native", False)
+
 	def __init__(self, pos: pygame.typing.Point, cooldown: float, amount: int, start_active: bool, particle_type: str, manager: "ParticleManager"):
 		self._linked_pos: bool
 		if isinstance(pos, pygame.Vector2):
@@ -22,7 +37,7 @@ class ParticleSpawner:
 			self._linked_pos = False
 			self.pos = pygame.Vector2(pos)
 
-		self.timer = Timer(cooldown, True, True)
+		self.timer = Timer(cooldown, True, True, catch_up=True)
 		self.amount = amount
 
 		self.type = particle_type
@@ -30,7 +45,21 @@ class ParticleSpawner:
 
 		self.particle_settings = Common.get_particle_setting(particle_type)
 
-		self.active = start_active
+		# Position at the last update, used to spread out catch up bursts along the path moved since
+		self._prev_pos = self.pos.copy()
+
+		self._active = start_active
+
+	@property
+	def active(self) -> bool:
+		return self._active
+
+	@active.setter
+	def active(self, active: bool):
+		if active and not self._active:
+			self._prev_pos.update(self.pos)
+
+		self._active = active
 
 	def update_pos(self, pos):
 		if self._linked_pos:
@@ -39,8 +68,48 @@ class ParticleSpawner:
 		self.pos.update(pos)
 
 	@abstractmethod
-	def spawn(self):
-		pass
+	def spawn(self, origin: pygame.typing.Point | None = None):
+		"""
+		:param origin: Position to spawn at instead of `pos`
+		"""
+
+	def spawn_many(self, amount: int, origins: Sequence[pygame.typing.Point] | None = None):
+		"""
+		Spawns a burst of particles.
+		Subclasses sample the whole burst at once, with the manager's numpy generator when it has one (`NUMPY` backend),
+		and add it to the manager in one call.
+
+		:param origins: Position to spawn each particle at instead of `pos`
+		"""
+
+		if origins is None:
+			for _ in range(amount):
+				self.spawn()
+		else:
+			for origin in origins:
+				self.spawn(origin)
+
+	def add_native(self, store: "NativeParticleStore") -> int:
+		"""
+		Adds a copy of this spawner to the `pygbase_particles` extension, which then spawns particles itself.
+		Only used when `supports_native` is set. The position, state, `amount`, cooldown and particle settings
+		get passed on every update, while the rest of the spawner's parameters are copied now.
+		:return: Index of the spawner in the extension
+		"""
+
+		raise NotImplementedError(f"`{type(self).__name__}` does not support the `NATIVE` particle backend")
+
+	def _get_origins(self, amount: int, origins: Sequence[pygame.typing.Point] | None) -> "np.ndarray":
+		if origins is None:
+			return np.broadcast_to((self.pos.x, self.pos.y), (amount, 2))
+
+		return np.asarray(origins, dtype=np.float64)
+
+	def _get_origin_list(self, amount: int, origins: Sequence[pygame.typing.Point] | None) -> list[tuple[float, float]]:
+		if origins is None:
+			return [(self.pos.x, self.pos.y)] * amount
+
+		return [(origin[0], origin[1]) for origin in origins]
 
 	def update(self, delta: float):
 		"""Will run when active"""
@@ -48,28 +117,81 @@ class ParticleSpawner:
 		self.timer.tick(delta)
 
 		if self.timer.done():
-			for _ in range(self.amount):
-				self.spawn()
+			bursts = self.timer.times_done()
+
+			if bursts == 1 or self._prev_pos == self.pos:
+				self.spawn_many(self.amount * bursts)
+			else:
+				# Each burst spawns where the spawner was when its cooldown finished, so fast moving trails stay continuous
+				self.spawn_many(
+					self.amount * bursts,
+					[
+						origin
+						for burst in range(bursts)
+						for origin in [self._prev_pos.lerp(self.pos, (burst + 1) / bursts)] * self.amount
+					],
+				)
+
+		self._prev_pos.update(self.pos)
 
 
 class PointSpawner(ParticleSpawner):
+	supports_native = True
+
 	def __init__(self, pos, cooldown: float, amount: int, start_active: bool, particle_type: str, manager: "ParticleManager", angle_range: tuple[float, float] = (0, 360), velocity_range: tuple[float, float] = (100.0, 200.0)):
 		super().__init__(pos, cooldown, amount, start_active, particle_type, manager)
 
 		self.angle_range = angle_range
 		self.velocity_range = velocity_range
 
-	def spawn(self):
-		initial_velocity = get_angled_vector(random.uniform(*self.angle_range), random.uniform(*self.velocity_range))
+	def spawn(self, origin: pygame.typing.Point | None = None):
+		py_rng = self.manager.py_rng
+		initial_velocity = get_angled_vector(py_rng.uniform(*self.angle_range), py_rng.uniform(*self.velocity_range))
 
 		self.manager.add_particle(
-			self.pos,
+			self.pos if origin is None else origin,
 			self.particle_settings,
 			initial_velocity
 		)
 
+	def spawn_many(self, amount: int, origins: Sequence[pygame.typing.Point] | None = None):
+		rng = self.manager.rng
+		if rng is None:
+			uniform = self.manager.py_rng.uniform
+			angles = [math.radians(uniform(*self.angle_range)) for _ in range(amount)]
+			speeds = [uniform(*self.velocity_range) for _ in range(amount)]
+
+			self.manager.add_particles(
+				self._get_origin_list(amount, origins),
+				self.particle_settings,
+				[(math.cos(angle) * speed, math.sin(angle) * speed) for angle, speed in zip(angles, speeds)]
+			)
+			return
+
+		angle = np.radians(rng.uniform(*self.angle_range, amount))
+		speed = rng.uniform(*self.velocity_range, amount)
+
+		self.manager.add_particles(
+			self._get_origins(amount, origins),
+			self.particle_settings,
+			np.column_stack((np.cos(angle) * speed, np.sin(angle) * speed))
+		)
+
+	def add_native(self, store: "NativeParticleStore") -> int:
+		return store.native.add_point_spawner(
+			(self.pos.x, self.pos.y),
+			self.timer.get_cooldown(),
+			self.amount,
+			self.active,
+			store.register_settings(self.particle_settings),
+			tuple(self.angle_range),
+			tuple(self.velocity_range)
+		)
+
 
 class CircleSpawner(ParticleSpawner):
+	supports_native = True
+
 	def __init__(
 			self,
 			pos: pygame.typing.Point,
@@ -92,33 +214,122 @@ class CircleSpawner(ParticleSpawner):
 		self.radial_velocity_range = radial_velocity_range
 		self.radial_offset_range = radial_offset_range
 
-	def spawn(self):
-		offset = get_angled_vector(random.uniform(0, 360), random.uniform(0, self.radius ** 2) ** 0.5)
-		offset.rotate_ip_rad(random.uniform(*self.radial_offset_range))
+	def spawn(self, origin: pygame.typing.Point | None = None):
+		py_rng = self.manager.py_rng
+		offset = get_angled_vector(py_rng.uniform(0, 360), py_rng.uniform(0, self.radius ** 2) ** 0.5)
+		offset.rotate_ip_rad(py_rng.uniform(*self.radial_offset_range))
 
 		self.manager.add_particle(
-			self.pos + offset,
+			(self.pos if origin is None else pygame.Vector2(origin)) + offset,
 			self.particle_settings,
 			initial_velocity=(
 					offset.normalize()
-					* random.uniform(*self.radial_velocity_range)
-					+ pygame.Vector2(random.uniform(*self.linear_velocity_range[0]), random.uniform(*self.linear_velocity_range[1]))
+					* py_rng.uniform(*self.radial_velocity_range)
+					+ pygame.Vector2(py_rng.uniform(*self.linear_velocity_range[0]), py_rng.uniform(*self.linear_velocity_range[1]))
 					+ self.spawn_velocity
 			)
 
 		)
 
+	def spawn_many(self, amount: int, origins: Sequence[pygame.typing.Point] | None = None):
+		rng = self.manager.rng
+		if rng is None:
+			uniform = self.manager.py_rng.uniform
+			radius_squared = self.radius ** 2
+			angles = [math.radians(uniform(0, 360)) for _ in range(amount)]
+			distances = [uniform(0, radius_squared) ** 0.5 for _ in range(amount)]
+			angles = [angle + uniform(*self.radial_offset_range) for angle in angles]  # Already in radians
+
+			positions = []
+			velocities = []
+			for (x, y), angle, distance in zip(self._get_origin_list(amount, origins), angles, distances):
+				direction_x = math.cos(angle)
+				direction_y = math.sin(angle)
+				speed = uniform(*self.radial_velocity_range)
+
+				positions.append((x + direction_x * distance, y + direction_y * distance))
+				velocities.append((
+					direction_x * speed + uniform(*self.linear_velocity_range[0]) + self.spawn_velocity.x,
+					direction_y * speed + uniform(*self.linear_velocity_range[1]) + self.spawn_velocity.y,
+				))
+
+			self.manager.add_particles(positions, self.particle_settings, velocities)
+			return
+
+		angle = np.radians(rng.uniform(0, 360, amount))
+		distance = np.sqrt(rng.uniform(0, self.radius ** 2, amount))
+		angle += rng.uniform(*self.radial_offset_range, amount)  # Already in radians
+
+		direction = np.column_stack((np.cos(angle), np.sin(angle)))
+
+		velocity = direction * rng.uniform(*self.radial_velocity_range, amount)[:, None]
+		velocity[:, 0] += rng.uniform(*self.linear_velocity_range[0], amount) + self.spawn_velocity.x
+		velocity[:, 1] += rng.uniform(*self.linear_velocity_range[1], amount) + self.spawn_velocity.y
+
+		self.manager.add_particles(
+			direction * distance[:, None] + self._get_origins(amount, origins),
+			self.particle_settings,
+			velocity
+		)
+
+	def add_native(self, store: "NativeParticleStore") -> int:
+		return store.native.add_circle_spawner(
+			(self.pos.x, self.pos.y),
+			self.timer.get_cooldown(),
+			self.amount,
+			self.radius,
+			self.active,
+			store.register_settings(self.particle_settings),
+			(self.spawn_velocity.x, self.spawn_velocity.y),
+			tuple(tuple(axis) for axis in self.linear_velocity_range),
+			tuple(self.radial_velocity_range),
+			tuple(self.radial_offset_range)
+		)
+
 
 class RectSpawner(ParticleSpawner):
+	supports_native = True
+
 	def __init__(self, pos: pygame.typing.Point, cooldown: float, amount: int, size: tuple, start_active: bool, particle_type: str, manager: "ParticleManager"):
 		super().__init__(pos, cooldown, amount, start_active, particle_type, manager)
 
 		self.size = size
 
-	def spawn(self):
-		spawn_offset = random.uniform(0, self.size[0]), random.uniform(0, self.size[1])
+	def spawn(self, origin: pygame.typing.Point | None = None):
+		py_rng = self.manager.py_rng
+		spawn_offset = py_rng.uniform(0, self.size[0]), py_rng.uniform(0, self.size[1])
 
 		self.manager.add_particle(
-			self.pos + spawn_offset,
+			(self.pos if origin is None else pygame.Vector2(origin)) + spawn_offset,
 			self.particle_settings
 		)
+
+	def spawn_many(self, amount: int, origins: Sequence[pygame.typing.Point] | None = None):
+		rng = self.manager.rng
+		if rng is None:
+			uniform = self.manager.py_rng.uniform
+			width, height = self.size
+
+			self.manager.add_particles(
+				[(x + uniform(0, width), y + uniform(0, height)) for x, y in self._get_origin_list(amount, origins)],
+				self.particle_settings
+			)
+			return
+
+		self.manager.add_particles(
+			np.column_stack((
+				rng.uniform(0, self.size[0], amount),
+				rng.uniform(0, self.size[1], amount),
+			)) + self._get_origins(amount, origins),
+			self.particle_settings
+		)
+
+	def add_native(self, store: "NativeParticleStore") -> int:
+		return store.native.add_rect_spawner(
+			(self.pos.x, self.pos.y),
+			self.timer.get_cooldown(),
+			self.amount,
+			tuple(self.size),
+			self.active,
+			store.register_settings(self.particle_settings)
+		)
@@ -0,0 +1,499 @@
+import random
+from typing import TYPE_CHECKING, Callable, Iterable
+
+import numpy as np
+import pygame
+
+from ..common import ParticleOptions as Options
+from .particle import Particle, ParticleImageTable
+from .particle_manager import ParticleOverflow
+
+if TYPE_CHECKING:
+	from .particle_manager import ParticleManager
+
+
+def collide_points(
+		x: np.ndarray,
+		y: np.ndarray,
+		rects: np.ndarray,
+		truncate: bool = False,
+		block_size: int = 1 << 20,
+) -> np.ndarray:
+	"""
+	Tests every point against every rect, in the same way as `FRect.collidepoint`.
+
+	:param rects: Array of `(left, top, right, bottom)`
+	:param truncate: Truncate points towards zero first, like `Rect.collidepoint` does with float points
+	:return: Mask of points that are inside any rect
+	"""
+
+	hit = np.zeros(len(x), dtype=np.bool_)
+	if len(rects) == 0:
+		return hit
+
+	if truncate:
+		x = np.trunc(x)
+		y = np.trunc(y)
+
+	# Limit the size of the intermediate (points, rects) arrays
+	step = max(1, block_size // max(1, len(rects)))
+	left, top, right, bottom = (rects[:, i] for i in range(4))
+	for start in range(0, len(x), step):
+		block_x = x[start: start + step, None]
+		block_y = y[start: start + step, None]
+
+		hit[start: start + step] = (
+				(left <= block_x) & (block_x < right) & (top <= block_y) & (block_y < bottom)
+		).any(axis=1)
+
+	return hit
+
+
+def get_blits(
+		pos: np.ndarray,
+		size: np.ndarray,
+		cache_id: np.ndarray,
+		images: ParticleImageTable,
+		origin: tuple[float, float],
+		view: tuple[float, float, float, float],
+) -> Iterable[tuple[pygame.Surface, list[int]]]:
+	"""
+	Builds the `Surface.fblits` sequence for the particles inside `view`.
+
+	:param origin: World position of the surface's top left corner
+	:param view: World space `(left, top, right, bottom)` of particles to draw
+	"""
+
+	visible = np.flatnonzero(
+		(pos[:, 0] >= view[0]) & (pos[:, 0] < view[2]) & (pos[:, 1] >= view[1]) & (pos[:, 1] < view[3])
+	)
+	if len(visible) == 0:
+		return ()
+
+	cache_id = cache_id[visible]
+
+	size_index = np.minimum(size[visible].astype(np.int64), np.asarray(images.length)[cache_id] - 1)
+	surface_index = np.asarray(images.start)[cache_id] + size_index
+
+	# Same rounding as `Particle.get_blit_pair`
+	screen_pos = pos[visible] - np.round(size[visible] / 2)[:, None]
+	screen_pos -= origin
+	screen_pos = np.rint(screen_pos).astype(np.int64)
+
+	surfaces = images.surfaces
+	return zip([surfaces[index] for index in surface_index.tolist()], screen_pos.tolist())
+
+
+class ParticleView:
+	"""
+	Proxy to a single particle inside a `ParticleStore`.
+	Only valid until the next `ParticleStore.update`, as dead particles get compacted away.
+
+	`pos` and `velocity` return copies, so changes only reach the store when assigned back:
+	`view.velocity += push` works, but `view.velocity.x += 1` or `view.velocity.update(...)` are lost.
+	"""
+
+	__slots__ = ["_store", "_index"]
+
+	def __init__(self, store: "ParticleStore", index: int):
+		self._store = store
+		self._index = index
+
+	@property
+	def pos(self) -> pygame.Vector2:
+		return pygame.Vector2(*self._store.pos[self._index])
+
+	@pos.setter
+	def pos(self, value: pygame.typing.Point):
+		self._store.pos[self._index] = value
+
+	@property
+	def velocity(self) -> pygame.Vector2:
+		return pygame.Vector2(*self._store.vel[self._index])
+
+	@velocity.setter
+	def velocity(self, value: pygame.typing.Point):
+		self._store.vel[self._index] = value
+
+	@property
+	def size(self) -> float:
+		return float(self._store.size[self._index])
+
+	@size.setter
+	def size(self, value: float):
+		self._store.size[self._index] = value
+
+	@property
+	def effector(self) -> bool:
+		return bool(self._store.effector[self._index])
+
+
+class ParticleStore:
+	"""
+	Structure of arrays storage for particles, used by the `NUMPY` backend of `ParticleManager`.
+	Every attribute of a particle lives in a contiguous array, indexed by particle.
+	"""
+
+	# Names of the per particle arrays
+	ARRAYS = (
+		"pos",
+		"vel",
+		"gravity",
+		"size",
+		"size_decay",
+		"vel_decay",
+		"effector",
+		"bounce",
+		"cache_id",
+		"chunk",
+		"spawn_id",
+	)
+
+	def __init__(
+			self,
+			chunk_size: int,
+			rng: np.random.Generator,
+			capacity: int = 1024,
+			overflow: ParticleOverflow = ParticleOverflow.GROW,
+			py_rng: random.Random | None = None,
+	):
+		"""
+		:param rng: Used for bursts and bounces
+		:param py_rng: Used for single particles, the global `random` state if None
+		"""
+
+		self.chunk_size = chunk_size
+		self.rng = rng
+		self.py_rng = random if py_rng is None else py_rng
+		self.overflow = overflow
+
+		self.count = 0
+		self.capacity = 0
+
+		self.pos = np.empty((0, 2), dtype=np.float64)
+		self.vel = np.empty((0, 2), dtype=np.float64)
+		self.gravity = np.empty((0, 2), dtype=np.float64)
+		self.size = np.empty(0, dtype=np.float64)
+		self.size_decay = np.empty(0, dtype=np.float64)
+		self.vel_decay = np.empty(0, dtype=np.float64)
+		self.effector = np.empty(0, dtype=np.bool_)
+		self.bounce = np.empty((0, 2, 2), dtype=np.float64)  # [axis, (min, max)]
+		self.cache_id = np.empty(0, dtype=np.int32)
+		self.chunk = np.empty((0, 2), dtype=np.int64)
+		self.spawn_id = np.empty(0, dtype=np.int64)  # Used to find the oldest particle
+
+		self._next_spawn_id = 0
+
+		# Slots from oldest to newest particle, used to replace particles one at a time when full.
+		# Replaced particles become the newest, so the order stays valid until slots move or get added
+		self._age_order: np.ndarray | None = None
+		self._age_cursor = 0
+
+		self._grow(capacity)
+
+		# Result of `group_by_chunk`, reset whenever particles are added or move
+		self._chunk_groups: list[tuple[tuple[int, int], np.ndarray]] | None = None
+
+		# `Rect` and `FRect` colliders around each chunk, as arrays of (left, top, right, bottom)
+		self._collider_rects: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+		self._collider_version = -1
+
+		self.images = ParticleImageTable()
+
+	def __len__(self):
+		return self.count
+
+	def _grow(self, capacity: int):
+		for name in self.ARRAYS:
+			array = getattr(self, name)
+
+			new_array = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+			new_array[: self.count] = array[: self.count]
+			setattr(self, name, new_array)
+
+		self.capacity = capacity
+		self._age_order = None
+
+	def _get_oldest_index(self) -> int:
+		if self._age_order is None:
+			self._age_order = np.argsort(self.spawn_id[: self.count], kind="stable")
+			self._age_cursor = 0
+
+		index = int(self._age_order[self._age_cursor])
+		self._age_cursor = (self._age_cursor + 1) % len(self._age_order)
+		return index
+
+	def _get_free_index(self) -> int | None:
+		if self.count < self.capacity:
+			self.count += 1
+			self._age_order = None
+			return self.count - 1
+
+		if self.overflow == ParticleOverflow.DROP_NEW:
+			return None
+		elif self.overflow == ParticleOverflow.DROP_OLDEST:
+			return self._get_oldest_index()
+		else:
+			self._grow(self.capacity * 2)
+			self.count += 1
+			return self.count - 1
+
+	def add(self, pos: pygame.typing.Point, settings: dict, initial_velocity=(0, 0)):
+		index = self._get_free_index()
+		if index is None:
+			return
+
+		self._chunk_groups = None
+
+		# Same draw order as `Particle.__init__`
+		py_rng = self.py_rng
+		self.size[index] = py_rng.uniform(*settings[Options.SIZE])
+		self.size_decay[index] = py_rng.uniform(*settings[Options.SIZE_DECAY])
+		color = py_rng.choice(settings[Options.COLOR])
+		self.vel_decay[index] = py_rng.uniform(*settings[Options.VELOCITY_DECAY])
+
+		self.pos[index] = pos[0], pos[1]
+		self.vel[index] = initial_velocity[0], initial_velocity[1]
+		self.gravity[index] = settings[Options.GRAVITY]
+		self.effector[index] = settings[Options.EFFECTOR]
+		self.bounce[index] = settings[Options.BOUNCE]
+		self.cache_id[index] = self.images.get_id(settings, color)
+		self.chunk[index] = pos[0] // self.chunk_size, pos[1] // self.chunk_size
+
+		self.spawn_id[index] = self._next_spawn_id
+		self._next_spawn_id += 1
+
+	def _get_free_indices(self, amount: int) -> tuple[np.ndarray, slice]:
+		"""
+		Reserves slots for `amount` new particles, following the overflow policy.
+		:return: The slots, and which of the new particles go into them
+		"""
+
+		free = self.capacity - self.count
+		if amount > free and self.overflow == ParticleOverflow.GROW:
+			capacity = self.capacity
+			while capacity - self.count < amount:
+				capacity *= 2
+
+			self._grow(capacity)
+			free = self.capacity - self.count
+
+		if amount <= free:
+			indices = np.arange(self.count, self.count + amount)
+			self.count += amount
+			return indices, slice(0, amount)
+
+		if self.overflow == ParticleOverflow.DROP_NEW:
+			indices = np.arange(self.count, self.capacity)
+			self.count = self.capacity
+			return indices, slice(0, free)
+
+		# Drop oldest, only the newest `capacity` particles can fit
+		amount = min(amount, self.capacity)
+		replaced = amount - free
+
+		indices = np.arange(self.count, self.capacity)
+		if replaced > 0:
+			oldest = np.argpartition(self.spawn_id[: self.count], replaced - 1)[:replaced]
+			indices = np.concatenate((indices, oldest))
+
+		self.count = self.capacity
+		return indices, slice(-amount, None)
+
+	def add_many(self, pos, settings: dict, initial_velocity=None):
+		pos = np.asarray(pos, dtype=np.float64)
+
+		indices, selection = self._get_free_indices(len(pos))
+		amount = len(indices)
+		if amount == 0:
+			return
+
+		self._chunk_groups = None
+		self._age_order = None
+
+		rng = self.rng
+		colors = settings[Options.COLOR]
+		color_cache_ids = np.array([self.images.get_id(settings, color) for color in colors], dtype=np.int32)
+
+		pos = pos[selection]
+		self.pos[indices] = pos
+		self.vel[indices] = 0 if initial_velocity is None else np.asarray(initial_velocity, dtype=np.float64)[selection]
+		self.gravity[indices] = settings[Options.GRAVITY]
+		self.size[indices] = rng.uniform(*settings[Options.SIZE], amount)
+		self.size_decay[indices] = rng.uniform(*settings[Options.SIZE_DECAY], amount)
+		self.vel_decay[indices] = rng.uniform(*settings[Options.VELOCITY_DECAY], amount)
+		self.effector[indices] = settings[Options.EFFECTOR]
+		self.bounce[indices] = settings[Options.BOUNCE]
+		self.cache_id[indices] = color_cache_ids[rng.integers(len(colors), size=amount)]
+		self.chunk[indices] = np.floor_divide(pos, self.chunk_size)
+
+		self.spawn_id[indices] = np.arange(self._next_spawn_id, self._next_spawn_id + amount)
+		self._next_spawn_id += amount
+
+	def clear(self):
+		self.count = 0
+		self._chunk_groups = None
+		self._age_order = None
+
+	def chunks(self) -> list[tuple[int, int]]:
+		return [(col, row) for col, row in np.unique(self.chunk[: self.count], axis=0).tolist()]
+
+	def group_by_chunk(self) -> list[tuple[tuple[int, int], np.ndarray]]:
+		"""Returns the indices of particles in each occupied chunk"""
+
+		if self._chunk_groups is not None:
+			return self._chunk_groups
+
+		if self.count == 0:
+			return []
+
+		chunk_pos, inverse = np.unique(self.chunk[: self.count], axis=0, return_inverse=True)
+		inverse = inverse.reshape(-1)
+
+		order = np.argsort(inverse, kind="stable")
+		splits = np.cumsum(np.bincount(inverse))[:-1]
+
+		self._chunk_groups = [
+			((col, row), indices)
+			for (col, row), indices in zip(chunk_pos.tolist(), np.split(order, splits))
+		]
+		return self._chunk_groups
+
+	def in_chunks(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+		"""Indices of particles in the chunks from (left, top) to (right, bottom), inclusive"""
+
+		chunk = self.chunk[: self.count]
+		return np.flatnonzero(
+			(chunk[:, 0] >= left) & (chunk[:, 0] <= right) & (chunk[:, 1] >= top) & (chunk[:, 1] <= bottom)
+		)
+
+	def views(self, indices: np.ndarray) -> list[ParticleView]:
+		return [ParticleView(self, index) for index in indices.tolist()]
+
+	@staticmethod
+	def _get_rect_array(colliders: list[pygame.Rect | pygame.FRect]) -> np.ndarray:
+		return np.array(
+			[(collider.left, collider.top, collider.right, collider.bottom) for collider in colliders],
+			dtype=np.float64,
+		).reshape(-1, 4)
+
+	@staticmethod
+	def _collide_rects(x: np.ndarray, y: np.ndarray, rects: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+		int_rects, float_rects = rects
+		return collide_points(x, y, int_rects, truncate=True) | collide_points(x, y, float_rects)
+
+	def _collide(self, delta: float, new_pos: np.ndarray, manager: "ParticleManager"):
+		pos = self.pos
+		vel = self.vel
+
+		if manager.collider_version != self._collider_version:
+			self._collider_version = manager.collider_version
+			self._collider_rects.clear()
+
+		for chunk_pos, indices in self.group_by_chunk():
+			rects = self._collider_rects.get(chunk_pos)
+			if rects is None:
+				colliders = manager.get_chunk_colliders(chunk_pos)
+				rects = self._collider_rects[chunk_pos] = (
+					self._get_rect_array([collider for collider in colliders if isinstance(collider, pygame.Rect)]),
+					self._get_rect_array([collider for collider in colliders if not isinstance(collider, pygame.Rect)]),
+				)
+
+			if len(rects[0]) == 0 and len(rects[1]) == 0:
+				continue
+
+			chunk_vel = vel[indices]
+			chunk_new_pos = new_pos[indices]
+			bounce = self.bounce[indices]
+
+			# X bounces are checked against the old y position, y bounces against the resolved x position
+			hit = self._collide_rects(chunk_new_pos[:, 0], pos[indices, 1], rects)
+			if hit.any():
+				chunk_new_pos[hit, 0] -= chunk_vel[hit, 0] * delta
+				chunk_vel[hit, 0] *= -self.rng.uniform(bounce[hit, 0, 0], bounce[hit, 0, 1])
+
+			hit = self._collide_rects(chunk_new_pos[:, 0], chunk_new_pos[:, 1], rects)
+			if hit.any():
+				chunk_new_pos[hit, 1] -= chunk_vel[hit, 1] * delta
+				chunk_vel[hit, 1] *= -self.rng.uniform(bounce[hit, 1, 0], bounce[hit, 1, 1])
+
+			new_pos[indices] = chunk_new_pos
+			vel[indices] = chunk_vel
+
+	def affect[AffectorType](
+			self,
+			delta: float,
+			chunk_affectors: dict[tuple[int, int], list[AffectorType]],
+			affect_arrays: Callable[[float, list[AffectorType], np.ndarray, np.ndarray, np.ndarray], None],
+	):
+		"""Runs `affect_arrays` on the effector particles of every chunk in `chunk_affectors`"""
+
+		for chunk_pos, indices in self.group_by_chunk():
+			affectors = chunk_affectors.get(chunk_pos)
+			if affectors is None:
+				continue
+
+			indices = indices[self.effector[indices]]
+			if len(indices) == 0:
+				continue
+
+			velocity = self.vel[indices]
+			size = self.size[indices]
+
+			affect_arrays(delta, affectors, self.pos[indices], velocity, size)
+
+			self.vel[indices] = velocity
+			self.size[indices] = size
+
+	def update(self, delta: float, manager: "ParticleManager"):
+		count = self.count
+		if count == 0:
+			return
+
+		vel = self.vel[:count]
+
+		vel += self.gravity[:count] * delta
+		vel -= vel * (self.vel_decay[:count] * delta)[:, None]
+
+		new_pos = self.pos[:count] + vel * delta
+		self._collide(delta, new_pos, manager)
+		self.pos[:count] = new_pos
+
+		self.size[:count] -= self.size_decay[:count] * delta
+
+		np.floor_divide(self.pos[:count], self.chunk_size, out=new_pos)
+		self.chunk[:count] = new_pos
+		self._chunk_groups = None
+
+		self._remove_dead()
+
+	def _remove_dead(self):
+		alive = self.size[: self.count] > 0.2
+		new_count = int(np.count_nonzero(alive))
+		if new_count == self.count:
+			return
+
+		# Swap remove, filling the dead slots below `new_count` with the living particles above it
+		holes = np.flatnonzero(~alive[:new_count])
+		movers = np.flatnonzero(alive[new_count:]) + new_count
+
+		for name in self.ARRAYS:
+			array = getattr(self, name)
+			array[holes] = array[movers]
+
+		self.count = new_count
+		self._age_order = None
+
+	def draw(
+			self,
+			surface: pygame.Surface,
+			origin: tuple[float, float],
+			view: tuple[float, float, float, float],
+	):
+		"""
+		:param origin: World position of the surface's top left corner
+		:param view: World space `(left, top, right, bottom)` of particles to draw
+		"""
+
+		count = self.count
+		surface.fblits(get_blits(self.pos[:count], self.size[:count], self.cache_id[:count], self.images, origin, view))
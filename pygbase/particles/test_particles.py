@@ -0,0 +1,712 @@
+import logging
+import random
+import sys
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+import pygame
+import pytest
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+from ..common import Common
+from .particle import Particle
+from .particle_manager import ParticleBackends, ParticleManager, ParticleOverflow
+
+if TYPE_CHECKING:
+	from .particle_affectors import AffectorTypes, ParticleAffector
+
+requires_numpy = pytest.mark.skipif(find_spec("numpy") is None, reason="numpy is not installed")
+
+NUMPY = pytest.param(ParticleBackends.NUMPY, marks=requires_numpy)
+NATIVE = pytest.param(
+	ParticleBackends.NATIVE,
+	marks=pytest.mark.skipif(find_spec("pygbase_particles") is None, reason="pygbase_particles is not installed"),
+)
+
+
+@pytest.fixture(autouse=True)
+def particle_cache():
+	Common.add_particle_setting(
+		"test_gravity", ["red", "blue"], (4.0, 8.0), (1.0, 2.0), (0.5, 1.0), (0, 300), True, ((0.2, 0.4), (0.2, 0.4))
+	)
+	Particle.cache_particle_images()
+
+
+def fill_manager(backend: ParticleBackends, seed: int = 0, **kwargs) -> ParticleManager:
+	random.seed(seed)
+
+	manager = ParticleManager(chunk_size=50, backend=backend, seed=seed, **kwargs)
+	settings = Common.get_particle_setting("test_gravity")
+	for i in range(200):
+		manager.add_particle((i * 3.0, -i * 2.0), settings, (random.uniform(-100, 100), random.uniform(-100, 100)))
+
+	return manager
+
+
+def particle_state(manager: ParticleManager) -> list[tuple[float, float, float]]:
+	particles = manager.get_particles((-10000, -10000), (20000, 20000))
+	return sorted((round(p.pos.x, 6), round(p.pos.y, 6), round(p.size, 6)) for p in particles)
+
+
+@requires_numpy
+def test_numpy_backend_matches_python():
+	python_manager = fill_manager(ParticleBackends.PYTHON)
+	numpy_manager = fill_manager(ParticleBackends.NUMPY)
+
+	for _ in range(60):
+		python_manager.update(1 / 60)
+		numpy_manager.update(1 / 60)
+
+		assert particle_state(python_manager) == particle_state(numpy_manager)
+
+	assert python_manager.particle_count() == numpy_manager.particle_count() > 0
+	assert sorted(python_manager.get_particle_chunks()) == sorted(numpy_manager.get_particle_chunks())
+
+
+@requires_numpy
+def test_numpy_backend_removes_dead_particles():
+	manager = fill_manager(ParticleBackends.NUMPY)
+
+	for _ in range(600):
+		manager.update(1 / 60)
+
+	assert manager.particle_count() == 0
+
+
+@requires_numpy
+def test_numpy_backend_views_write_back():
+	manager = fill_manager(ParticleBackends.NUMPY)
+
+	particle = manager.get_particles((0, 0), (1, 1))[0]
+	x = particle.pos.x
+
+	# Only assignments write back, changing the returned copy does not
+	particle.pos.x += 5
+	particle.velocity.update(1000, 1000)
+	assert particle.pos.x == x
+	assert particle.velocity != (1000, 1000)
+
+	particle.pos += (5, 0)
+	assert particle.pos.x == x + 5
+
+	particle.velocity += pygame.Vector2(10, 0)
+	particle.size = 0
+
+	manager.update(0)
+
+	assert manager.particle_count() == 199
+
+
+@requires_numpy
+def test_draw_matches_between_backends():
+	from ..camera import Camera
+
+	surfaces = []
+	for backend in (ParticleBackends.PYTHON, ParticleBackends.NUMPY):
+		manager = fill_manager(backend)
+		surface = pygame.Surface((200, 200))
+		manager.draw(surface, Camera((-100.4, -100.6)))
+		surfaces.append(surface)
+
+	assert surfaces[0].get_at((100, 100)) != pygame.Color("black")
+	assert pygame.image.tobytes(surfaces[0], "RGB") == pygame.image.tobytes(surfaces[1], "RGB")
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_draw_culls_off_screen_particles(backend: ParticleBackends):
+	from ..camera import Camera
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	settings = Common.get_particle_setting("test_gravity")
+	manager.add_particle((10, 10), settings)
+	manager.add_particle((5000, 5000), settings)
+
+	blits = []
+
+	class RecordingSurface(pygame.Surface):
+		def fblits(self, blit_sequence, special_flags=0, /):
+			blits.extend(blit_sequence)
+
+	manager.draw(RecordingSurface((100, 100)), Camera())
+
+	assert len(blits) == 1
+	assert blits[0][1][0] < 100
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_draw_rounds_like_get_blit_pair(backend: ParticleBackends):
+	from ..camera import Camera
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	settings = Common.get_particle_setting("test_gravity")
+	for i in range(40):
+		manager.add_particle((10.3 + i * 2.25, 20.5 + i * 1.75), settings)
+
+	camera = Camera((-3.5, -2.25))
+
+	blits = []
+
+	class RecordingSurface(pygame.Surface):
+		def fblits(self, blit_sequence, special_flags=0, /):
+			blits.extend(blit_sequence)
+
+	manager.draw(RecordingSurface((200, 200)), camera)
+
+	# Odd and fractional sizes land where `Particle.get_blit_pair` would put them
+	expected = sorted(
+		camera.world_to_screen(particle.pos - pygame.Vector2(round(particle.size / 2)))
+		for particle in manager.get_particles((0, 0), (200, 200))
+	)
+	assert sorted(tuple(pos) for _, pos in blits) == expected
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY])
+def test_draw_without_particle_settings(backend: ParticleBackends, monkeypatch):
+	from ..camera import Camera
+
+	monkeypatch.setattr(Common, "_particle_settings", {})
+	monkeypatch.setattr(Common, "_largest_particle_size", None)
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	manager.draw(pygame.Surface((100, 100)), Camera())
+
+	assert Common.get_largest_particle_size() == 0
+
+
+@requires_numpy
+def test_numpy_collisions_match_python():
+	Common.add_particle_setting(
+		"test_bounce", ["red"], (4.0, 8.0), (0.5, 1.0), (0.5, 1.0), (0, 400), True, ((0.5, 0.5), (0.5, 0.5))
+	)
+	Particle.cache_particle_images()
+	settings = Common.get_particle_setting("test_bounce")
+
+	# `Rect.collidepoint` truncates points towards zero, which matters at negative and fractional coordinates
+	colliders = (pygame.Rect(-200, 100, 400, 20), pygame.Rect(-50, 0, 20, 100), pygame.FRect(100.5, 40.5, 60, 30))
+
+	states = []
+	for backend in (ParticleBackends.PYTHON, ParticleBackends.NUMPY):
+		random.seed(1)
+
+		manager = ParticleManager(chunk_size=50, colliders=colliders, backend=backend, seed=1)
+		for i in range(100):
+			manager.add_particle((-190 + i * 3.5, 5 + i * 0.5), settings, (random.uniform(-200, 200), random.uniform(-50, 50)))
+
+		for _ in range(120):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	assert states[0] == states[1]
+	assert all(y < 100 for x, y, _ in states[0] if -200 <= x < 200)
+
+
+@requires_numpy
+def test_collide_points_truncates_like_rect():
+	from .particle_store import collide_points
+
+	rect = pygame.Rect(-10, -10, 5, 5)
+	points = [(-10.5, -7), (-5.5, -7), (-4.9, -7), (-7, -10.9), (-7, -4.5), (-5, -7), (-11, -7)]
+	x, y = np.array(points).T
+
+	rects = np.array([(rect.left, rect.top, rect.right, rect.bottom)], dtype=np.float64)
+	assert collide_points(x, y, rects, truncate=True).tolist() == [bool(rect.collidepoint(point)) for point in points]
+
+	frect = pygame.FRect(rect)
+	assert collide_points(x, y, rects).tolist() == [bool(frect.collidepoint(point)) for point in points]
+
+
+@pytest.mark.parametrize("backend", [NUMPY, NATIVE])
+def test_colliders_and_affectors(backend: ParticleBackends):
+	from .particle_affectors import AffectorTypes, ParticleDragZone
+
+	floor = pygame.Rect(-1000, 100, 2000, 50)
+	manager = ParticleManager(chunk_size=50, colliders=(floor,), backend=backend)
+	manager.add_affector(AffectorTypes.DRAG_ZONE, ParticleDragZone((-1000, -1000), (1000, 2000), 5, (-100, 0)))
+
+	settings = Common.get_particle_setting("test_gravity")
+	manager.add_particles([(i * 10 - 500, 0) for i in range(100)], settings)
+
+	for _ in range(60):
+		manager.update(1 / 60)
+
+	state = particle_state(manager)
+	assert len(state) > 0
+	assert all(y < 100 for _, y, _ in state)
+	assert sum(x < -500 for x, _, _ in state) > sum(x > 500 for x, _, _ in state)
+
+
+@pytest.mark.parametrize("backend", [NATIVE])
+def test_native_particle_arrays_read_in_place(backend: ParticleBackends):
+	manager = fill_manager(backend)
+	native = manager.store.native
+
+	pos = memoryview(native.particle_positions())
+	assert pos.readonly
+	assert pos.shape == (200, 2)
+	assert sorted((round(pos[i, 0], 6), round(pos[i, 1], 6)) for i in range(200)) == sorted(
+		(round(x, 6), round(y, 6)) for x, y, _ in particle_state(manager)
+	)
+	assert memoryview(native.particle_colors()).shape == (200, 3)
+
+	# Reads the particles themselves, so changes show up without taking a new buffer
+	native.set_particle_pos(0, (1.5, 2.5))
+	assert (pos[0, 0], pos[0, 1]) == (1.5, 2.5)
+
+	# Growing would move the particles out from under the buffer
+	settings = Common.get_particle_setting("test_gravity")
+	with pytest.raises(BufferError):
+		manager.add_particles([(0, 0)] * 5000, settings)
+
+	pos.release()
+	manager.add_particles([(0, 0)] * 5000, settings)
+	assert manager.particle_count() == 5200
+	assert len(manager.store.pos) == 5200
+
+
+def test_native_backend_falls_back_to_python(monkeypatch):
+	monkeypatch.setitem(sys.modules, "pygbase_particles", None)
+	monkeypatch.delitem(sys.modules, "pygbase.particles.particle_native", raising=False)
+	monkeypatch.delitem(sys.modules, f"{__package__}.particle_native", raising=False)
+
+	manager = ParticleManager(backend=ParticleBackends.NATIVE)
+
+	assert manager.backend == ParticleBackends.PYTHON
+	assert manager.store is None
+
+
+def test_collider_cache_invalidation():
+	wall = pygame.Rect(0, 0, 120, 10)
+	manager = ParticleManager(chunk_size=50, colliders=(wall,))
+
+	assert manager.get_chunk_colliders((1, 1)) == [wall]
+	assert manager.get_chunk_colliders((1, 1)) is manager.get_chunk_colliders((1, 1))
+	assert manager.get_chunk_colliders((5, 5)) == []
+
+	enemy = pygame.Rect(260, 260, 10, 10)
+	manager.pass_dynamic_colliders([enemy])
+	version = manager.collider_version
+
+	assert manager.get_chunk_colliders((5, 5)) == [enemy]
+	assert manager.get_chunk_colliders((1, 1)) == [wall]
+
+	manager.pass_dynamic_colliders([enemy])
+	assert manager.collider_version == version
+
+	enemy.topleft = (10, 10)
+	manager.pass_dynamic_colliders([enemy])
+	assert manager.collider_version != version
+	assert manager.get_chunk_colliders((5, 5)) == []
+	assert manager.get_chunk_colliders((1, 1)) == [wall, enemy]
+
+
+def make_affectors(kind: str) -> list[tuple["AffectorTypes", "ParticleAffector"]]:
+	from .particle_affectors import (
+		AffectorTypes,
+		ParticleAttractor,
+		ParticleDragZone,
+		ParticleFlowField,
+		ParticleRepulsor,
+		ParticleVortex,
+	)
+
+	if kind == "attractor":
+		return [(AffectorTypes.ATTRACTOR, ParticleAttractor((100, -150), 150, 40000))]
+	if kind == "attractors":
+		return [(AffectorTypes.ATTRACTOR, ParticleAttractor((100 + i * 80, -150), 150, 40000)) for i in range(3)]
+	if kind == "repulsor":
+		return [(AffectorTypes.REPULSOR, ParticleRepulsor((300, -200), 200, 40000))]
+	if kind == "vortex":
+		return [(AffectorTypes.VORTEX, ParticleVortex((300, -200), 250, 60000))]
+	if kind == "drag_zone":
+		return [(AffectorTypes.DRAG_ZONE, ParticleDragZone((0, -300), (300, 200), 3, (200, -50)))]
+	if kind == "flow_field":
+		flow = [[(col * 20 - 100, row * 10) for col in range(10)] for row in range(8)]
+		return [(AffectorTypes.FLOW_FIELD, ParticleFlowField((0, -400), 60, flow, 2))]
+
+	raise ValueError(kind)
+
+
+@requires_numpy
+@pytest.mark.parametrize("kind", ["attractor", "attractors", "repulsor", "vortex", "drag_zone", "flow_field"])
+def test_affectors_match_between_backends(kind: str):
+	states = []
+	for backend in (ParticleBackends.PYTHON, ParticleBackends.NUMPY):
+		manager = fill_manager(backend)
+		for affector_type, affector in make_affectors(kind):
+			manager.add_affector(affector_type, affector)
+
+		for _ in range(30):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	unaffected = fill_manager(ParticleBackends.PYTHON)
+	for _ in range(30):
+		unaffected.update(1 / 60)
+	assert states[0] != particle_state(unaffected)
+
+	assert len(states[0]) == len(states[1])
+	for python_particle, numpy_particle in zip(*states):
+		assert python_particle == pytest.approx(numpy_particle, abs=1e-4)
+
+
+@requires_numpy
+def test_affector_without_arrays_runs_on_numpy():
+	from .particle_affectors import AffectorTypes, ParticleAffector
+
+	class Shrinker(ParticleAffector):
+		"""Only implements the `PYTHON` backend version"""
+
+		def get_bounds(self):
+			return self.pos.x - 100, self.pos.y - 100, self.pos.x + 100, self.pos.y + 100
+
+		def affect_particles(self, delta, particles):
+			for particle in particles:
+				if particle.effector and particle.pos.distance_to(self.pos) < 100:
+					particle.velocity.x += 500 * delta
+					particle.size *= 0.9
+
+	states = []
+	for backend in (ParticleBackends.PYTHON, ParticleBackends.NUMPY):
+		manager = fill_manager(backend)
+		manager.add_affector(AffectorTypes.ATTRACTOR, Shrinker((100, -100)))
+
+		for _ in range(30):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	unaffected = fill_manager(ParticleBackends.PYTHON)
+	for _ in range(30):
+		unaffected.update(1 / 60)
+
+	assert states[0] != particle_state(unaffected)
+	assert states[0] == pytest.approx(states[1], abs=1e-6)
+
+
+@pytest.mark.parametrize("backend", [NATIVE])
+def test_native_backend_skips_unsupported_affectors(backend: ParticleBackends, caplog):
+	from .particle_affectors import AffectorTypes, ParticleRepulsor
+
+	class Subclassed(ParticleRepulsor):
+		"""Changes the behaviour, so the native repulsor would be wrong"""
+
+		def affect_particles(self, delta, particles):
+			pass
+
+	manager = fill_manager(backend)
+	manager.add_affector(AffectorTypes.REPULSOR, Subclassed((0, 0), 100, 100))
+
+	with caplog.at_level(logging.WARNING):
+		manager.update(1 / 60)
+
+	assert "`Subclassed` is not supported" in caplog.text
+
+
+def test_affector_subclasses_opt_in_to_native():
+	from .particle_affectors import ParticleAffector, ParticleRepulsor
+
+	class Custom(ParticleRepulsor):
+		def affect_particles(self, delta, particles):
+			pass
+
+	class Declared(Custom):
+		supports_native = True
+
+	class Wrapped(ParticleRepulsor):
+		def get_bounds(self):
+			return super().get_bounds()
+
+	assert not ParticleAffector.supports_native
+	assert ParticleRepulsor.supports_native
+	assert not Custom.supports_native
+	assert Declared.supports_native
+	assert Wrapped.supports_native
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+@pytest.mark.parametrize(
+	"overflow, kept",
+	[
+		(ParticleOverflow.GROW, range(15)),
+		(ParticleOverflow.DROP_NEW, range(10)),
+		(ParticleOverflow.DROP_OLDEST, range(5, 15)),
+	],
+)
+def test_overflow(backend: ParticleBackends, overflow: ParticleOverflow, kept: range):
+	manager = ParticleManager(chunk_size=50, backend=backend, capacity=10, overflow=overflow)
+	settings = Common.get_particle_setting("test_gravity")
+	for i in range(15):
+		manager.add_particle((i * 20, 0), settings)
+
+	assert manager.particle_count() == len(kept)
+	assert sorted(x for x, _, _ in particle_state(manager)) == [i * 20 for i in kept]
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_drop_oldest_after_moving_particles(backend: ParticleBackends):
+	manager = ParticleManager(chunk_size=50, backend=backend, capacity=10, overflow=ParticleOverflow.DROP_OLDEST)
+	settings = Common.get_particle_setting("test_gravity")
+	for i in range(10):
+		manager.add_particle((i * 20, 0), settings)
+
+	# Moved outside of `update`, so still filed under its old chunk
+	manager.get_particles((0, 0), (1, 1))[0].pos = pygame.Vector2(5000, 5000)
+
+	for i in range(10, 25):
+		manager.add_particle((i * 20, 0), settings)
+
+	assert sorted(x for x, _, _ in particle_state(manager)) == [i * 20 for i in range(15, 25)]
+
+	manager.update(0)
+	manager.add_particle((1000, 0), settings)
+	assert sorted(x for x, _, _ in particle_state(manager)) == [i * 20 for i in range(16, 25)] + [1000]
+
+
+def test_python_backend_reuses_dead_particles():
+	manager = fill_manager(ParticleBackends.PYTHON)
+	particles = {id(particle) for particle in manager.get_particles((-10000, -10000), (20000, 20000))}
+
+	for _ in range(600):
+		manager.update(1 / 60)
+	assert manager.particle_count() == 0
+
+	settings = Common.get_particle_setting("test_gravity")
+	for i in range(50):
+		manager.add_particle((i, i), settings)
+
+	assert {id(particle) for particle in manager.get_particles((-10000, -10000), (20000, 20000))} <= particles
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY])
+def test_spawn_many(backend: ParticleBackends):
+	from .particle_spawners import CircleSpawner, PointSpawner, RectSpawner
+
+	states = []
+	for _ in range(2):
+		random.seed(0)
+		manager = ParticleManager(chunk_size=50, backend=backend, seed=5)
+		spawners = [
+			PointSpawner((0, 0), 0.1, 1, True, "test_gravity", manager),
+			CircleSpawner((200, 0), 0.1, 1, 50, True, "test_gravity", manager, radial_velocity_range=(10, 20)),
+			RectSpawner((0, 200), 0.1, 1, (30, 40), True, "test_gravity", manager),
+		]
+		for spawner in spawners:
+			spawner.spawn_many(100)
+
+		assert manager.particle_count() == 300
+		states.append(particle_state(manager))
+
+	assert states[0] == states[1]
+	assert sum((x - 200) ** 2 + y ** 2 <= 50 ** 2 for x, y, _ in states[0]) == 100
+	assert sum(0 <= x <= 30 and 200 <= y <= 240 for x, y, _ in states[0]) == 100
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY])
+def test_spawn_many_adds_bursts_in_one_call(backend: ParticleBackends, monkeypatch):
+	from .particle_spawners import CircleSpawner, PointSpawner, RectSpawner
+
+	manager = ParticleManager(chunk_size=50, backend=backend, seed=5)
+
+	def add_particle(*args, **kwargs):
+		raise AssertionError("Bursts should not add particles one by one")
+
+	monkeypatch.setattr(manager, "add_particle", add_particle)
+
+	spawners = [
+		PointSpawner((0, 0), 0.1, 1, True, "test_gravity", manager),
+		CircleSpawner((200, 0), 0.1, 1, 0, True, "test_gravity", manager, radial_velocity_range=(10, 20)),
+		RectSpawner((0, 200), 0.1, 1, (30, 40), True, "test_gravity", manager),
+	]
+	for spawner in spawners:
+		spawner.spawn_many(500)
+		spawner.spawn_many(2, [(0, 0), (10, 10)])
+
+	assert manager.particle_count() == 3 * 502
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+@pytest.mark.parametrize(
+	"overflow, kept",
+	[
+		(ParticleOverflow.GROW, range(25)),
+		(ParticleOverflow.DROP_NEW, range(10)),
+		(ParticleOverflow.DROP_OLDEST, range(15, 25)),
+	],
+)
+def test_add_particles_overflow(backend: ParticleBackends, overflow: ParticleOverflow, kept: range):
+	manager = ParticleManager(chunk_size=50, backend=backend, capacity=10, overflow=overflow)
+	settings = Common.get_particle_setting("test_gravity")
+
+	manager.add_particles([(i * 20, 0) for i in range(5)], settings)
+	manager.add_particles([(i * 20, 0) for i in range(5, 25)], settings)
+
+	assert manager.particle_count() == len(kept)
+	assert sorted(x for x, _, _ in particle_state(manager)) == [i * 20 for i in kept]
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_spawner_catches_up_along_path(backend: ParticleBackends):
+	from .particle_spawners import PointSpawner
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	spawner_pos = pygame.Vector2(0, 0)
+	manager.add_spawner(PointSpawner(spawner_pos, 0.01, 2, True, "test_gravity", manager, velocity_range=(0, 0)))
+
+	manager.update(0.001)
+	assert manager.particle_count() == 2
+
+	spawner_pos.update(100, 0)
+	manager.update(0.1)
+
+	assert manager.particle_count() == 2 + 2 * 10
+	xs = sorted(x for x, _, _ in particle_state(manager))
+	assert xs == pytest.approx([0, 0] + [x for x in range(10, 101, 10) for _ in range(2)], abs=1e-6)
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_spawners_spawn_inside_their_area(backend: ParticleBackends):
+	from .particle_spawners import CircleSpawner, RectSpawner
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	circle = manager.add_spawner(CircleSpawner((200, 0), 0.1, 20, 50, True, "test_gravity", manager))
+	rect = manager.add_spawner(RectSpawner((0, 200), 0.1, 20, (30, 40), True, "test_gravity", manager))
+
+	manager.update(0.001)
+	assert manager.particle_count() == 40
+
+	states = particle_state(manager)
+	assert sum((x - 200) ** 2 + y ** 2 <= 51 ** 2 for x, y, _ in states) == 20
+	assert sum(-1 <= x <= 31 and 199 <= y <= 241 for x, y, _ in states) == 20
+
+	manager.remove_spawner(circle)
+	rect.active = False
+	manager.update(0.5)
+	assert manager.particle_count() == 40
+
+
+def test_spawner_subclasses_opt_in_to_native():
+	from .particle_spawners import ParticleSpawner, PointSpawner
+
+	class Custom(PointSpawner):
+		def spawn(self, origin=None):
+			pass
+
+	class Declared(Custom):
+		supports_native = True
+
+	class Wrapped(PointSpawner):
+		def update(self, delta: float):
+			super().update(delta)
+
+	assert not ParticleSpawner.supports_native
+	assert PointSpawner.supports_native
+	assert not Custom.supports_native
+	assert Declared.supports_native
+	assert Wrapped.supports_native
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_spawner_changes_apply_while_running(backend: ParticleBackends):
+	from .particle_spawners import PointSpawner
+
+	manager = ParticleManager(chunk_size=50, backend=backend)
+	spawner = manager.add_spawner(PointSpawner((0, 0), 0.1, 2, True, "test_gravity", manager, velocity_range=(0, 0)))
+
+	manager.update(0.001)
+	assert manager.particle_count() == 2
+	assert spawner.timer.done()
+
+	manager.update(0.05)
+	assert not spawner.timer.done()
+	assert spawner.timer.progress() == pytest.approx(0.51)
+
+	spawner.amount = 5
+	spawner.timer.set_cooldown(0.2)
+	manager.update(0.05)
+	assert manager.particle_count() == 7
+
+	manager.update(0.15)
+	assert manager.particle_count() == 7
+	manager.update(0.05)
+	assert manager.particle_count() == 12
+
+
+def test_python_backend_replays_without_numpy(monkeypatch):
+	from . import particle_manager, particle_spawners
+	from .particle_spawners import CircleSpawner, PointSpawner
+
+	states = []
+	for numpy in (particle_manager.np, None):
+		monkeypatch.setattr(particle_manager, "np", numpy)
+		monkeypatch.setattr(particle_spawners, "np", numpy)
+
+		manager = ParticleManager(chunk_size=50, seed=5)
+		manager.add_spawner(PointSpawner((0, 0), 0.05, 3, True, "test_gravity", manager))
+		manager.add_spawner(CircleSpawner((100, 0), 0.05, 3, 20, True, "test_gravity", manager, radial_velocity_range=(10, 50)))
+
+		for _ in range(30):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	assert states[0] == states[1]
+
+
+@pytest.mark.parametrize("backend", [ParticleBackends.PYTHON, NUMPY, NATIVE])
+def test_seed_replays_particles(backend: ParticleBackends):
+	from .particle_spawners import CircleSpawner, PointSpawner
+
+	colliders = (pygame.Rect(-500, 100, 1000, 50),)
+
+	states = []
+	for seed in (3, 3, 4):
+		manager = ParticleManager(chunk_size=50, colliders=colliders, backend=backend, seed=seed)
+		manager.add_spawner(PointSpawner((0, 0), 0.05, 3, True, "test_gravity", manager))
+		manager.add_spawner(CircleSpawner((100, 0), 0.05, 3, 20, True, "test_gravity", manager, radial_velocity_range=(10, 50)))
+		manager.add_particle((50, 0), Common.get_particle_setting("test_gravity"))
+
+		for _ in range(60):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	assert states[0] == states[1]
+	assert states[0] != states[2]
+
+
+@pytest.mark.parametrize("colliders", [(), (pygame.Rect(-1000, 100, 2000, 50),)])
+@pytest.mark.parametrize("backend", [NATIVE])
+def test_native_threads_replay(backend: ParticleBackends, colliders: tuple):
+	settings = Common.get_particle_setting("test_gravity")
+
+	states = []
+	for threads in (4, 4, 1):
+		random.seed(0)
+
+		# Enough particles to split the update across every thread
+		manager = ParticleManager(chunk_size=50, colliders=colliders, backend=backend, threads=threads, seed=3)
+		manager.add_particles(
+			[(random.uniform(-900, 900), random.uniform(-100, 90)) for _ in range(12000)],
+			settings,
+			[(random.uniform(-100, 100), random.uniform(-100, 100)) for _ in range(12000)]
+		)
+
+		for _ in range(30):
+			manager.update(1 / 60)
+
+		states.append(particle_state(manager))
+
+	assert states[0] == states[1]
+
+	# Bounces draw from a generator per thread, otherwise threads don't change anything
+	assert len(states[0]) == len(states[2]) > 0
+	if colliders:
+		assert all(y < 100 for _, y, _ in states[0])
+	else:
+		assert states[0] == states[2]
@@ -0,0 +1,26 @@
+import pytest
+
+from .timer import Timer
+
+
+def test_repeating_timer_finishes_once_per_tick():
+	timer = Timer(0.1, False, True)
+
+	timer.tick(0.35)
+	assert timer.done()
+	assert timer.times_done() == 1
+
+	timer.tick(0.01)
+	assert timer.done()
+
+
+@pytest.mark.parametrize("delta, times", [(0.05, 0), (0.15, 1), (0.35, 3), (0.95, 9)])
+def test_repeating_timer_catch_up(delta: float, times: int):
+	timer = Timer(0.1, False, True, catch_up=True)
+
+	timer.tick(delta)
+	assert timer.times_done() == times
+	assert timer.done() == (times > 0)
+
+	timer.tick(0.01)
+	assert timer.times_done() == 0
@@ -1,12 +1,22 @@
 class Timer:
-	def __init__(self, cooldown: float, start_done: bool, repeating: bool):
+	def __init__(self, cooldown: float, start_done: bool, repeating: bool, catch_up: bool = False):
+		"""
+		:param catch_up: For repeating timers, count every cooldown that elapsed during a tick (see `times_done`),
+		instead of finishing once per tick and lagging behind after long ticks
+		"""
+
 		self._cooldown = cooldown
 		self._repeating = repeating
+		self._catch_up = catch_up
 
 		self._time = 0 if start_done else cooldown
 
 		self._is_done = start_done
 		self._is_just_done = start_done
+		self._times_done = 1 if start_done else 0
+
+	def get_cooldown(self) -> float:
+		return self._cooldown
 
 	def set_cooldown(self, cooldown: float):
 		self._cooldown = cooldown
@@ -17,9 +27,15 @@ class Timer:
 		if self._repeating:
 			self._is_done = False
 			self._is_just_done = False
+			self._times_done = 0
 
 			if self._time < 0:
-				self._time += self._cooldown
+				if self._catch_up and self._cooldown > 0:
+					self._times_done = int(-self._time // self._cooldown) + 1
+				else:
+					self._times_done = 1
+
+				self._time += self._cooldown * self._times_done
 				self._is_done = True
 				self._is_just_done = True
 		else:
@@ -36,11 +52,13 @@ class Timer:
 		self._time = self._cooldown
 		self._is_done = False
 		self._is_just_done = False
+		self._times_done = 0
 
 	def finish(self):
 		self._time = 0
 		self._is_done = True
 		self._is_just_done = True
+		self._times_done = 1
 
 	def done(self) -> bool:
 		return self._is_done
@@ -48,5 +66,10 @@ class Timer:
 	def just_done(self) -> bool:
 		return self._is_just_done
 
+	def times_done(self) -> int:
+		"""Number of times a repeating timer finished during the last tick"""
+
+		return self._times_done
+
 	def progress(self) -> float:
 		return 1 - self._time / self._cooldown